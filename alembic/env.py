@@ -10,7 +10,7 @@ from alembic import context
 # Import models and config
 from app.core.config import settings
 from app.core.database import Base
-from app.models import AIRun  # noqa: F401 - Import to register model
+from app.models import AIRun, AIRunPayload, PregeneratedPlan, PromptBlock, AIRunRollup, RollupWatermark, TripPlanRecord  # noqa: F401 - Import to register models
 
 # Alembic Config object
 config = context.config
@@ -0,0 +1,49 @@
+"""Add pregenerated_plans table and ai_runs.source column
+
+Revision ID: 002_pregenerated_plans
+Revises: 001_initial
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '002_pregenerated_plans'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Where the plan logged in ai_runs came from (llm, pregenerated, ...)
+    op.add_column(
+        'ai_runs',
+        sa.Column('source', sa.String(32), nullable=False, server_default='llm'),
+        schema='integration'
+    )
+    
+    # Create pregenerated_plans table
+    op.create_table(
+        'pregenerated_plans',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('catalogue_key', sa.String(512), nullable=False, unique=True),
+        sa.Column('city', sa.String(100), nullable=False),
+        sa.Column('duration_days', sa.Integer(), nullable=False),
+        sa.Column('interests', postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column('budget_band', sa.String(16), nullable=False),
+        sa.Column('plan', postgresql.JSONB(), nullable=False),
+        sa.Column('provider', postgresql.ENUM('openai', 'gemini', 'anthropic', name='llmprovider', schema='integration', create_type=False), nullable=False),
+        sa.Column('tokens_used', sa.Integer(), nullable=True),
+        sa.Column('generated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('expires_at', sa.DateTime(), nullable=False, index=True),
+        schema='integration'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pregenerated_plans', schema='integration')
+    op.drop_column('ai_runs', 'source', schema='integration')
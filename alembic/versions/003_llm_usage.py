@@ -0,0 +1,40 @@
+"""Add LLM usage and latency columns to ai_runs
+
+Revision ID: 003_llm_usage
+Revises: 002_pregenerated_plans
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003_llm_usage'
+down_revision: Union[str, None] = '002_pregenerated_plans'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+USAGE_COLUMNS = [
+    ('endpoint', sa.String(32)),
+    ('model', sa.String(100)),
+    ('prompt_tokens', sa.Integer()),
+    ('completion_tokens', sa.Integer()),
+    ('cached_tokens', sa.Integer()),
+    ('latency_ms', sa.Integer()),
+    ('ttft_ms', sa.Integer()),
+    ('finish_reason', sa.String(32)),
+    ('retry_count', sa.Integer()),
+]
+
+
+def upgrade() -> None:
+    for name, column_type in USAGE_COLUMNS:
+        op.add_column('ai_runs', sa.Column(name, column_type, nullable=True), schema='integration')
+
+
+def downgrade() -> None:
+    for name, _ in reversed(USAGE_COLUMNS):
+        op.drop_column('ai_runs', name, schema='integration')
@@ -0,0 +1,28 @@
+"""Add fake value to llmprovider enum
+
+Revision ID: 004_fake_provider
+Revises: 003_llm_usage
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '004_fake_provider'
+down_revision: Union[str, None] = '003_llm_usage'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot be used inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE integration.llmprovider ADD VALUE IF NOT EXISTS 'fake'")
+
+
+def downgrade() -> None:
+    # Intentionally a no-op: PostgreSQL cannot drop a single enum value, and an
+    # unused 'fake' value is harmless to older code. Rows recorded with it are kept.
+    pass
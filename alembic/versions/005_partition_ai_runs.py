@@ -0,0 +1,156 @@
+"""Partition ai_runs by month and move prompt/response to ai_run_payloads
+
+Revision ID: 005_partition_ai_runs
+Revises: 004_fake_provider
+Create Date: 2026-10-19
+
+Existing rows are copied into the new partitioned tables, so run this in a
+maintenance window on large installations.
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '005_partition_ai_runs'
+down_revision: Union[str, None] = '004_fake_provider'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTITIONS_AHEAD = 3
+
+RUN_COLUMNS = [
+    'id', 'created_at', 'user_id', 'trip_id', 'provider', 'tokens_used', 'endpoint', 'model',
+    'prompt_tokens', 'completion_tokens', 'cached_tokens', 'latency_ms', 'ttft_ms',
+    'finish_reason', 'retry_count', 'status', 'error_message', 'source', 'updated_at',
+]
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, first_month: datetime, last_month: datetime) -> None:
+    op.execute(f"CREATE TABLE integration.{table}_default PARTITION OF integration.{table} DEFAULT")
+    month = first_month
+    while month <= last_month:
+        op.execute(
+            f"CREATE TABLE integration.{table}_{month:%Y_%m} PARTITION OF integration.{table} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+        )
+        month = _add_months(month, 1)
+
+
+def upgrade() -> None:
+    op.rename_table('ai_runs', 'ai_runs_unpartitioned', schema='integration')
+    op.execute("ALTER TABLE integration.ai_runs_unpartitioned RENAME CONSTRAINT ai_runs_pkey TO ai_runs_unpartitioned_pkey")
+
+    op.create_table(
+        'ai_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('trip_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('provider', postgresql.ENUM(name='llmprovider', schema='integration', create_type=False), nullable=False),
+        sa.Column('tokens_used', sa.Integer(), nullable=True),
+        sa.Column('endpoint', sa.String(32), nullable=True),
+        sa.Column('model', sa.String(100), nullable=True),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+        sa.Column('completion_tokens', sa.Integer(), nullable=True),
+        sa.Column('cached_tokens', sa.Integer(), nullable=True),
+        sa.Column('latency_ms', sa.Integer(), nullable=True),
+        sa.Column('ttft_ms', sa.Integer(), nullable=True),
+        sa.Column('finish_reason', sa.String(32), nullable=True),
+        sa.Column('retry_count', sa.Integer(), nullable=True),
+        sa.Column('status', postgresql.ENUM(name='airunstatus', schema='integration', create_type=False), nullable=False, server_default='pending'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('source', sa.String(32), nullable=False, server_default='llm'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at', name='ai_runs_pkey'),
+        schema='integration',
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_table(
+        'ai_run_payloads',
+        sa.Column('run_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('prompt', sa.Text(), nullable=False),
+        sa.Column('response', postgresql.JSONB(), nullable=True),
+        sa.PrimaryKeyConstraint('run_id', 'created_at', name='ai_run_payloads_pkey'),
+        schema='integration',
+        postgresql_partition_by='RANGE (created_at)',
+    )
+
+    oldest = op.get_bind().execute(
+        sa.text("SELECT min(created_at) FROM integration.ai_runs_unpartitioned")
+    ).scalar()
+    now = datetime.utcnow()
+    current_month = datetime(now.year, now.month, 1)
+    first_month = datetime(oldest.year, oldest.month, 1) if oldest else current_month
+    for table in ('ai_runs', 'ai_run_payloads'):
+        _create_partitions(table, min(first_month, current_month), _add_months(current_month, PARTITIONS_AHEAD))
+
+    op.create_index('ix_ai_runs_user_id_created_at', 'ai_runs', ['user_id', 'created_at'], schema='integration')
+    op.create_index(
+        'ix_ai_runs_trip_id_created_at', 'ai_runs', ['trip_id', 'created_at'], schema='integration',
+        postgresql_where=sa.text('trip_id IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_ai_runs_pending_created_at', 'ai_runs', ['created_at'], schema='integration',
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index('ix_ai_runs_created_at_brin', 'ai_runs', ['created_at'], schema='integration', postgresql_using='brin')
+
+    columns = ', '.join(RUN_COLUMNS)
+    op.execute(f"INSERT INTO integration.ai_runs ({columns}) SELECT {columns} FROM integration.ai_runs_unpartitioned")
+    op.execute(
+        "INSERT INTO integration.ai_run_payloads (run_id, created_at, prompt, response) "
+        "SELECT id, created_at, prompt, response FROM integration.ai_runs_unpartitioned"
+    )
+    op.drop_table('ai_runs_unpartitioned', schema='integration')
+
+
+def downgrade() -> None:
+    op.rename_table('ai_runs', 'ai_runs_partitioned', schema='integration')
+    op.execute("ALTER TABLE integration.ai_runs_partitioned RENAME CONSTRAINT ai_runs_pkey TO ai_runs_partitioned_pkey")
+
+    op.create_table(
+        'ai_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False, index=True),
+        sa.Column('trip_id', postgresql.UUID(as_uuid=True), nullable=True, index=True),
+        sa.Column('provider', postgresql.ENUM(name='llmprovider', schema='integration', create_type=False), nullable=False),
+        sa.Column('prompt', sa.Text(), nullable=False),
+        sa.Column('response', postgresql.JSONB(), nullable=True),
+        sa.Column('tokens_used', sa.Integer(), nullable=True),
+        sa.Column('status', postgresql.ENUM(name='airunstatus', schema='integration', create_type=False), nullable=False, server_default='pending'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('source', sa.String(32), nullable=False, server_default='llm'),
+        sa.Column('endpoint', sa.String(32), nullable=True),
+        sa.Column('model', sa.String(100), nullable=True),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+        sa.Column('completion_tokens', sa.Integer(), nullable=True),
+        sa.Column('cached_tokens', sa.Integer(), nullable=True),
+        sa.Column('latency_ms', sa.Integer(), nullable=True),
+        sa.Column('ttft_ms', sa.Integer(), nullable=True),
+        sa.Column('finish_reason', sa.String(32), nullable=True),
+        sa.Column('retry_count', sa.Integer(), nullable=True),
+        schema='integration',
+    )
+
+    columns = ', '.join(RUN_COLUMNS)
+    selected = ', '.join(f'r.{column}' for column in RUN_COLUMNS)
+    op.execute(
+        f"INSERT INTO integration.ai_runs ({columns}, prompt, response) "
+        f"SELECT {selected}, coalesce(p.prompt, ''), p.response FROM integration.ai_runs_partitioned r "
+        f"LEFT JOIN integration.ai_run_payloads p ON p.run_id = r.id AND p.created_at = r.created_at"
+    )
+    op.drop_table('ai_run_payloads', schema='integration')
+    op.drop_table('ai_runs_partitioned', schema='integration')
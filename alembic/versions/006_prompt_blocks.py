@@ -0,0 +1,41 @@
+"""Add content-addressed prompt_blocks table and ai_run_payloads.prompt_blocks
+
+Revision ID: 006_prompt_blocks
+Revises: 005_partition_ai_runs
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006_prompt_blocks'
+down_revision: Union[str, None] = '005_partition_ai_runs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'prompt_blocks',
+        sa.Column('hash', sa.String(64), primary_key=True),
+        sa.Column('kind', sa.String(16), nullable=False),
+        sa.Column('compression', sa.String(16), nullable=False),
+        sa.Column('content', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        schema='integration'
+    )
+    op.add_column(
+        'ai_run_payloads',
+        sa.Column('prompt_blocks', postgresql.ARRAY(sa.String(64)), nullable=True),
+        schema='integration'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('ai_run_payloads', 'prompt_blocks', schema='integration')
+    op.drop_table('prompt_blocks', schema='integration')
@@ -0,0 +1,52 @@
+"""Add hourly ai_runs rollups and rollup watermarks
+
+Revision ID: 007_ai_run_rollups
+Revises: 006_prompt_blocks
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '007_ai_run_rollups'
+down_revision: Union[str, None] = '006_prompt_blocks'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTER_COLUMNS = [
+    'run_count', 'failed_count', 'tokens_used', 'prompt_tokens', 'completion_tokens',
+    'cached_tokens', 'latency_count', 'latency_sum_ms',
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ai_run_rollups_hourly',
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('provider', sa.String(32), nullable=False),
+        sa.Column('endpoint', sa.String(32), nullable=False),
+        sa.Column('source', sa.String(32), nullable=False),
+        *[sa.Column(name, sa.BigInteger(), nullable=False) for name in COUNTER_COLUMNS],
+        sa.Column('latency_histogram', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('ttft_histogram', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('bucket_start', 'provider', 'endpoint', 'source'),
+        schema='integration'
+    )
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(64), primary_key=True),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        schema='integration'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks', schema='integration')
+    op.drop_table('ai_run_rollups_hourly', schema='integration')
@@ -0,0 +1,36 @@
+"""Add trip_plans table
+
+Revision ID: 008_trip_plans
+Revises: 007_ai_run_rollups
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '008_trip_plans'
+down_revision: Union[str, None] = '007_ai_run_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'trip_plans',
+        sa.Column('trip_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False, index=True),
+        sa.Column('version', sa.String(64), nullable=False),
+        sa.Column('plan', postgresql.JSONB(), nullable=False),
+        sa.Column('source', sa.String(32), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        schema='integration'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('trip_plans', schema='integration')
@@ -0,0 +1,31 @@
+"""Add trace_id to ai_runs
+
+Revision ID: 009_ai_runs_trace_id
+Revises: 008_trip_plans
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_ai_runs_trace_id'
+down_revision: Union[str, None] = '008_trip_plans'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Added to the partitioned parent, so existing and future partitions get it
+    op.add_column('ai_runs', sa.Column('trace_id', sa.String(32), nullable=True), schema='integration')
+    op.create_index(
+        'ix_ai_runs_trace_id', 'ai_runs', ['trace_id'], schema='integration',
+        postgresql_where=sa.text('trace_id IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_runs_trace_id', table_name='ai_runs', schema='integration')
+    op.drop_column('ai_runs', 'trace_id', schema='integration')
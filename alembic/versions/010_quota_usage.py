@@ -0,0 +1,36 @@
+"""Add quota_usage table
+
+Revision ID: 010_quota_usage
+Revises: 009_ai_runs_trace_id
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010_quota_usage'
+down_revision: Union[str, None] = '009_ai_runs_trace_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'quota_usage',
+        sa.Column('subject', sa.String(128), primary_key=True),
+        sa.Column('metric', sa.String(16), primary_key=True),
+        sa.Column('window_start', sa.DateTime(), primary_key=True),
+        sa.Column('used', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        schema='integration'
+    )
+    # Expired windows are deleted by age
+    op.create_index('ix_quota_usage_window_start', 'quota_usage', ['window_start'], schema='integration')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quota_usage_window_start', table_name='quota_usage', schema='integration')
+    op.drop_table('quota_usage', schema='integration')
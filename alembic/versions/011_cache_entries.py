@@ -0,0 +1,35 @@
+"""Add UNLOGGED cache_entries table
+
+Revision ID: 011_cache_entries
+Revises: 010_quota_usage
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011_cache_entries'
+down_revision: Union[str, None] = '010_quota_usage'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # UNLOGGED: no WAL writes; the table is truncated after a crash, which a cache can afford
+    op.create_table(
+        'cache_entries',
+        sa.Column('key', sa.String(512), primary_key=True),
+        sa.Column('compression', sa.String(16), nullable=False),
+        sa.Column('value', sa.LargeBinary(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False, index=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        schema='integration',
+        prefixes=['UNLOGGED'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cache_entries', schema='integration')
@@ -2,14 +2,19 @@ from typing import AsyncGenerator, Annotated
 
 from fastapi import Depends, HTTPException, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError
+from jose import JWTError
 
 from app.core.database import AsyncSessionLocal
-from app.core.config import settings
+from app.core.tracing import tracer
 from app.services import RecommendationService
+from app.services.auth import token_verifier
 from app.services.telemetry import TelemetryService
-from app.services.integration_client import IntegrationClient
+from app.services.telemetry_writer import telemetry_writer
+from app.services.integration_client import IntegrationClient, integration_client
 from app.services.llm_engine import LLMEngine
+from app.services.pregeneration import PregeneratedPlanStore
+from app.services.rollups import TelemetryRollupService
+from app.services.trip_plans import TripPlanStore
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -23,46 +28,43 @@ async def verify_token(authorization: Annotated[str | None, Header()] = None) ->
     Verify JWT token from Authorization header.
     Returns user_id or service_id from token.
     """
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing Authorization header",
-        )
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
+    with tracer.span("auth.verify_token"):
+        if not authorization:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication scheme",
+                detail="Missing Authorization header",
             )
 
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        try:
+            scheme, token = authorization.split()
+            if scheme.lower() != "bearer":
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid authentication scheme",
+                )
 
-        # TODO: Extract user_id or service client_id from token
-        # In a real scenario, we might extract user_id or service client_id
-        # For now, we assume the token is valid if signature matches
-        return payload.get("sub", "unknown_service")
+            payload = await token_verifier.verify(token)
 
-    except (ValueError, JWTError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-        )
+            # TODO: Extract user_id or service client_id from token
+            # In a real scenario, we might extract user_id or service client_id
+            # For now, we assume the token is valid if signature matches
+            return payload.get("sub", "unknown_service")
 
+        except (ValueError, JWTError):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
 
-def get_telemetry_service(db: AsyncSession = Depends(get_db)) -> TelemetryService:
-    """Telemetry service dependency."""
-    return TelemetryService(db)
+
+def get_telemetry_service() -> TelemetryService:
+    """Telemetry service dependency (write-behind, holds no DB connection)."""
+    return TelemetryService(telemetry_writer)
 
 
 def get_integration_client() -> IntegrationClient:
-    """Integration client dependency."""
-    return IntegrationClient()
+    """Integration client dependency (shared connection pool)."""
+    return integration_client
 
 
 def get_llm_engine() -> LLMEngine:
@@ -70,10 +72,27 @@ def get_llm_engine() -> LLMEngine:
     return LLMEngine()
 
 
+def get_pregenerated_plan_store() -> PregeneratedPlanStore:
+    """Pre-generated plan store dependency (opens a session per lookup, holds none per request)."""
+    return PregeneratedPlanStore()
+
+
+def get_trip_plan_store() -> TripPlanStore:
+    """Trip plan store dependency (shared in-process LRU over Postgres)."""
+    return TripPlanStore()
+
+
+def get_rollup_service() -> TelemetryRollupService:
+    """Telemetry rollup service dependency (reads pre-aggregated stats only)."""
+    return TelemetryRollupService()
+
+
 def get_recommendation_service(
     telemetry: TelemetryService = Depends(get_telemetry_service),
     integration: IntegrationClient = Depends(get_integration_client),
     llm: LLMEngine = Depends(get_llm_engine),
+    pregenerated: PregeneratedPlanStore = Depends(get_pregenerated_plan_store),
+    trip_plans: TripPlanStore = Depends(get_trip_plan_store),
 ) -> RecommendationService:
     """Recommendation service dependency."""
-    return RecommendationService(telemetry, integration, llm)
+    return RecommendationService(telemetry, integration, llm, pregenerated, trip_plans)
@@ -1,11 +1,25 @@
-from typing import Annotated
+from datetime import date, datetime, timedelta
+from typing import Annotated, Optional, Literal, List
 
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, status
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Query, status
+from fastapi.responses import StreamingResponse, PlainTextResponse, Response
 
-from app.api.deps import verify_token, get_recommendation_service
-from app.schemas.request import RecommendationRequest, ExplainRequest, ImproveRequest
-from app.schemas.response import TripPlan, ExplainResponse, ImproveResponse
+from app.api.deps import verify_token, get_recommendation_service, get_rollup_service
+from app.core.config import settings
+from app.core.constants import LLMProvider, AIEndpoint
+from app.core.profiling import profile_store
+from app.core.serialization import model_response
+from app.schemas.request import (
+    RecommendationRequest,
+    BatchRecommendationRequest,
+    ExplainRequest,
+    ImproveRequest,
+)
+from app.schemas.response import TripPlan, ExplainResponse, ImproveResponse, AIStatsResponse
+from app.services.quotas import QuotaExceededError, quota_tracker
 from app.services.recommendation import RecommendationService
+from app.services.rollups import TelemetryRollupService
+from app.services.trip_plans import TripPlanNotFoundError
 
 
 router = APIRouter(
@@ -15,14 +29,52 @@ router = APIRouter(
 )
 
 
+def _enforce_quota(caller: str, user_ids: List[str]) -> None:
+    """Count the request against the caller's and users' quotas; 429 before any work is done."""
+    try:
+        quota_tracker.check(caller, user_ids)
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
 @router.post("/recommend", response_model=TripPlan)
 async def generate_recommendation(
     request: RecommendationRequest,
     background_tasks: BackgroundTasks,
     service: Annotated[RecommendationService, Depends(get_recommendation_service)],
+    caller: Annotated[str, Depends(verify_token)],
 ):
     """Generate a personalized travel itinerary."""
-    return await service.generate_recommendation(request, background_tasks)
+    _enforce_quota(caller, [request.user_id])
+    return model_response(await service.generate_recommendation(request, background_tasks))
+
+
+@router.post("/recommend/batch", response_class=StreamingResponse)
+async def generate_recommendation_batch(
+    request: BatchRecommendationRequest,
+    service: Annotated[RecommendationService, Depends(get_recommendation_service)],
+    caller: Annotated[str, Depends(verify_token)],
+):
+    """
+    Generate itineraries for many users at once.
+    Results are streamed back as NDJSON, one BatchRecommendationItem per line.
+    """
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds limit of {settings.BATCH_MAX_ITEMS} items",
+        )
+    _enforce_quota(caller, [item.user_id for item in request.items])
+
+    async def stream_items():
+        async for item in service.generate_recommendations_batch(request.items):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(stream_items(), media_type="application/x-ndjson")
 
 
 @router.post("/explain", response_model=ExplainResponse)
@@ -30,9 +82,17 @@ async def explain_itinerary(
     request: ExplainRequest,
     background_tasks: BackgroundTasks,
     service: Annotated[RecommendationService, Depends(get_recommendation_service)],
+    caller: Annotated[str, Depends(verify_token)],
 ):
-    """Explain a specific trip plan or answer questions about it."""
-    return await service.explain_itinerary(request, background_tasks)
+    """
+    Explain a specific trip plan or answer questions about it.
+    The plan may be omitted if it was generated with this trip_id.
+    """
+    _enforce_quota(caller, [str(request.user_id)])
+    try:
+        return model_response(await service.explain_itinerary(request, background_tasks))
+    except TripPlanNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
 @router.post("/improve", response_model=ImproveResponse)
@@ -40,6 +100,72 @@ async def improve_itinerary(
     request: ImproveRequest,
     background_tasks: BackgroundTasks,
     service: Annotated[RecommendationService, Depends(get_recommendation_service)],
+    caller: Annotated[str, Depends(verify_token)],
+):
+    """
+    Improve an existing travel itinerary.
+    The current plan may be omitted if it was generated with this trip_id.
+    """
+    _enforce_quota(caller, [str(request.user_id)])
+    try:
+        return model_response(await service.improve_itinerary(request, background_tasks))
+    except TripPlanNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/stats", response_model=AIStatsResponse)
+async def get_ai_stats(
+    service: Annotated[TelemetryRollupService, Depends(get_rollup_service)],
+    start_date: Annotated[Optional[date], Query(description="First day (UTC), defaults to 7 days ago")] = None,
+    end_date: Annotated[Optional[date], Query(description="Last day (UTC), defaults to today")] = None,
+    provider: Optional[LLMProvider] = None,
+    endpoint: Optional[AIEndpoint] = None,
+):
+    """
+    Request counts, failure rate, token totals and latency percentiles per
+    day, provider and endpoint, answered from hourly rollups.
+    """
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=6)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start_date must not be after end_date",
+        )
+    if (end_date - start_date).days + 1 > settings.ROLLUP_STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Date range exceeds limit of {settings.ROLLUP_STATS_MAX_DAYS} days",
+        )
+    return await service.stats(
+        start_date=start_date,
+        end_date=end_date,
+        provider=provider.value if provider else None,
+        endpoint=endpoint.value if endpoint else None,
+    )
+
+
+@router.get("/profiles/{run_id}", response_class=PlainTextResponse)
+async def get_profile(
+    run_id: str,
+    format: Annotated[Literal["text", "pstats"], Query(description="pstats report or the raw dump")] = "text",
+    sort: Annotated[Literal["cumulative", "tottime", "ncalls"], Query()] = "cumulative",
+    limit: Annotated[int, Query(ge=1, le=1000)] = 50,
 ):
-    """Improve an existing travel itinerary."""
-    return await service.improve_itinerary(request, background_tasks)
+    """
+    cProfile capture of a profiled request, by run ID (see X-Profile-Id).
+    The raw dump loads with pstats.Stats or snakeviz.
+    """
+    if format == "pstats":
+        data = profile_store.load(run_id)
+        if data is not None:
+            return Response(
+                data,
+                media_type="application/octet-stream",
+                headers={"Content-Disposition": f'attachment; filename="{run_id}.prof"'},
+            )
+    else:
+        report = profile_store.summary(run_id, sort, limit)
+        if report is not None:
+            return PlainTextResponse(report)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No profile stored for {run_id}")
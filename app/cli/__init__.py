@@ -0,0 +1 @@
+"""Command line entry points (run with `python -m app.cli.<command>`)."""
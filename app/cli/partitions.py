@@ -0,0 +1,35 @@
+"""
+Maintain monthly partitions of ai_runs and ai_run_payloads.
+
+Creates upcoming partitions and drops the ones past the retention window.
+Run daily from cron or a scheduler.
+
+Usage:
+    python -m app.cli.partitions [--months-ahead 3] [--retention-months 12]
+"""
+import argparse
+import asyncio
+import json
+
+from app.core.database import AsyncSessionLocal
+from app.services.partitions import PartitionManager
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Maintain ai_runs partitions")
+    parser.add_argument("--months-ahead", type=int, default=None, help="Defaults to AI_RUNS_PARTITIONS_AHEAD")
+    parser.add_argument("--retention-months", type=int, default=None, help="Defaults to AI_RUNS_RETENTION_MONTHS")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await PartitionManager(db).maintain(
+            months_ahead=args.months_ahead,
+            retention_months=args.retention_months,
+        )
+
+
+if __name__ == "__main__":
+    summary = asyncio.run(main(parse_args()))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
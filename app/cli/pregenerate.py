@@ -0,0 +1,53 @@
+"""
+Pre-generate popular itineraries from a catalogue file.
+
+Usage:
+    python -m app.cli.pregenerate catalogue.json [--force] [--provider openai]
+"""
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from app.core.constants import LLMProvider
+from app.services.integration_client import IntegrationClient
+from app.services.llm_engine import LLMEngine
+from app.services.pregeneration import (
+    PregeneratedPlanStore,
+    PregenerationService,
+    load_catalogue,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pre-generate popular itineraries")
+    parser.add_argument("catalogue", type=Path, help="JSON file with catalogue entries")
+    parser.add_argument("--force", action="store_true", help="Regenerate entries that are still fresh")
+    parser.add_argument(
+        "--provider",
+        choices=[provider.value for provider in LLMProvider],
+        default=None,
+        help="LLM provider (defaults to DEFAULT_LLM_PROVIDER)",
+    )
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> dict:
+    entries = load_catalogue(args.catalogue)
+    integration = IntegrationClient()
+    llm = LLMEngine(LLMProvider(args.provider) if args.provider else None)
+
+    try:
+        service = PregenerationService(PregeneratedPlanStore(), integration, llm)
+        return await service.run(entries, force=args.force)
+    finally:
+        await integration.close()
+
+
+if __name__ == "__main__":
+    # Run below live API workers on shared hosts
+    if hasattr(os, "nice"):
+        os.nice(10)
+    summary = asyncio.run(main(parse_args()))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
@@ -0,0 +1,23 @@
+"""
+Aggregate finished ai_runs into hourly rollups up to now.
+
+The API workers run the same job periodically (ROLLUP_ENABLED); this is for
+backfills or deployments that schedule it externally.
+
+Usage:
+    python -m app.cli.rollup
+"""
+import asyncio
+import json
+
+from app.core.database import TelemetrySessionLocal
+from app.services.rollups import TelemetryRollupService
+
+
+async def main() -> dict:
+    return await TelemetryRollupService(TelemetrySessionLocal).run_once()
+
+
+if __name__ == "__main__":
+    summary = asyncio.run(main())
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
@@ -1,5 +1,5 @@
 from app.core.config import settings
-from app.core.database import Base, get_db, engine, AsyncSessionLocal
+from app.core.database import Base, get_db, engine, AsyncSessionLocal, telemetry_engine, TelemetrySessionLocal
 from app.core.constants import LLMProvider, AIRunStatus
 
-__all__ = ["settings", "Base", "get_db", "engine", "AsyncSessionLocal", "LLMProvider", "AIRunStatus"]
+__all__ = ["settings", "Base", "get_db", "engine", "AsyncSessionLocal", "telemetry_engine", "TelemetrySessionLocal", "LLMProvider", "AIRunStatus"]
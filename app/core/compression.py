@@ -0,0 +1,266 @@
+import json
+import time
+import zlib
+from typing import Optional, List, Dict, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is then neither accepted nor offered
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+compression_payloads = metrics.counter(
+    "ai_compression_payloads_total", "Request/response bodies decoded or encoded",
+    ("direction", "encoding"),
+)
+compression_bytes_saved = metrics.counter(
+    "ai_compression_bytes_saved_total", "Bytes saved on the wire by compression",
+    ("direction", "encoding"),
+)
+compression_cpu = metrics.counter(
+    "ai_compression_cpu_seconds_total", "CPU time spent compressing and decompressing bodies",
+    ("direction", "encoding"),
+)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings in server preference order."""
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Preferred supported encoding the client accepts (q=0 excludes it)."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    candidates = [
+        encoding for encoding in supported_encodings()
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda encoding: accepted.get(encoding, accepted.get("*", 0.0)))
+
+
+def decompress(body: bytes, encoding: str, max_size: int) -> bytes:
+    """
+    Decode a request body; ValueError if it is invalid, truncated or
+    inflates beyond max_size. Every member of a multi-member gzip body is
+    decoded.
+    """
+    if encoding == "gzip":
+        data = b""
+        try:
+            while True:
+                decompressor = zlib.decompressobj(wbits=31)
+                data += decompressor.decompress(body, max_size + 1 - len(data))
+                if len(data) > max_size:
+                    break
+                if not decompressor.eof:
+                    raise ValueError("truncated gzip body")
+                body = decompressor.unused_data
+                if not body:
+                    break
+        except zlib.error as e:
+            raise ValueError(str(e)) from e
+    elif encoding == "zstd" and zstandard is not None:
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+                data = reader.read(max_size + 1)
+        except zstandard.ZstdError as e:
+            raise ValueError(str(e)) from e
+    else:
+        raise LookupError(encoding)
+    if len(data) > max_size:
+        raise ValueError(f"decompressed body exceeds {max_size} bytes")
+    return data
+
+
+class _Encoder:
+    """Incremental encoder; flushes per chunk so streamed NDJSON lines are not held back."""
+
+    def __init__(self, encoding: str):
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def encode(self, chunk: bytes, final: bool) -> bytes:
+        data = self._compressor.compress(chunk)
+        return data + (self._compressor.flush() if final else self._compressor.flush(self._flush_mode))
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def _encoded_headers(
+    headers: List[Tuple[bytes, bytes]],
+    encoding: str,
+    content_length: Optional[int],
+) -> List[Tuple[bytes, bytes]]:
+    """Response headers of an encoded body (streamed bodies have no Content-Length)."""
+    vary = _header(headers, b"vary")
+    result = [(key, value) for key, value in headers if key not in (b"content-length", b"vary")]
+    result.append((b"content-encoding", encoding.encode()))
+    result.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    if content_length is not None:
+        result.append((b"content-length", str(content_length).encode()))
+    return result
+
+
+class CompressionMiddleware:
+    """
+    gzip/zstd transport for the internal API.
+
+    Request bodies with Content-Encoding gzip or zstd are decoded before
+    the route sees them (415 for other encodings, 400 for corrupt bodies
+    or bodies inflating beyond COMPRESSION_MAX_REQUEST_BYTES). JSON and
+    NDJSON responses are compressed with the best encoding offered in
+    Accept-Encoding; complete bodies below COMPRESSION_MIN_SIZE are sent
+    as they are. Bytes saved and CPU time are counted per direction and
+    encoding.
+    """
+
+    def __init__(self, app, path_prefix: str = "/internal/v1/ai/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        headers = list(scope.get("headers") or [])
+        content_encoding = (_header(headers, b"content-encoding") or b"identity").decode("latin-1").strip().lower()
+        if content_encoding != "identity":
+            result = await self._decode_request(scope, receive, send, headers, content_encoding)
+            if result is None:
+                return
+            scope, receive = result
+
+        accept_encoding = _header(headers, b"accept-encoding")
+        encoding = negotiate(accept_encoding.decode("latin-1")) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, self._encoding_send(send, encoding))
+
+    async def _decode_request(self, scope, receive, send, headers, encoding):
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        started = time.thread_time()
+        try:
+            decoded = decompress(body, encoding, settings.COMPRESSION_MAX_REQUEST_BYTES)
+        except LookupError:
+            await self._reject(send, 415, f"Unsupported Content-Encoding: {encoding}")
+            return None
+        except ValueError as e:
+            await self._reject(send, 400, f"Invalid {encoding} request body: {e}")
+            return None
+        compression_cpu.inc(time.thread_time() - started, direction="request", encoding=encoding)
+        compression_payloads.inc(direction="request", encoding=encoding)
+        compression_bytes_saved.inc(len(decoded) - len(body), direction="request", encoding=encoding)
+
+        scope = dict(scope)
+        scope["headers"] = [
+            (key, value) for key, value in headers if key not in (b"content-encoding", b"content-length")
+        ] + [(b"content-length", str(len(decoded)).encode())]
+        delivered = False
+
+        async def receive_decoded():
+            nonlocal delivered
+            if delivered:
+                # Nothing left to read; wait for the disconnect like the server would
+                return await receive()
+            delivered = True
+            return {"type": "http.request", "body": decoded, "more_body": False}
+
+        return scope, receive_decoded
+
+    @staticmethod
+    async def _reject(send, status: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _encoding_send(send, encoding: str):
+        start_message = None
+        encoder: Optional[_Encoder] = None
+        raw_size = 0
+        encoded_size = 0
+        cpu_seconds = 0.0
+
+        async def send_encoded(message):
+            nonlocal start_message, encoder, raw_size, encoded_size, cpu_seconds
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = start_message.get("headers", [])
+                content_type = (_header(headers, b"content-type") or b"").decode("latin-1")
+                if (
+                    _header(headers, b"content-encoding") is None
+                    and content_type.startswith(COMPRESSIBLE_TYPES)
+                    and (more_body or len(body) >= settings.COMPRESSION_MIN_SIZE)
+                ):
+                    encoder = _Encoder(encoding)
+            if encoder is not None:
+                started = time.thread_time()
+                body_encoded = encoder.encode(body, final=not more_body)
+                cpu_seconds += time.thread_time() - started
+                raw_size += len(body)
+                encoded_size += len(body_encoded)
+                message = {"type": "http.response.body", "body": body_encoded, "more_body": more_body}
+
+            if start_message is not None:
+                if encoder is not None:
+                    start_message["headers"] = _encoded_headers(start_message.get("headers", []), encoding, (
+                        None if more_body else len(message["body"])
+                    ))
+                await send(start_message)
+                start_message = None
+            await send(message)
+
+            if encoder is not None and not more_body:
+                compression_cpu.inc(cpu_seconds, direction="response", encoding=encoding)
+                compression_payloads.inc(direction="response", encoding=encoding)
+                compression_bytes_saved.inc(raw_size - encoded_size, direction="response", encoding=encoding)
+
+        return send_encoded
@@ -19,13 +19,140 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY: Optional[str] = None
     DEFAULT_LLM_PROVIDER: str = "openai"
 
+    # Fake LLM provider (load testing)
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = "lognormal"
+    FAKE_LLM_TTFT_MS: float = 400.0
+    FAKE_LLM_TTFT_SPREAD: float = 0.3
+    FAKE_LLM_TOKENS_PER_SECOND: float = 150.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_RATE_LIMIT_RATE: float = 0.0
+    FAKE_LLM_INVALID_JSON_RATE: float = 0.0
+    FAKE_LLM_TEMPLATE_DIR: Optional[str] = None
+
     # JWT Authentication
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
+    # Asymmetric (RS256/ES256) service tokens: keys come from this JWKS endpoint
+    JWT_JWKS_URL: Optional[str] = None
+    JWT_JWKS_REFRESH_INTERVAL_SECONDS: float = 300.0
+    JWT_JWKS_MIN_REFRESH_SECONDS: float = 30.0
+    JWT_CACHE_SIZE: int = 1024
+    JWT_CACHE_TTL_SECONDS: float = 300.0
+
+    # Quotas per calling service (token sub) and per user; 0 = unlimited
+    QUOTA_ENABLED: bool = False
+    QUOTA_SERVICE_REQUESTS_PER_MINUTE: int = 600
+    QUOTA_SERVICE_TOKENS_PER_DAY: int = 20_000_000
+    QUOTA_USER_REQUESTS_PER_MINUTE: int = 20
+    QUOTA_USER_TOKENS_PER_DAY: int = 200_000
+    QUOTA_SYNC_INTERVAL_SECONDS: float = 2.0
 
     # Integration Service
     INTEGRATION_SERVICE_URL: str
 
+    # Telemetry
+    TELEMETRY_BATCH_SIZE: int = 200
+    TELEMETRY_FLUSH_INTERVAL_MS: int = 250
+    TELEMETRY_QUEUE_MAX_SIZE: int = 10000
+    TELEMETRY_ENQUEUE_TIMEOUT_SECONDS: float = 1.0
+    TELEMETRY_DB_TIMEOUT_SECONDS: float = 2.0
+    TELEMETRY_DB_POOL_SIZE: int = 2
+    TELEMETRY_DB_MAX_OVERFLOW: int = 2
+    TELEMETRY_DB_STATEMENT_TIMEOUT_MS: int = 5000
+    TELEMETRY_DB_STATEMENT_CACHE_SIZE: int = 256
+    TELEMETRY_SPOOL_ENABLED: bool = True
+    TELEMETRY_SPOOL_DIR: str = ".telemetry-spool"
+    TELEMETRY_SPOOL_SEGMENT_BYTES: int = 16 * 1024 * 1024
+    TELEMETRY_SPOOL_REPLAY_INTERVAL_SECONDS: float = 5.0
+    TELEMETRY_SPOOL_REPLAY_BATCH_SIZE: int = 500
+    AI_RUNS_RETENTION_MONTHS: int = 12
+    AI_RUNS_PARTITIONS_AHEAD: int = 3
+    ROLLUP_ENABLED: bool = True
+    ROLLUP_INTERVAL_SECONDS: float = 60.0
+    ROLLUP_LAG_SECONDS: int = 120
+    ROLLUP_MAX_WINDOW_HOURS: int = 6
+    ROLLUP_MAX_RUN_AGE_HOURS: int = 24
+    ROLLUP_STATS_MAX_DAYS: int = 92
+    PROMPT_LOGGING_ENABLED: bool = True
+    PROMPT_BLOCK_CACHE_SIZE: int = 4096
+    PROMPT_BLOCK_COMPRESSION_LEVEL: int = 6
+
+    # Metrics
+    METRICS_ENABLED: bool = True
+    # Shared directory for per-worker snapshots; unset = single-process metrics
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Tracing
+    # none (trace IDs are still propagated and stored on runs), jsonl or otlp
+    TRACING_EXPORTER: str = "none"
+    TRACING_SAMPLE_RATE: float = 1.0
+    TRACING_JSONL_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"
+    TRACING_SERVICE_NAME: str = "ai-recommender-service"
+    TRACING_EXPORT_INTERVAL_SECONDS: float = 2.0
+    TRACING_MAX_QUEUE_SIZE: int = 10000
+
+    # Profiling (requests with a signed X-Profile-Token header, or sampled)
+    PROFILING_ENABLED: bool = True
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_FILES: int = 200
+
+    # Serialisation: orjson for prompt blocks, no response_model re-validation of built models
+    FAST_JSON_ENABLED: bool = True
+
+    # Compression of /internal/v1/ai/* bodies (gzip, and zstd when zstandard is installed)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_MAX_REQUEST_BYTES: int = 10 * 1024 * 1024
+
+    # Warm-up and readiness
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 2
+    WARMUP_TIMEOUT_SECONDS: float = 10.0
+    READINESS_CHECK_TIMEOUT_SECONDS: float = 2.0
+
+    # Batch Processing
+    BATCH_MAX_ITEMS: int = 500
+    BATCH_MAX_CONCURRENCY: int = 8
+
+    # Trip Plan Store
+    TRIP_PLAN_CACHE_SIZE: int = 2048
+    TRIP_PLAN_CACHE_TTL_SECONDS: float = 300.0
+    EXPLAIN_CONTEXT_CACHE_SIZE: int = 1024
+    EXPLAIN_CONTEXT_TTL_SECONDS: float = 900.0
+    EXPLAIN_LOCAL_ANSWERS_ENABLED: bool = True
+    IMPROVE_LOCAL_EDITS_ENABLED: bool = True
+
+    # Two-tier cache: per-worker LRU (L1) over the UNLOGGED integration.cache_entries table (L2)
+    CACHE_ENABLED: bool = True
+    # Bump to invalidate every cached entry at once
+    CACHE_VERSION: str = "1"
+    CACHE_L1_SIZE: int = 2048
+    CACHE_L1_MAX_TTL_SECONDS: float = 60.0
+    CACHE_L2_ENABLED: bool = True
+    CACHE_L2_TIMEOUT_SECONDS: float = 0.5
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
+    CACHE_COMPRESSION_LEVEL: int = 6
+    CACHE_PURGE_INTERVAL_SECONDS: float = 300.0
+    CACHE_INTEGRATION_TTL_SECONDS: float = 900.0
+    CACHE_EXPLANATION_TTL_SECONDS: float = 86400.0
+
+    # Local fallback planner when the LLM fails or the deadline is near
+    FALLBACK_PLANNER_ENABLED: bool = True
+    RECOMMEND_DEADLINE_SECONDS: float = 30.0
+    # Time kept back from the deadline to build the fallback plan and respond
+    FALLBACK_MARGIN_SECONDS: float = 0.5
+
+    # Pre-generated Plans
+    PREGENERATED_PLANS_ENABLED: bool = True
+    PREGENERATED_PLAN_TTL_HOURS: int = 168
+    PREGENERATION_CONCURRENCY: int = 1
+    PREGENERATION_DELAY_SECONDS: float = 2.0
+
     # App Settings
     DEBUG: bool = False
 
@@ -6,6 +6,7 @@ class LLMProvider(str, Enum):
     OPENAI = "openai"
     GEMINI = "gemini"
     ANTHROPIC = "anthropic"
+    FAKE = "fake"
 
 
 class AIRunStatus(str, Enum):
@@ -13,3 +14,40 @@ class AIRunStatus(str, Enum):
     PENDING = "pending"
     COMPLETED = "completed"
     FAILED = "failed"
+
+
+class AIEndpoint(str, Enum):
+    """API endpoint that triggered an AI run."""
+    RECOMMEND = "recommend"
+    RECOMMEND_BATCH = "recommend_batch"
+    EXPLAIN = "explain"
+    IMPROVE = "improve"
+
+
+class PlanSource(str, Enum):
+    """Where the returned plan came from."""
+    LLM = "llm"
+    PREGENERATED = "pregenerated"
+    LOCAL = "local"
+    FALLBACK = "fallback"
+
+
+class BudgetBand(str, Enum):
+    """Daily per-person budget band used by the pre-generation catalogue."""
+    LOW = "low"
+    MID = "mid"
+    HIGH = "high"
+
+
+# Upper bounds (UAH per person per day) for LOW and MID budget bands
+BUDGET_BAND_LIMITS = {
+    BudgetBand.LOW: 1500,
+    BudgetBand.MID: 4000,
+}
+
+# Representative daily budget (UAH per person) used when generating a band
+BUDGET_BAND_DAILY_BUDGET = {
+    BudgetBand.LOW: 1000,
+    BudgetBand.MID: 2500,
+    BudgetBand.HIGH: 6000,
+}
@@ -19,6 +19,31 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Dedicated pool for write-behind telemetry so its flushes and spool replays
+# never compete with request handlers for connections
+telemetry_engine = create_async_engine(
+    settings.database_url,
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    pool_size=settings.TELEMETRY_DB_POOL_SIZE,
+    max_overflow=settings.TELEMETRY_DB_MAX_OVERFLOW,
+    connect_args={
+        "prepared_statement_cache_size": settings.TELEMETRY_DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            "statement_timeout": str(settings.TELEMETRY_DB_STATEMENT_TIMEOUT_MS),
+            "application_name": "ai-recommender-telemetry",
+        },
+    },
+)
+
+TelemetrySessionLocal = async_sessionmaker(
+    bind=telemetry_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
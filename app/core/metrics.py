@@ -0,0 +1,303 @@
+import asyncio
+import bisect
+import fcntl
+import json
+import logging
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterable, BinaryIO
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+# (name, type, help, labels, value) produced by collectors at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SNAPSHOT_SUFFIX = ".json"
+LOCK_SUFFIX = ".lock"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def snapshot(self) -> List[List[Any]]:
+        return [[list(key), value] for key, value in self.values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (bucket counts are stored per bucket)."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self.values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def time(self, **labels: str) -> "Timer":
+        """Context manager observing the elapsed seconds with outcome="ok"/"error"."""
+        return Timer(self, labels)
+
+    def snapshot(self) -> List[List[Any]]:
+        return [[list(key), counts, total] for key, (counts, total) in self.values.items()]
+
+
+class Timer:
+    """Times a block; usable around awaits since it only reads the clock."""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.histogram.observe(
+            time.perf_counter() - self.started,
+            outcome="error" if exc_type else "ok",
+            **self.labels,
+        )
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics rendered in the Prometheus text format.
+
+    With METRICS_MULTIPROC_DIR set, every worker periodically writes a
+    snapshot of its counters and histograms to its own file (guarded by an
+    flock, like the telemetry spool) and a scrape served by any worker sums
+    the snapshots of all of them. Counters of exited workers keep counting
+    towards the totals; gauges are only taken from live workers.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else None
+        self.metrics: Dict[str, Any] = {}
+        self.collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._name: Optional[str] = None
+        self._lock_file: Optional[BinaryIO] = None
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Add a callable producing samples (e.g. queue depths, cache sizes) at scrape time."""
+        self.collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serialisable state of this process."""
+        samples = []
+        for collector in self.collectors:
+            try:
+                samples.extend(collector())
+            except Exception:
+                logger.warning("Metrics collector failed", exc_info=True)
+        return {
+            "metrics": {
+                name: {
+                    "type": metric.type,
+                    "help": metric.documentation,
+                    "labels": list(metric.labelnames),
+                    "buckets": list(getattr(metric, "buckets", ())),
+                    "values": metric.snapshot(),
+                }
+                for name, metric in self.metrics.items()
+            },
+            "samples": [list(sample) for sample in samples],
+        }
+
+    def flush(self) -> None:
+        """Write this process's snapshot for the other workers."""
+        self._write(self.snapshot())
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        """Replace this process's snapshot file (atomic rename)."""
+        if self.directory is None:
+            return
+        if self._name is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._name = f"{socket.gethostname()}-{os.getpid()}"
+            self._lock_file = open(self.directory / f"{self._name}{LOCK_SUFFIX}", "wb")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        path = self.directory / f"{self._name}{SNAPSHOT_SUFFIX}"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(snapshot))
+        os.replace(temporary, path)
+
+    def close(self) -> None:
+        """Final flush; the snapshot stays so the counters keep counting after exit."""
+        self.flush()
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Flush snapshots forever (started from the application lifespan)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                # Snapshot on the event loop, which is the only writer of the values
+                await asyncio.to_thread(self._write, self.snapshot())
+            except Exception:
+                logger.warning("Metrics flush failed", exc_info=True)
+
+    def render(self) -> str:
+        """Prometheus text exposition of all workers (or just this one)."""
+        if self.directory is None:
+            return self._render([(self.snapshot(), True)])
+        self.flush()
+        snapshots = []
+        for path in sorted(self.directory.glob(f"*{SNAPSHOT_SUFFIX}")):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            snapshots.append((snapshot, path.stem == self._name or not self._is_orphan(path)))
+        return self._render(snapshots)
+
+    @staticmethod
+    def _render(snapshots: List[Tuple[Dict[str, Any], bool]]) -> str:
+        metrics: Dict[str, Dict[str, Any]] = {}
+        samples: Dict[str, Dict[str, Any]] = {}
+        for snapshot, alive in snapshots:
+            for name, metric in snapshot["metrics"].items():
+                merged = metrics.setdefault(name, {**metric, "values": {}})
+                for entry in metric["values"]:
+                    key = tuple(entry[0])
+                    if metric["type"] == "counter":
+                        merged["values"][key] = merged["values"].get(key, 0.0) + entry[1]
+                    else:
+                        counts, total = merged["values"].get(key, ([0] * len(entry[1]), 0.0))
+                        merged["values"][key] = ([a + b for a, b in zip(counts, entry[1])], total + entry[2])
+            for name, kind, documentation, labels, value in snapshot["samples"]:
+                if kind == "gauge" and not alive:
+                    continue
+                merged = samples.setdefault(name, {"type": kind, "help": documentation, "values": {}})
+                key = tuple(sorted(labels.items()))
+                merged["values"][key] = merged["values"].get(key, 0.0) + value
+
+        lines = []
+        for name, metric in sorted(metrics.items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric["values"].items()):
+                labels = list(zip(metric["labels"], key))
+                if metric["type"] == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip([*metric["buckets"], float("inf")], counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_labels([*labels, ('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        for name, sample in sorted(samples.items()):
+            lines.append(f"# HELP {name} {sample['help']}")
+            lines.append(f"# TYPE {name} {sample['type']}")
+            for key, value in sorted(sample["values"].items()):
+                lines.append(f"{name}{_labels(list(key))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _is_orphan(path: Path) -> bool:
+        """A snapshot is orphaned when no live process holds its lock."""
+        lock_path = path.with_suffix(LOCK_SUFFIX)
+        if not lock_path.exists():
+            return True
+        with open(lock_path, "rb") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+metrics = MetricsRegistry(settings.METRICS_MULTIPROC_DIR)
+
+request_duration = metrics.histogram(
+    "ai_request_duration_seconds", "End-to-end duration of AI endpoint calls",
+    ("endpoint", "provider", "outcome"),
+)
+stage_duration = metrics.histogram(
+    "ai_stage_duration_seconds", "Duration of pipeline stages (create_run, weather, pois, prompt, llm, ...)",
+    ("endpoint", "provider", "stage", "outcome"),
+)
+llm_attempts = metrics.counter(
+    "ai_llm_attempts_total", "LLM completions by result (ok, invalid_json, invalid_schema, error)",
+    ("endpoint", "provider", "outcome"),
+)
+llm_tokens = metrics.counter(
+    "ai_llm_tokens_total", "Tokens reported by the LLM provider",
+    ("endpoint", "provider", "kind"),
+)
+fallback_plans = metrics.counter(
+    "ai_fallback_plans_total", "Plans built by the local fallback planner (reason: deadline, llm_error)",
+    ("endpoint", "provider", "reason"),
+)
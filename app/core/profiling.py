@@ -0,0 +1,162 @@
+import asyncio
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+import re
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from jose import JWTError
+
+from app.core.config import settings
+from app.core.tracing import current_trace_id
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_SUFFIX = ".prof"
+PROFILE_ID = re.compile(r"^[0-9a-f-]{32,36}$")
+
+
+class ProfileCapture:
+    """Runs created while a profiled request is served (the profile is stored under each)."""
+
+    def __init__(self):
+        self.run_ids: List[str] = []
+
+
+_current_capture: ContextVar[Optional[ProfileCapture]] = ContextVar("current_profile", default=None)
+
+
+def record_run(run_id: uuid.UUID) -> None:
+    """Attach a run to the profile of the current request, if it is being profiled."""
+    capture = _current_capture.get()
+    if capture is not None:
+        capture.run_ids.append(str(run_id))
+
+
+class ProfileStore:
+    """
+    cProfile dumps on local disk, one file per run ID (pstats format).
+
+    Only the newest PROFILING_MAX_FILES files are kept.
+    """
+
+    def __init__(self, directory: str, max_files: int = 200):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def save(self, keys: List[str], stats: Dict[Any, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = marshal.dumps(stats)
+        for key in keys:
+            path = self._path(key)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(data)
+            temporary.replace(path)
+        self._prune()
+
+    def load(self, key: str) -> Optional[bytes]:
+        if not PROFILE_ID.match(key):
+            return None
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def summary(self, key: str, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        """pstats report of a stored profile."""
+        if self.load(key) is None:
+            return None
+        stream = io.StringIO()
+        stats = pstats.Stats(str(self._path(key)), stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{PROFILE_SUFFIX}"
+
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda path: path.stat().st_mtime)
+        for path in files[:-self.max_files]:
+            path.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests with cProfile.
+
+    A request is profiled when it carries an X-Profile-Token header (a
+    service JWT, checked by the given verifier, whose claims include
+    "profile": true) or is picked by PROFILING_SAMPLE_RATE. The profile is stored under every run
+    ID created by the request (or the trace ID if it created none) and the
+    IDs are returned in the X-Profile-Id response header. Other requests
+    only pay for the header lookup.
+
+    cProfile observes the whole thread, so functions of requests running
+    concurrently on the same event loop appear in the profile too; only
+    one request per worker is profiled at a time.
+    """
+
+    def __init__(self, app, store: ProfileStore, verifier, sample_rate: float = 0.0):
+        self.app = app
+        self.store = store
+        self.verifier = verifier
+        self.sample_rate = sample_rate
+        self.active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+        if self.active:
+            await self.app(scope, receive, send)
+            return
+
+        capture = ProfileCapture()
+        token = _current_capture.set(capture)
+        profiler = cProfile.Profile()
+        keys: List[str] = []
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                keys.extend(capture.run_ids or [current_trace_id() or uuid.uuid4().hex])
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", ",".join(keys).encode())]
+            await send(message)
+
+        self.active = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.disable()
+            self.active = False
+            _current_capture.reset(token)
+        if keys:
+            profiler.create_stats()
+            try:
+                await asyncio.to_thread(self.store.save, keys, profiler.stats)
+            except OSError:
+                logger.warning("Storing profile %s failed", keys, exc_info=True)
+
+    async def _selected(self, scope) -> bool:
+        for name, value in scope.get("headers") or ():
+            if name == PROFILE_HEADER:
+                return await self._verify(value.decode("latin-1"))
+        # Only AI calls are sampled, not health checks or profile downloads
+        return scope["method"] == "POST" and bool(self.sample_rate) and random.random() < self.sample_rate
+
+    async def _verify(self, token: str) -> bool:
+        try:
+            claims = await self.verifier.verify(token)
+        except JWTError:
+            return False
+        return claims.get("profile") is True
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
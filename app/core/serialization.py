@@ -0,0 +1,61 @@
+import json
+from typing import Any, Union
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+
+def dumps_block(value: Any) -> str:
+    """
+    Pretty-printed JSON of a prompt block, laid out like
+    json.dumps(value, ensure_ascii=False, indent=2) (orjson only spells small
+    float exponents differently).
+    """
+    if orjson is not None and settings.FAST_JSON_ENABLED:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            # e.g. non-string keys or integers beyond 64 bits
+            pass
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def dumps_value(value: Any) -> bytes:
+    """Compact JSON of a cached value."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads_value(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class ModelResponse(Response):
+    """JSON response of a model serialised by pydantic-core, without validating it again."""
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.__pydantic_serializer__.to_json(content)
+
+
+def model_response(model: BaseModel) -> Union[ModelResponse, BaseModel]:
+    """
+    Response for a model the service built (and validated) itself.
+
+    FastAPI would validate it against response_model again and encode it
+    through jsonable_encoder; returning a Response skips both. With
+    FAST_JSON_ENABLED off the model is returned for the regular path.
+    """
+    return ModelResponse(model) if settings.FAST_JSON_ENABLED else model
@@ -0,0 +1,277 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Iterator
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# All-zero trace and parent IDs are invalid (W3C trace-context)
+TRACEPARENT = re.compile(r"^00-(?!0{32})([0-9a-f]{32})-(?!0{16})([0-9a-f]{16})-([0-9a-f]{2})$")
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+@dataclass
+class Span:
+    """One timed operation of a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    sampled: bool
+    kind: str = "internal"
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        """W3C traceparent header naming this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace ID of the request being served, if any."""
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Headers with the current span's traceparent added for outgoing calls."""
+    headers = dict(headers or {})
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent()
+    return headers
+
+
+class JsonlSpanExporter:
+    """Appends finished spans as JSON lines to a local file (offline use)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str, ensure_ascii=False) + "\n" for span in spans)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def close(self) -> None:
+        pass
+
+
+class OTLPHttpSpanExporter:
+    """Sends finished spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str, client: Optional[httpx.AsyncClient] = None):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.client = client or httpx.AsyncClient(timeout=5.0)
+
+    async def export(self, spans: List[Span]) -> None:
+        response = await self.client.post(self.url, json=self._payload(spans))
+        response.raise_for_status()
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "app.core.tracing"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                        "name": span.name,
+                        "kind": SPAN_KINDS.get(span.kind, 1),
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [self._attribute(key, value) for key, value in span.attributes.items()],
+                        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]}
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        return {"key": key, "value": typed}
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class Tracer:
+    """
+    Minimal in-process tracer with W3C trace context propagation.
+
+    Spans nest through a context variable, so they follow the request across
+    awaits and into tasks it creates. Sampled spans are buffered and
+    exported in batches by a background task (started from the application
+    lifespan); when the buffer is full new spans are dropped. Trace IDs are
+    generated even when nothing is exported, so runs and downstream calls
+    can still be correlated with the gateway's logs.
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0, max_queue_size: int = 10000):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.max_queue_size = max_queue_size
+        self._buffer: List[Span] = []
+        self.exported_spans = 0
+        self.dropped_spans = 0
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+        """Time a block as a child of the current span (or of an incoming traceparent)."""
+        parent = _current_span.get()
+        remote = TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+        if remote is not None:
+            trace_id, parent_id, sampled = remote.group(1), remote.group(2), bool(int(remote.group(3), 16) & 1)
+        elif parent is not None:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < self.sample_rate
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent_id,
+            sampled=sampled,
+            kind=kind,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            if span.sampled and self.exporter is not None:
+                if len(self._buffer) < self.max_queue_size:
+                    self._buffer.append(span)
+                else:
+                    self.dropped_spans += 1
+
+    async def flush(self) -> None:
+        """Export buffered spans."""
+        if not self._buffer or self.exporter is None:
+            return
+        spans, self._buffer = self._buffer, []
+        try:
+            await self.exporter.export(spans)
+            self.exported_spans += len(spans)
+        except Exception:
+            self.dropped_spans += len(spans)
+            logger.warning("Exporting %d spans failed", len(spans), exc_info=True)
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Export spans forever (started from the application lifespan)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.flush()
+
+    async def close(self) -> None:
+        await self.flush()
+        if self.exporter is not None:
+            await self.exporter.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued_spans": len(self._buffer),
+            "exported_spans": self.exported_spans,
+            "dropped_spans": self.dropped_spans,
+        }
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request from the incoming traceparent."""
+
+    def __init__(self, app, tracer: "Tracer"):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent")
+        with self.tracer.span(
+            f"{scope['method']} {scope['path']}",
+            kind="server",
+            traceparent=traceparent.decode("latin-1") if traceparent else None,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+def _exporter():
+    if settings.TRACING_EXPORTER == "jsonl":
+        return JsonlSpanExporter(settings.TRACING_JSONL_PATH)
+    if settings.TRACING_EXPORTER == "otlp":
+        return OTLPHttpSpanExporter(settings.TRACING_OTLP_ENDPOINT, settings.TRACING_SERVICE_NAME)
+    if settings.TRACING_EXPORTER != "none":
+        raise ValueError(f"Unsupported tracing exporter: {settings.TRACING_EXPORTER}")
+    return None
+
+
+tracer = Tracer(_exporter(), settings.TRACING_SAMPLE_RATE, settings.TRACING_MAX_QUEUE_SIZE)
@@ -0,0 +1 @@
+"""Local stand-ins for external dependencies, used for load testing and benchmarks."""
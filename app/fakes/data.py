@@ -0,0 +1,96 @@
+import hashlib
+import random
+from datetime import date, timedelta
+from typing import List, Optional, Dict, Any
+
+CATEGORIES = ["food", "culture", "nature", "history", "shopping", "nightlife"]
+
+# Approximate city centres; unknown cities get a deterministic pseudo-location
+CITY_CENTRES = {
+    "київ": (50.4501, 30.5234),
+    "kyiv": (50.4501, 30.5234),
+    "львів": (49.8397, 24.0297),
+    "lviv": (49.8397, 24.0297),
+    "одеса": (46.4825, 30.7233),
+    "odesa": (46.4825, 30.7233),
+    "харків": (49.9935, 36.2304),
+    "kharkiv": (49.9935, 36.2304),
+}
+
+PLACE_NAMES = {
+    "food": ["Ресторан", "Кав'ярня", "Пекарня", "Гастробар", "Бістро"],
+    "culture": ["Театр", "Галерея", "Філармонія", "Арт-центр", "Музей мистецтв"],
+    "nature": ["Парк", "Ботанічний сад", "Набережна", "Сквер", "Оглядовий майданчик"],
+    "history": ["Історичний музей", "Собор", "Замок", "Ратуша", "Старе місто"],
+    "shopping": ["Ринок", "Торговий центр", "Сувенірна крамниця", "Книгарня", "Ярмарок"],
+    "nightlife": ["Джаз-клуб", "Паб", "Лаунж-бар", "Крафтова пивоварня", "Концертна зала"],
+}
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Deterministic random generator seeded by the given parts."""
+    seed = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return random.Random(int(seed[:16], 16))
+
+
+def city_centre(city: str) -> tuple:
+    """Coordinates of the city centre."""
+    key = city.strip().lower()
+    if key in CITY_CENTRES:
+        return CITY_CENTRES[key]
+    rng = _rng("centre", key)
+    return round(rng.uniform(45.5, 51.5), 4), round(rng.uniform(23.0, 39.0), 4)
+
+
+def fake_pois(city: str, interests: Optional[List[str]] = None, count: int = 30) -> List[Dict[str, Any]]:
+    """Deterministic list of POIs for a city, biased towards the given interests."""
+    categories = [interest for interest in (interests or []) if interest in CATEGORIES] or CATEGORIES
+    lat, lng = city_centre(city)
+    rng = _rng("pois", city.strip().lower(), ",".join(sorted(categories)))
+
+    pois = []
+    for index in range(count):
+        # Food places are always available so every day can include meals
+        category = "food" if index % 3 == 0 else categories[index % len(categories)]
+        name = f"{rng.choice(PLACE_NAMES[category])} «{city} {index + 1}»"
+        pois.append({
+            "name": name,
+            "category": category,
+            "description": f"{name} — популярне місце категорії {category} у місті {city}.",
+            "lat": round(lat + rng.uniform(-0.03, 0.03), 6),
+            "lng": round(lng + rng.uniform(-0.04, 0.04), 6),
+            "price_uah": rng.choice([0, 100, 150, 250, 350, 500, 800]),
+            "rating": round(rng.uniform(3.8, 5.0), 1),
+        })
+    return pois
+
+
+def fake_weather(city: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict[str, Any]:
+    """Deterministic daily forecast for a city and date range."""
+    start = start_date or date.today()
+    end = end_date or start + timedelta(days=6)
+    forecast = []
+    day = start
+    while day <= end:
+        rng = _rng("weather", city.strip().lower(), day.isoformat())
+        forecast.append({
+            "date": day.isoformat(),
+            "temp_min": rng.randint(-5, 15),
+            "temp_max": rng.randint(16, 30),
+            "condition": rng.choice(["sunny", "cloudy", "rain", "partly_cloudy"]),
+            "precipitation_probability": rng.randint(0, 100),
+        })
+        day += timedelta(days=1)
+    return {"city": city, "forecast": forecast}
+
+
+def fake_city_info(city: str) -> Dict[str, Any]:
+    """Basic city information."""
+    lat, lng = city_centre(city)
+    return {
+        "name": city,
+        "country": "Україна",
+        "coordinates": {"lat": lat, "lng": lng},
+        "timezone": "Europe/Kyiv",
+        "currency": "UAH",
+    }
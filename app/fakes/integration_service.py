@@ -0,0 +1,57 @@
+"""
+Stub of the Integration Service weather and maps endpoints.
+
+Run it next to the recommender for load tests:
+    uvicorn app.fakes.integration_service:app --port 3003
+
+and point INTEGRATION_SERVICE_URL at http://localhost:3003/integrations.
+Responses are deterministic per city. FAKE_INTEGRATION_LATENCY_MS adds an
+artificial delay and FAKE_INTEGRATION_POI_COUNT sets the POI list size.
+"""
+import asyncio
+import os
+from datetime import date
+from typing import List, Optional
+
+from fastapi import FastAPI, APIRouter
+from pydantic import BaseModel
+
+from app.fakes.data import fake_weather, fake_pois, fake_city_info
+
+LATENCY_SECONDS = float(os.getenv("FAKE_INTEGRATION_LATENCY_MS", "20")) / 1000
+POI_COUNT = int(os.getenv("FAKE_INTEGRATION_POI_COUNT", "30"))
+
+
+class POISearchRequest(BaseModel):
+    city: str
+    interests: List[str] = []
+
+
+router = APIRouter(prefix="/integrations")
+
+
+async def _simulate_latency() -> None:
+    if LATENCY_SECONDS > 0:
+        await asyncio.sleep(LATENCY_SECONDS)
+
+
+@router.get("/weather/city")
+async def weather_city(city: str, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    await _simulate_latency()
+    return {"data": fake_weather(city, start_date, end_date)}
+
+
+@router.post("/maps/pois")
+async def maps_pois(request: POISearchRequest):
+    await _simulate_latency()
+    return {"data": fake_pois(request.city, request.interests, POI_COUNT)}
+
+
+@router.get("/maps/city")
+async def maps_city(city: str):
+    await _simulate_latency()
+    return {"data": fake_city_info(city)}
+
+
+app = FastAPI(title="Fake Integration Service")
+app.include_router(router)
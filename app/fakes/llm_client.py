@@ -0,0 +1,270 @@
+import asyncio
+import json
+import random
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Tuple, Optional, Dict, Any, List
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.fakes.data import fake_pois
+from app.schemas.response import TripPlan, ExplainResponse, ExplainAnswers, QuestionAnswer, ImproveResponse
+from app.services.llm_clients import BaseLLMClient, LLMUsage
+
+# Meal slots and sightseeing slots of a generated day: (start_time, duration, is_meal)
+DAY_SLOTS = [
+    ("09:00", 60, True),
+    ("10:30", 120, False),
+    ("13:00", 60, True),
+    ("14:30", 150, False),
+    ("19:00", 90, True),
+]
+
+
+def build_trip_plan(city: str, duration_days: int, pois: List[Dict[str, Any]]) -> TripPlan:
+    """Schema-valid plan with meals and sightseeing slots filled from the POIs."""
+    meals = [poi for poi in pois if poi.get("category") == "food"] or pois
+    sights = [poi for poi in pois if poi.get("category") != "food"] or pois
+    items = []
+    counters = {True: 0, False: 0}
+
+    for day_index in range(1, duration_days + 1):
+        for order_index, (start_time, duration, is_meal) in enumerate(DAY_SLOTS, start=1):
+            source = meals if is_meal else sights
+            poi = source[counters[is_meal] % len(source)]
+            counters[is_meal] += 1
+            name = str(poi.get("name") or poi.get("title") or f"Місце {order_index}")[:200]
+            coordinates = None
+            if poi.get("lat") is not None and poi.get("lng") is not None:
+                coordinates = {"lat": poi["lat"], "lng": poi["lng"]}
+            items.append({
+                "day_index": day_index,
+                "order_index": order_index,
+                "title": f"Відвідування: {name}"[:200],
+                "description": f"Час у місці {name}, {city}. Рекомендуємо не поспішати."[:1000],
+                "place_name": name if len(name) >= 2 else f"{name} {city}",
+                "coordinates": coordinates,
+                "estimated_cost": float(poi.get("price_uah") or 0),
+                "duration_minutes": duration,
+                "start_time": start_time,
+                "category": poi.get("category") or ("food" if is_meal else "culture"),
+                "rationale": f"Обрано за рейтингом {poi.get('rating', 'високим')} та близькістю до маршруту."[:500],
+            })
+
+    return TripPlan(
+        title=f"Подорож до {city} на {duration_days} дн."[:200],
+        summary=f"Насичений маршрут містом {city}: гастрономія, культура та прогулянки на {duration_days} дн.",
+        destination=city,
+        total_budget_estimate=sum(item["estimated_cost"] for item in items),
+        currency="UAH",
+        duration_days=duration_days,
+        itinerary=items,
+        tags=["Культурний", "Гастрономічний", "Міський"],
+        tips=["Носіть зручне взуття", "Бронюйте столики заздалегідь"],
+    )
+
+
+@lru_cache(maxsize=8)
+def load_templates(template_dir: Optional[str]) -> Dict[str, str]:
+    """
+    Fixed response templates (recommend.json, explain.json, improve.json),
+    validated against the response schemas. Read once per directory and
+    shared by every client, so requests do no file I/O.
+    """
+    if not template_dir:
+        return {}
+    schemas = {"recommend": TripPlan, "explain": ExplainResponse, "improve": ImproveResponse}
+    templates = {}
+    for kind, schema in schemas.items():
+        path = Path(template_dir) / f"{kind}.json"
+        if path.exists():
+            content = path.read_text(encoding="utf-8")
+            schema.model_validate_json(content)
+            templates[kind] = content
+    return templates
+
+
+class FakeLLMError(RuntimeError):
+    """Injected provider failure."""
+
+    status_code = 500
+
+
+class FakeLLMRateLimitError(FakeLLMError):
+    """Injected provider rate limit (HTTP 429)."""
+
+    status_code = 429
+
+
+class FakeLLMClient(BaseLLMClient):
+    """
+    Local LLM stand-in for load testing.
+
+    Produces schema-valid recommendations, explanations and improvements
+    from the prompt content, with configurable latency distribution, token
+    rate and error/429/invalid-JSON injection (FAKE_LLM_* settings).
+    """
+
+    def __init__(self, model: str = "fake-travel-planner", seed: Optional[int] = None):
+        self.model_name = model
+        self.random = random.Random(seed)
+        self.templates = load_templates(settings.FAKE_LLM_TEMPLATE_DIR)
+
+    async def generate(self, system_prompt: str, user_prompt: str, json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, LLMUsage]:
+        started = time.perf_counter()
+        ttft = self._sample_ttft_seconds()
+
+        roll = self.random.random()
+        if roll < settings.FAKE_LLM_RATE_LIMIT_RATE:
+            await asyncio.sleep(ttft / 4)
+            raise FakeLLMRateLimitError("Fake provider rate limit exceeded")
+        if roll < settings.FAKE_LLM_RATE_LIMIT_RATE + settings.FAKE_LLM_ERROR_RATE:
+            await asyncio.sleep(ttft)
+            raise FakeLLMError("Fake provider internal error")
+
+        content = self._render(system_prompt, user_prompt)
+        if self.random.random() < settings.FAKE_LLM_INVALID_JSON_RATE:
+            content = content[: len(content) // 2]
+
+        completion_tokens = max(1, len(content) // 4)
+        await asyncio.sleep(ttft)
+        first_token = time.perf_counter()
+        if settings.FAKE_LLM_TOKENS_PER_SECOND > 0:
+            await asyncio.sleep(completion_tokens / settings.FAKE_LLM_TOKENS_PER_SECOND)
+
+        usage = LLMUsage(
+            model=self.model_name,
+            prompt_tokens=(len(system_prompt) + len(user_prompt)) // 4,
+            completion_tokens=completion_tokens,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            ttft_ms=int((first_token - started) * 1000),
+            finish_reason="stop",
+        )
+        return content, usage
+
+    def _sample_ttft_seconds(self) -> float:
+        """Sample time to first token from the configured distribution."""
+        mean = settings.FAKE_LLM_TTFT_MS
+        spread = settings.FAKE_LLM_TTFT_SPREAD
+        distribution = settings.FAKE_LLM_LATENCY_DISTRIBUTION
+
+        if distribution == "fixed":
+            value = mean
+        elif distribution == "uniform":
+            value = self.random.uniform(mean * (1 - spread), mean * (1 + spread))
+        elif distribution == "normal":
+            value = self.random.gauss(mean, mean * spread)
+        elif distribution == "lognormal":
+            # mean is the median, spread is sigma of the underlying normal
+            value = self.random.lognormvariate(0, spread) * mean
+        else:
+            raise ValueError(f"Unsupported fake latency distribution: {distribution}")
+        return max(value, 0) / 1000
+
+    def _render(self, system_prompt: str, user_prompt: str) -> str:
+        """Render a response matching the kind of prompt."""
+        if "improving itineraries" in system_prompt:
+            kind = "improve"
+        elif "explaining itinerary" in system_prompt:
+            kind = "explain"
+        else:
+            kind = "recommend"
+
+        if kind in self.templates:
+            return self.templates[kind]
+        if kind == "improve":
+            return self._render_improvement(user_prompt)
+        if kind == "explain":
+            if "You have already explained this itinerary" in user_prompt:
+                return ExplainAnswers(answers=self._answers(user_prompt)).model_dump_json()
+            return self._render_explanation(user_prompt)
+        return self._render_plan(user_prompt)
+
+    def _render_plan(self, user_prompt: str) -> str:
+        city = self._field(user_prompt, "Destination city") or "Київ"
+        duration_days = int(self._field(user_prompt, "Duration", r"(\d+)") or 1)
+        pois = self._json_after(user_prompt, "AVAILABLE PLACES") or fake_pois(city)
+        return build_trip_plan(city, min(max(duration_days, 1), 15), pois).model_dump_json()
+
+    def _render_explanation(self, user_prompt: str) -> str:
+        plan = self._json_after(user_prompt, "Explain this travel itinerary:") or {}
+        destination = plan.get("destination", "місто")
+        titles = [item.get("title", "") for item in plan.get("itinerary", [])][:5]
+
+        response = ExplainResponse(
+            explanation=(
+                f"Маршрут у {destination} поєднує ключові місця з урахуванням ваших інтересів, "
+                f"логістики між локаціями та бюджету."
+            ),
+            highlights=[title for title in titles if title] or ["Збалансований маршрут"],
+            answers=self._answers(user_prompt),
+        )
+        return response.model_dump_json()
+
+    @staticmethod
+    def _answers(user_prompt: str) -> List[QuestionAnswer]:
+        """One canned answer per numbered line of the USER QUESTIONS section."""
+        _, _, rest = user_prompt.partition("USER QUESTIONS:")
+        answers = []
+        for line in rest.splitlines():
+            match = re.match(r"\s*\d+\.\s+(.+)", line)
+            if match is None:
+                if answers:
+                    break
+                continue
+            question = match.group(1).strip()
+            answers.append(QuestionAnswer(
+                question=question,
+                answer=f"Відповідь на питання «{question}»: вибір зроблено з огляду на рейтинг, "
+                       f"розташування та вартість.",
+            ))
+        return answers
+
+    def _render_improvement(self, user_prompt: str) -> str:
+        request = self._section(user_prompt, "IMPROVEMENT REQUEST:") or "покращення"
+        try:
+            plan = TripPlan.model_validate(self._json_after(user_prompt, "CURRENT ITINERARY:"))
+        except ValidationError:
+            plan = build_trip_plan("Київ", 1, fake_pois("Київ"))
+
+        response = ImproveResponse(
+            improved_plan=plan,
+            changes_made=[f"Враховано побажання: {request[:200]}"],
+            improvement_summary="Маршрут оновлено відповідно до запиту.",
+        )
+        return response.model_dump_json()
+
+    @staticmethod
+    def _field(prompt: str, label: str, value_pattern: str = r"(.+)") -> Optional[str]:
+        """Value of a '- Label: value' or 'LABEL: value' line."""
+        match = re.search(rf"{re.escape(label)}:\s*{value_pattern}", prompt)
+        return match.group(1).strip() if match else None
+
+    @staticmethod
+    def _section(prompt: str, header: str) -> Optional[str]:
+        """First non-empty line after a section header."""
+        _, found, rest = prompt.partition(header)
+        if not found:
+            return None
+        for line in rest.splitlines():
+            if line.strip():
+                return line.strip()
+        return None
+
+    @staticmethod
+    def _json_after(prompt: str, marker: str) -> Any:
+        """Decode the first JSON value that follows the marker."""
+        position = prompt.find(marker)
+        if position < 0:
+            return None
+        starts = [index for index in (prompt.find("{", position), prompt.find("[", position)) if index >= 0]
+        if not starts:
+            return None
+        try:
+            value, _ = json.JSONDecoder().raw_decode(prompt, min(starts))
+        except json.JSONDecodeError:
+            return None
+        return value
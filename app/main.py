@@ -1,7 +1,73 @@
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.database import engine, telemetry_engine, TelemetrySessionLocal
+from app.core.metrics import metrics, CONTENT_TYPE
+from app.core.profiling import ProfilingMiddleware, profile_store
+from app.core.tracing import tracer, TracingMiddleware
+from app.services.auth import token_verifier
+from app.services.explain_router import question_router
+from app.services.integration_client import integration_client
+from app.services.metrics import service_samples, TIERED_CACHES
+from app.services.plan_editor import plan_editor
+from app.services.quotas import quota_tracker
+from app.services.readiness import readiness
+from app.services.rollups import TelemetryRollupService
+from app.services.shared_cache import cache_store
+from app.services.telemetry_writer import telemetry_writer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up dependencies, start background workers and flush telemetry on shutdown."""
+    # Closed again on shutdown; reopened so a later lifespan in the same process can use it
+    integration_client.open()
+    if settings.WARMUP_ENABLED:
+        await readiness.warm_up()
+    else:
+        readiness.warmed_up = True
+    telemetry_writer.start()
+    tasks = []
+    if settings.ROLLUP_ENABLED:
+        rollup = TelemetryRollupService(TelemetrySessionLocal)
+        tasks.append(asyncio.create_task(rollup.run_periodically(settings.ROLLUP_INTERVAL_SECONDS)))
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROC_DIR:
+        tasks.append(asyncio.create_task(metrics.run_periodically(settings.METRICS_FLUSH_INTERVAL_SECONDS)))
+    if settings.CACHE_ENABLED and settings.CACHE_L2_ENABLED:
+        tasks.append(asyncio.create_task(cache_store.run_periodically(settings.CACHE_PURGE_INTERVAL_SECONDS)))
+    if settings.QUOTA_ENABLED:
+        tasks.append(asyncio.create_task(quota_tracker.run_periodically(settings.QUOTA_SYNC_INTERVAL_SECONDS)))
+    if token_verifier.key_set is not None:
+        tasks.append(asyncio.create_task(
+            token_verifier.key_set.run_periodically(settings.JWT_JWKS_REFRESH_INTERVAL_SECONDS)
+        ))
+    if tracer.exporter is not None:
+        tasks.append(asyncio.create_task(tracer.run_periodically(settings.TRACING_EXPORT_INTERVAL_SECONDS)))
+    yield
+    for task in tasks:
+        task.cancel()
+    await telemetry_writer.stop()
+    if settings.QUOTA_ENABLED:
+        await quota_tracker.close()
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROC_DIR:
+        metrics.close()
+    await tracer.close()
+    await integration_client.close()
+    if token_verifier.key_set is not None:
+        await token_verifier.key_set.client.aclose()
+    await engine.dispose()
+    await telemetry_engine.dispose()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -10,6 +76,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/recommender/docs" if settings.DEBUG else None,
     redoc_url="/recommender/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # CORS middleware (for internal service communication)
@@ -21,15 +88,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        verifier=token_verifier,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+    )
+
+# Root span per request, continuing the caller's W3C traceparent
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 
 from app.api.routes import router as api_router
 
 # Include API router
 app.include_router(api_router)
 
+# Import of the application and everything it pulls in (SDKs are imported during warm-up)
+readiness.import_seconds = round(time.perf_counter() - _import_started, 3)
+
 
 @app.get("/recommender/health", tags=["Health"])
 async def health_check():
     """Health check endpoint for service monitoring."""
-    return {"status": "ok", "service": "ai-recommender-service"}
+    return {
+        "status": "ok",
+        "service": "ai-recommender-service",
+        "telemetry": telemetry_writer.stats(),
+        "explain_router": question_router.stats(),
+        "plan_editor": plan_editor.stats(),
+        "tracing": tracer.stats(),
+        "auth": token_verifier.stats(),
+        "quotas": quota_tracker.stats(),
+        "shared_caches": {name: cache.stats() for name, cache in TIERED_CACHES.items()},
+    }
+
+
+@app.get("/recommender/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness probe: warm-up finished and Postgres, Integration Service and LLM client reachable."""
+    result = await readiness.check()
+    return JSONResponse(result, status_code=200 if result["status"] == "ready" else 503)
+
+
+
+if settings.METRICS_ENABLED:
+    metrics.register_collector(service_samples)
 
+    @app.get("/recommender/metrics", tags=["Health"], response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        """Prometheus metrics of all workers (text exposition format)."""
+        return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -1,4 +1,10 @@
-from app.models.ai_runs import AIRun
+from app.models.ai_runs import AIRun, AIRunPayload
+from app.models.cache_entries import CacheEntry
+from app.models.pregenerated_plans import PregeneratedPlan
+from app.models.prompt_blocks import PromptBlock
+from app.models.quotas import QuotaUsage
+from app.models.rollups import AIRunRollup, RollupWatermark
+from app.models.trip_plans import TripPlanRecord
 from app.core.constants import LLMProvider, AIRunStatus
 
-__all__ = ["AIRun", "LLMProvider", "AIRunStatus"]
+__all__ = ["AIRun", "AIRunPayload", "CacheEntry", "PregeneratedPlan", "PromptBlock", "QuotaUsage", "AIRunRollup", "RollupWatermark", "TripPlanRecord", "LLMProvider", "AIRunStatus"]
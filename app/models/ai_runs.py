@@ -1,34 +1,80 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM, ARRAY
 
 from app.core.database import Base
 from app.core.constants import LLMProvider, AIRunStatus
 
 # PostgreSQL ENUM types with schema
-llm_provider_enum = ENUM('openai', 'gemini', 'anthropic', name='llmprovider', schema='integration', create_type=False)
+llm_provider_enum = ENUM('openai', 'gemini', 'anthropic', 'fake', name='llmprovider', schema='integration', create_type=False)
 ai_run_status_enum = ENUM('pending', 'completed', 'failed', name='airunstatus', schema='integration', create_type=False)
 
 
 class AIRun(Base):
-    """Model for logging AI interactions to integration.ai_runs table."""
+    """
+    Model for logging AI interactions to integration.ai_runs table.
+
+    The table is range-partitioned by month on created_at (see
+    app.services.partitions), so created_at is part of the primary key and
+    every update addresses a run by (id, created_at). Prompt and response
+    payloads live in AIRunPayload.
+    """
     
     __tablename__ = "ai_runs"
-    __table_args__ = {"schema": "integration"}
+    __table_args__ = (
+        Index("ix_ai_runs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_ai_runs_trip_id_created_at", "trip_id", "created_at", postgresql_where=text("trip_id IS NOT NULL")),
+        Index("ix_ai_runs_pending_created_at", "created_at", postgresql_where=text("status = 'pending'")),
+        Index("ix_ai_runs_created_at_brin", "created_at", postgresql_using="brin"),
+        Index("ix_ai_runs_trace_id", "trace_id", postgresql_where=text("trace_id IS NOT NULL")),
+        {"schema": "integration", "postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
-    trip_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    trip_id = Column(UUID(as_uuid=True), nullable=True)
     provider = Column(llm_provider_enum, nullable=False)
-    prompt = Column(Text, nullable=False)
-    response = Column(JSONB, nullable=True)
     tokens_used = Column(Integer, nullable=True)
+    endpoint = Column(String(32), nullable=True)
+    model = Column(String(100), nullable=True)
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    cached_tokens = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=True)
+    ttft_ms = Column(Integer, nullable=True)
+    finish_reason = Column(String(32), nullable=True)
+    retry_count = Column(Integer, nullable=True)
     status = Column(ai_run_status_enum, server_default='pending', nullable=False)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    source = Column(String(32), server_default='llm', nullable=False)
+    trace_id = Column(String(32), nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
         return f"<AIRun(id={self.id}, user_id={self.user_id}, status={self.status})>"
+
+
+class AIRunPayload(Base):
+    """
+    Prompt and response of an AI run in integration.ai_run_payloads.
+
+    Kept out of ai_runs so scans and index lookups on run metadata never
+    touch the large text/JSONB values; read only when a payload is needed.
+    Partitioned like ai_runs so retention drops both together.
+    """
+
+    __tablename__ = "ai_run_payloads"
+    __table_args__ = {"schema": "integration", "postgresql_partition_by": "RANGE (created_at)"}
+
+    run_id = Column(UUID(as_uuid=True), primary_key=True)
+    created_at = Column(DateTime, primary_key=True)
+    prompt = Column(Text, nullable=False)
+    response = Column(JSONB(none_as_null=True), nullable=True)
+    # Hashes of integration.prompt_blocks: system prompt first, then the user prompt pieces in order
+    prompt_blocks = Column(ARRAY(String(64)), nullable=True)
+
+    def __repr__(self):
+        return f"<AIRunPayload(run_id={self.run_id})>"
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, LargeBinary
+
+from app.core.database import Base
+
+
+class CacheEntry(Base):
+    """
+    Shared (L2) cache entry in integration.cache_entries.
+
+    The table is UNLOGGED: writes skip the WAL and it is emptied after a
+    crash, which is fine for a cache. Keys carry their namespace and
+    version (see app.services.shared_cache).
+    """
+    
+    __tablename__ = "cache_entries"
+    __table_args__ = {"schema": "integration", "prefixes": ["UNLOGGED"]}
+    
+    key = Column(String(512), primary_key=True)
+    compression = Column(String(16), nullable=False)
+    value = Column(LargeBinary, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<CacheEntry(key={self.key}, expires_at={self.expires_at})>"
@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+
+from app.core.database import Base
+from app.models.ai_runs import llm_provider_enum
+
+
+class PregeneratedPlan(Base):
+    """Model for offline pre-generated itineraries in integration.pregenerated_plans table."""
+    
+    __tablename__ = "pregenerated_plans"
+    __table_args__ = {"schema": "integration"}
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    catalogue_key = Column(String(512), nullable=False, unique=True)
+    city = Column(String(100), nullable=False)
+    duration_days = Column(Integer, nullable=False)
+    interests = Column(ARRAY(String), nullable=False)
+    budget_band = Column(String(16), nullable=False)
+    plan = Column(JSONB, nullable=False)
+    provider = Column(llm_provider_enum, nullable=False)
+    tokens_used = Column(Integer, nullable=True)
+    generated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<PregeneratedPlan(key={self.catalogue_key}, expires_at={self.expires_at})>"
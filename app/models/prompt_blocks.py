@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+
+from app.core.database import Base
+
+
+class PromptBlock(Base):
+    """
+    Content-addressed prompt fragment in integration.prompt_blocks table.
+
+    Blocks are keyed by the SHA-256 of their text and stored compressed, so
+    system prompts and shared context (POIs, weather, plans) are kept once
+    no matter how many runs used them.
+    """
+    
+    __tablename__ = "prompt_blocks"
+    __table_args__ = {"schema": "integration"}
+    
+    hash = Column(String(64), primary_key=True)
+    kind = Column(String(16), nullable=False)
+    compression = Column(String(16), nullable=False)
+    content = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<PromptBlock(hash={self.hash}, kind={self.kind}, size={self.size})>"
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, BigInteger, DateTime
+
+from app.core.database import Base
+
+
+class QuotaUsage(Base):
+    """
+    Usage of one quota window in integration.quota_usage, summed over all
+    workers (see app.services.quotas).
+    """
+    
+    __tablename__ = "quota_usage"
+    __table_args__ = {"schema": "integration"}
+    
+    subject = Column(String(128), primary_key=True)
+    metric = Column(String(16), primary_key=True)
+    window_start = Column(DateTime, primary_key=True)
+    used = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<QuotaUsage(subject={self.subject}, metric={self.metric}, window_start={self.window_start}, used={self.used})>"
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.database import Base
+
+
+class AIRunRollup(Base):
+    """
+    Hourly pre-aggregated ai_runs statistics in integration.ai_run_rollups_hourly.
+
+    One row per (hour, provider, endpoint, source). Latency and TTFT are kept
+    as fixed-bound histograms (see app.services.rollups) that can be summed
+    across rows to estimate percentiles for any time range.
+    """
+    
+    __tablename__ = "ai_run_rollups_hourly"
+    __table_args__ = {"schema": "integration"}
+    
+    bucket_start = Column(DateTime, primary_key=True)
+    provider = Column(String(32), primary_key=True)
+    endpoint = Column(String(32), primary_key=True)
+    source = Column(String(32), primary_key=True)
+    run_count = Column(BigInteger, nullable=False)
+    failed_count = Column(BigInteger, nullable=False)
+    tokens_used = Column(BigInteger, nullable=False)
+    prompt_tokens = Column(BigInteger, nullable=False)
+    completion_tokens = Column(BigInteger, nullable=False)
+    cached_tokens = Column(BigInteger, nullable=False)
+    latency_count = Column(BigInteger, nullable=False)
+    latency_sum_ms = Column(BigInteger, nullable=False)
+    latency_histogram = Column(ARRAY(Integer), nullable=False)
+    ttft_histogram = Column(ARRAY(Integer), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<AIRunRollup(bucket_start={self.bucket_start}, provider={self.provider}, endpoint={self.endpoint})>"
+
+
+class RollupWatermark(Base):
+    """Position up to which a rollup job has aggregated its source rows."""
+    
+    __tablename__ = "rollup_watermarks"
+    __table_args__ = {"schema": "integration"}
+    
+    name = Column(String(64), primary_key=True)
+    watermark = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RollupWatermark(name={self.name}, watermark={self.watermark})>"
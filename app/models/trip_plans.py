@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.core.database import Base
+
+
+class TripPlanRecord(Base):
+    """Latest plan of a trip in integration.trip_plans table."""
+    
+    __tablename__ = "trip_plans"
+    __table_args__ = {"schema": "integration"}
+    
+    trip_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    version = Column(String(64), nullable=False)
+    plan = Column(JSONB, nullable=False)
+    source = Column(String(32), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<TripPlanRecord(trip_id={self.trip_id}, version={self.version[:12]})>"
@@ -1,6 +1,7 @@
 """Schemas module - Pydantic models for request/response validation."""
 from app.schemas.request import (
     RecommendationRequest,
+    BatchRecommendationRequest,
     ExplainRequest,
     ImproveRequest,
     UserPreferences,
@@ -8,23 +9,34 @@ from app.schemas.request import (
 )
 from app.schemas.response import (
     TripPlan,
+    BatchRecommendationItem,
     ItineraryItem,
     GeoCoordinates,
     ExplainResponse,
+    ExplainAnswers,
+    QuestionAnswer,
     ImproveResponse,
+    AIStatsItem,
+    AIStatsResponse,
 )
 
 __all__ = [
     # Request schemas
     "RecommendationRequest",
+    "BatchRecommendationRequest",
     "ExplainRequest", 
     "ImproveRequest",
     "UserPreferences",
     "TripConstraints",
     # Response schemas
     "TripPlan",
+    "BatchRecommendationItem",
     "ItineraryItem",
     "GeoCoordinates",
     "ExplainResponse",
+    "ExplainAnswers",
+    "QuestionAnswer",
     "ImproveResponse",
+    "AIStatsItem",
+    "AIStatsResponse",
 ]
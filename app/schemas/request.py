@@ -99,6 +99,10 @@ class RecommendationRequest(BaseModel):
     )
     user_profile: UserPreferences
     constraints: TripConstraints
+    trip_id: Optional[UUID] = Field(
+        default=None,
+        description="Trip UUID to store the generated plan under, so /explain and /improve can refer to it by trip_id"
+    )
     timezone: str = Field(
         default="Europe/Kyiv",
         description="User timezone",
@@ -129,18 +133,52 @@ class RecommendationRequest(BaseModel):
     }
 
 
+class BatchRecommendationRequest(BaseModel):
+    """Request model for generating many travel itineraries at once."""
+    
+    items: List[RecommendationRequest] = Field(
+        ...,
+        min_length=1,
+        description="Recommendation requests to process in one batch"
+    )
+
+
 class ExplainRequest(BaseModel):
     """Request model for explaining a trip plan."""
     
     user_id: UUID = Field(..., description="User UUID")
     trip_id: UUID = Field(..., description="Trip UUID to explain")
-    trip_plan: dict = Field(..., description="Trip plan JSON to explain")
+    trip_plan: Optional[dict] = Field(
+        default=None,
+        description="Trip plan JSON to explain (optional, defaults to the stored plan of trip_id)"
+    )
     question: Optional[str] = Field(
         default=None,
         description="Specific question about the trip",
         max_length=500,
         examples=["Чому обрано саме цей ресторан?"]
     )
+    questions: List[str] = Field(
+        default=[],
+        max_length=10,
+        description="Several questions answered in one completion (combined with question)",
+        examples=[["Чому обрано саме цей ресторан?", "Чи встигнемо ми все за день?"]]
+    )
+
+    @field_validator("questions")
+    @classmethod
+    def validate_questions(cls, v: List[str]) -> List[str]:
+        """Strip questions, drop empty ones and limit their length."""
+        questions = [question.strip() for question in v if question.strip()]
+        if any(len(question) > 500 for question in questions):
+            raise ValueError("each question must be at most 500 characters")
+        return questions
+
+    @property
+    def all_questions(self) -> List[str]:
+        """question followed by questions, without duplicates."""
+        combined = ([self.question.strip()] if self.question and self.question.strip() else []) + self.questions
+        return list(dict.fromkeys(combined))
 
 
 class PartialTripConstraints(BaseModel):
@@ -160,9 +198,9 @@ class ImproveRequest(BaseModel):
     
     user_id: UUID = Field(..., description="User UUID")
     trip_id: UUID = Field(..., description="Trip UUID to improve")
-    current_plan: dict = Field(
-        ...,
-        description="Current trip plan JSON"
+    current_plan: Optional[dict] = Field(
+        default=None,
+        description="Current trip plan JSON (optional, defaults to the stored plan of trip_id)"
     )
     improvement_request: str = Field(
         ...,
@@ -1,7 +1,7 @@
 """Response schemas for AI Recommender Service."""
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, date
 
 
 class GeoCoordinates(BaseModel):
@@ -121,6 +121,10 @@ class TripPlan(BaseModel):
         default=None,
         description="Travel tips for this trip"
     )
+    is_fallback: bool = Field(
+        default=False,
+        description="Built by the local fallback planner because the LLM could not answer in time"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -155,6 +159,39 @@ class TripPlan(BaseModel):
     }
 
 
+class BatchRecommendationItem(BaseModel):
+    """Single streamed result of the /recommend/batch endpoint."""
+    
+    index: int = Field(
+        ...,
+        ge=0,
+        description="Position of the item in the batch request"
+    )
+    user_id: str = Field(
+        ...,
+        description="User UUID of the batch item"
+    )
+    status: str = Field(
+        ...,
+        description="Item status: completed or failed"
+    )
+    trip_plan: Optional[TripPlan] = Field(
+        default=None,
+        description="Generated trip plan (if completed)"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error message (if failed)"
+    )
+
+
+class QuestionAnswer(BaseModel):
+    """Answer to one user question about a trip plan."""
+    
+    question: str = Field(..., description="User question")
+    answer: str = Field(..., description="Answer to the question")
+
+
 class ExplainResponse(BaseModel):
     """Response for /explain endpoint."""
     
@@ -166,9 +203,22 @@ class ExplainResponse(BaseModel):
         default=[],
         description="Key highlights of the plan"
     )
+    answers: List[QuestionAnswer] = Field(
+        default=[],
+        description="Answers to the user questions, in request order"
+    )
     answered_question: Optional[str] = Field(
         default=None,
-        description="Answer to specific user question if provided"
+        description="Answer to the first user question (kept for single-question clients)"
+    )
+
+
+class ExplainAnswers(BaseModel):
+    """LLM output for follow-up questions about an already explained plan."""
+    
+    answers: List[QuestionAnswer] = Field(
+        default=[],
+        description="Answers to the user questions, in request order"
     )
 
 
@@ -187,3 +237,37 @@ class ImproveResponse(BaseModel):
         ...,
         description="Summary of improvements"
     )
+
+
+class AIStatsItem(BaseModel):
+    """Aggregated AI run statistics of one day, provider and endpoint."""
+    
+    day: date = Field(..., description="Day (UTC) the runs finished")
+    provider: str = Field(..., description="LLM provider")
+    endpoint: Optional[str] = Field(default=None, description="API endpoint (recommend, explain, ...)")
+    run_count: int = Field(..., description="Finished runs")
+    failed_count: int = Field(..., description="Failed runs")
+    failure_rate: float = Field(..., description="failed_count / run_count")
+    tokens_used: int = Field(..., description="Total tokens")
+    prompt_tokens: int = Field(..., description="Prompt tokens")
+    completion_tokens: int = Field(..., description="Completion tokens")
+    cached_tokens: int = Field(..., description="Cached prompt tokens")
+    latency_avg_ms: Optional[float] = Field(default=None, description="Mean LLM latency")
+    latency_p50_ms: Optional[float] = Field(default=None, description="Estimated median LLM latency")
+    latency_p95_ms: Optional[float] = Field(default=None, description="Estimated 95th percentile LLM latency")
+    latency_p99_ms: Optional[float] = Field(default=None, description="Estimated 99th percentile LLM latency")
+    ttft_p50_ms: Optional[float] = Field(default=None, description="Estimated median time to first token")
+    ttft_p95_ms: Optional[float] = Field(default=None, description="Estimated 95th percentile time to first token")
+
+
+class AIStatsResponse(BaseModel):
+    """Response for /stats endpoint."""
+    
+    items: List[AIStatsItem] = Field(
+        default=[],
+        description="Statistics per day, provider and endpoint"
+    )
+    up_to: Optional[datetime] = Field(
+        default=None,
+        description="Runs finished up to this time (UTC) are included"
+    )
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Optional, Dict, Any
+
+import httpx
+from jose import jwt, JWTError
+
+from app.core.config import settings
+from app.services.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeySet:
+    """
+    Public keys of a JWKS endpoint, cached locally by key ID.
+
+    refresh() is called from a background task; an unknown kid triggers one
+    inline refresh at most every JWT_JWKS_MIN_REFRESH_SECONDS, so a key
+    rotation is picked up without letting bad tokens hammer the endpoint.
+    """
+
+    def __init__(self, url: str, client: Optional[httpx.AsyncClient] = None):
+        self.url = url
+        self.client = client or httpx.AsyncClient(timeout=5.0)
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = self._find(kid)
+        if key is None and self._refreshable():
+            try:
+                await self.refresh(only_if_refreshable=True)
+            except httpx.HTTPError:
+                logger.warning("JWKS refresh from %s failed", self.url, exc_info=True)
+                return None
+            key = self._find(kid)
+        return key
+
+    async def refresh(self, only_if_refreshable: bool = False) -> int:
+        """Fetch the key set; returns the number of keys."""
+        async with self._lock:
+            # Concurrent misses for the same new kid share one fetch
+            if only_if_refreshable and not self._refreshable():
+                return len(self.keys)
+            self.refreshed_at = time.monotonic()
+            response = await self.client.get(self.url)
+            response.raise_for_status()
+            self.keys = {key.get("kid", ""): key for key in response.json()["keys"] if key.get("use", "sig") == "sig"}
+            self.refreshes += 1
+            return len(self.keys)
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Refresh the key set forever (started from the application lifespan)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.warning("JWKS refresh from %s failed; keeping %d cached keys", self.url, len(self.keys), exc_info=True)
+
+    def _refreshable(self) -> bool:
+        return time.monotonic() - self.refreshed_at >= settings.JWT_JWKS_MIN_REFRESH_SECONDS
+
+    def _find(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        if kid is not None:
+            return self.keys.get(kid)
+        # Tokens without a kid are only accepted from single-key sets
+        return next(iter(self.keys.values())) if len(self.keys) == 1 else None
+
+
+class TokenVerifier:
+    """
+    Verifies service JWTs and remembers verified ones.
+
+    Tokens are keyed by SHA-256 and kept until their exp (at most
+    JWT_CACHE_TTL_SECONDS), so a service token reused for thousands of
+    calls is verified once. Only successfully verified tokens are cached;
+    nbf/exp are checked by the full verification before caching. HS*
+    tokens use JWT_SECRET_KEY; with JWT_JWKS_URL set, tokens are verified
+    against the cached JWKS key named by their kid.
+    """
+
+    def __init__(self, key_set: Optional[JWKSKeySet] = None, cache: Optional[LRUCache[Dict[str, Any]]] = None):
+        self.key_set = key_set
+        self.cache = cache or LRUCache(settings.JWT_CACHE_SIZE)
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Claims of a valid token; raises JWTError otherwise."""
+        cache_key = hashlib.sha256(token.encode()).digest()
+        claims = self.cache.get(cache_key)
+        if claims is not None:
+            return claims
+
+        claims = jwt.decode(token, await self._key(token), algorithms=[settings.JWT_ALGORITHM])
+        ttl = settings.JWT_CACHE_TTL_SECONDS
+        if "exp" in claims:
+            ttl = min(ttl, float(claims["exp"]) - time.time())
+        if ttl > 0:
+            self.cache.set(cache_key, claims, ttl_seconds=ttl)
+        return claims
+
+    async def _key(self, token: str):
+        if self.key_set is None:
+            return settings.JWT_SECRET_KEY
+        header = jwt.get_unverified_header(token)
+        key = await self.key_set.get(header.get("kid"))
+        if key is None:
+            raise JWTError(f"Unknown signing key: {header.get('kid')}")
+        return key
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"cache": self.cache.stats()}
+        if self.key_set is not None:
+            stats["jwks_keys"] = len(self.key_set.keys)
+            stats["jwks_refreshes"] = self.key_set.refreshes
+        return stats
+
+
+token_verifier = TokenVerifier(JWKSKeySet(settings.JWT_JWKS_URL) if settings.JWT_JWKS_URL else None)
@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.response import TripPlan
+from app.services.cache import LRUCache
+from app.services.prompts import PromptBuilder, EXPLAIN_TEMPLATES_VERSION
+from app.services.shared_cache import TieredCache
+from app.services.trip_plans import StoredTripPlan
+
+# (trip_id, plan version, language)
+ExplainContextKey = Tuple[str, str, str]
+
+
+@dataclass
+class ExplainContext:
+    """
+    Per-plan state reused across /explain calls: the serialised plan block
+    (identical prompt prefix, so providers can serve it from their prompt
+    cache), the validated plan for local answers (None if it does not match
+    the TripPlan schema) and the general explanation once generated.
+    """
+    plan_block: str
+    trip_plan: Optional[TripPlan] = None
+    explanation: Optional[str] = None
+    highlights: List[str] = field(default_factory=list)
+
+
+# Keyed by plan version, so an improved plan never sees a stale explanation.
+explain_context_cache: LRUCache[ExplainContext] = LRUCache(
+    settings.EXPLAIN_CONTEXT_CACHE_SIZE,
+    ttl_seconds=settings.EXPLAIN_CONTEXT_TTL_SECONDS,
+)
+
+# General explanations shared with other workers, invalidated when the explain templates change
+shared_explanations: Optional[TieredCache] = TieredCache(
+    "explanations",
+    settings.CACHE_EXPLANATION_TTL_SECONDS,
+    version=EXPLAIN_TEMPLATES_VERSION,
+) if settings.CACHE_ENABLED else None
+
+
+def explain_context(
+    stored: StoredTripPlan,
+    language: str,
+    cache: LRUCache[ExplainContext] = explain_context_cache,
+) -> ExplainContext:
+    """Context of a plan version, created (and cached) on first use."""
+    key: ExplainContextKey = (str(stored.trip_id), stored.version, language)
+    context = cache.get(key)
+    if context is None:
+        try:
+            trip_plan = TripPlan.model_validate(stored.plan)
+        except ValidationError:
+            trip_plan = None
+        context = ExplainContext(plan_block=PromptBuilder.serialize_plan(stored.plan), trip_plan=trip_plan)
+        cache.set(key, context)
+    return context
+
+
+async def load_shared_explanation(
+    stored: StoredTripPlan,
+    language: str,
+    context: ExplainContext,
+    cache: Optional[TieredCache] = shared_explanations,
+) -> None:
+    """Fill in the explanation of the plan version if another worker generated it already."""
+    if cache is None or context.explanation is not None:
+        return
+    shared = await cache.get(f"{stored.trip_id}:{stored.version}:{language}")
+    if shared is not None:
+        context.explanation = shared["explanation"]
+        context.highlights = list(shared["highlights"])
+
+
+async def share_explanation(
+    stored: StoredTripPlan,
+    language: str,
+    context: ExplainContext,
+    cache: Optional[TieredCache] = shared_explanations,
+) -> None:
+    """Make a newly generated explanation available to other workers."""
+    if cache is not None and context.explanation is not None:
+        await cache.set(
+            f"{stored.trip_id}:{stored.version}:{language}",
+            {"explanation": context.explanation, "highlights": context.highlights},
+        )
@@ -0,0 +1,192 @@
+import re
+from collections import Counter
+from typing import Optional, List, Dict, Any, Tuple
+
+from app.schemas.response import TripPlan
+from app.services.plan_lookup import DAY_NUMBER, DAY_ORDINAL, WORD, find_day, find_targets, day_items, names_kind
+
+# Open-ended questions always go to the LLM
+OPEN_ENDED = re.compile(
+    r"\b(why|how come|explain|recommend|suggest|better|enough|afford|worth|should"
+    r"|чому|навіщо|нащо|поясн\w*|поради\w*|порадь\w*|краще|варто|вистач\w*|достатньо)\b"
+)
+# Cost questions answered with the trip total must clearly ask about the whole trip
+WHOLE_TRIP = re.compile(
+    r"\b(?:trip|whole|total|overall|altogether|entire|подорож\w*|поїздк\w*|загал\w*|усього|всього|усієї|всієї|разом)\b"
+    r"|^\W*(?:what(?:'s| is) (?:the |our |my )?budget|(?:який )?бюджет)\W*$"
+)
+# Words that do not name anything in a plan; any other word left in a question
+# without a matched activity is an unknown target ("zoo", "Louvre ticket")
+FILLER_WORDS = {
+    "a", "an", "the", "is", "are", "was", "be", "do", "does", "did", "will", "would", "can", "we", "us",
+    "our", "my", "i", "me", "you", "it", "its", "there", "this", "that", "on", "in", "at", "of", "for",
+    "to", "by", "from", "and", "or", "per", "person", "people", "each", "all", "so", "far", "roughly",
+    "approximately", "about", "what", "what's", "whats", "which", "how", "much", "many", "long", "time",
+    "day", "days", "take", "takes", "need", "have", "has", "plan", "planned", "expected", "estimated",
+    "і", "й", "та", "а", "в", "у", "на", "о", "об", "за", "до", "з", "із", "для", "про", "по", "це", "цей",
+    "ця", "ми", "нам", "нас", "мені", "наш", "наша", "наше", "наші", "буде", "будемо", "є", "що", "скільки",
+    "приблизно", "десь", "день", "дня", "дні", "днів", "час", "часу", "триває", "тривати", "коштує",
+    "коштуватиме", "коштуватимуть", "нашої", "нашій", "моєї", "моїй",
+}
+FILLER_PATTERNS = (DAY_NUMBER, DAY_ORDINAL, WHOLE_TRIP)
+
+INTENTS: List[Tuple[str, re.Pattern]] = [
+    ("duration", re.compile(
+        r"how long|duration|how much time|how many (?:hours|minutes)|як довго|тривал\w*|скільки (?:часу|триває|хвилин|годин)"
+    )),
+    ("time", re.compile(
+        r"what time|\bwhen\b|\bstarts?\b|о котрій|о якій|\bколи\b|почина\w*|початок"
+    )),
+    ("cost", re.compile(
+        r"\bcosts?\b|price|how much|budget|spend|скільки (?:коштує|коштуватиме|коштуватимуть|грошей|витрат)"
+        r"|вартість|\bціна\b|бюджет|витрат\w*|коштує"
+    )),
+    ("category", re.compile(
+        r"\b(?:which|what|list)\b.*\b(?:museums|restaurants|places|parks|cafes|activities)\b"
+        r"|\b(?:які|котрі|список)\b"
+    )),
+    ("day", re.compile(
+        r"what(?:'s| is| do we do)? (?:on|for) day|plan for|schedule|що (?:заплановано|буде|робимо)|розклад|програма|план на"
+    )),
+]
+
+
+def _format_money(value: float, currency: str) -> str:
+    return f"{value:,.0f}".replace(",", " ") + f" {currency}"
+
+
+def _format_minutes(minutes: int) -> str:
+    hours, rest = divmod(minutes, 60)
+    if hours and rest:
+        return f"{hours} год {rest} хв"
+    return f"{hours} год" if hours else f"{rest} хв"
+
+
+def _names_unknown_target(text: str) -> bool:
+    """Whether the question mentions something besides intents, days and filler words."""
+    for pattern in (*FILLER_PATTERNS, *(pattern for _, pattern in INTENTS)):
+        text = pattern.sub(" ", text)
+    return any(word not in FILLER_WORDS and not word.isdigit() for word in WORD.findall(text))
+
+
+class QuestionRouter:
+    """
+    Answers factual /explain questions straight from the TripPlan.
+
+    Keyword/pattern intents cover costs, start times, durations, categories
+    and day schedules; anything open-ended ("why ...") or not resolvable
+    against the plan returns None and is left to the LLM. Counts routed
+    questions so the local hit ratio can be monitored.
+    """
+
+    def __init__(self):
+        self.questions = 0
+        self.local_answers = 0
+        self.intents: Counter = Counter()
+
+    def answer(self, plan: TripPlan, question: str) -> Optional[str]:
+        """Deterministic answer to the question, or None to ask the LLM."""
+        self.questions += 1
+        text = question.lower()
+        if OPEN_ENDED.search(text):
+            return None
+        for intent, pattern in INTENTS:
+            if pattern.search(text):
+                answer = getattr(self, f"_answer_{intent}")(plan, text)
+                if answer is not None:
+                    self.local_answers += 1
+                    self.intents[intent] += 1
+                return answer
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Routed question counts and local hit ratio."""
+        return {
+            "questions": self.questions,
+            "local_answers": self.local_answers,
+            "hit_ratio": self.local_answers / self.questions if self.questions else 0.0,
+            "intents": dict(self.intents),
+        }
+
+    def _answer_cost(self, plan: TripPlan, text: str) -> Optional[str]:
+        day, items = find_targets(plan, text)
+        if items:
+            priced = [item for item in items if item.estimated_cost is not None]
+            if not priced:
+                return None
+            return "; ".join(
+                f"{item.place_name}: {_format_money(item.estimated_cost, plan.currency)}" for item in priced
+            ) + "."
+        if names_kind(text) or _names_unknown_target(text):
+            # Names a meal or place that is not in the plan (or that day): "How much is the Louvre ticket?"
+            return None
+        if day is not None:
+            items = day_items(plan, day)
+            if not items:
+                return self._missing_day(plan, day)
+            total = sum(item.estimated_cost or 0 for item in items)
+            return f"Орієнтовна вартість дня {day}: {_format_money(total, plan.currency)}."
+        if not WHOLE_TRIP.search(text):
+            return None
+        return f"Орієнтовний бюджет усієї подорожі: {_format_money(plan.total_budget_estimate, plan.currency)}."
+
+    def _answer_time(self, plan: TripPlan, text: str) -> Optional[str]:
+        day, items = find_targets(plan, text)
+        if not items and (names_kind(text) or _names_unknown_target(text)):
+            return None
+        if not items and day is not None:
+            items = day_items(plan, day)
+            if not items:
+                return self._missing_day(plan, day)
+            first = items[0]
+            if first.start_time is None:
+                return None
+            return f"День {day} починається о {first.start_time}: {first.title}."
+        timed = [item for item in items if item.start_time is not None]
+        if not timed:
+            return None
+        return "; ".join(f"День {item.day_index}, {item.start_time} — {item.title}" for item in timed) + "."
+
+    def _answer_duration(self, plan: TripPlan, text: str) -> Optional[str]:
+        day, items = find_targets(plan, text)
+        if not items and (names_kind(text) or _names_unknown_target(text)):
+            return None
+        if not items and day is not None:
+            items = day_items(plan, day)
+            if not items:
+                return self._missing_day(plan, day)
+            total = sum(item.duration_minutes or 0 for item in items)
+            if not total:
+                return None
+            return f"Заплановані активності дня {day} тривають разом {_format_minutes(total)}."
+        if not items and re.search(r"trip|подорож|поїздк", text):
+            return f"Подорож триває {plan.duration_days} дн."
+        timed = [item for item in items if item.duration_minutes is not None]
+        if not timed:
+            return None
+        return "; ".join(f"{item.title}: {_format_minutes(item.duration_minutes)}" for item in timed) + "."
+
+    def _answer_category(self, plan: TripPlan, text: str) -> Optional[str]:
+        day, items = find_targets(plan, text)
+        if not items:
+            return None
+        return "; ".join(f"День {item.day_index}: {item.place_name}" for item in items) + "."
+
+    def _answer_day(self, plan: TripPlan, text: str) -> Optional[str]:
+        day = find_day(text)
+        if day is None:
+            return None
+        items = day_items(plan, day)
+        if not items:
+            return self._missing_day(plan, day)
+        return f"День {day}: " + "; ".join(
+            f"{item.start_time} {item.title}" if item.start_time else item.title for item in items
+        ) + "."
+
+    @staticmethod
+    def _missing_day(plan: TripPlan, day: int) -> str:
+        return f"У плані немає дня {day}: подорож триває {plan.duration_days} дн."
+
+
+# Shared by all requests of a worker so its counters cover the whole process.
+question_router = QuestionRouter()
@@ -0,0 +1,217 @@
+from typing import List, Dict, Any, Optional, Set
+
+from app.schemas.request import RecommendationRequest
+from app.schemas.response import TripPlan, ItineraryItem, GeoCoordinates
+from app.services.route_optimizer import RouteOptimizer
+
+
+class FallbackPlanner:
+    """
+    Local itinerary planner used when the LLM cannot answer in time.
+
+    Fills a fixed day template (meals at meal times, sights in between)
+    with the best-ranked POIs: rating, match with the user's interests and,
+    on days with rain in the forecast, a preference for indoor places. No
+    POI is used twice while unused ones are left, and never twice on the
+    same day; a slot with no suitable place left is dropped. Descriptions and
+    rationales are templated; the route is then ordered and timed by
+    RouteOptimizer and costs are scaled to the party and budget.
+    """
+
+    # (start time, duration in minutes, meal title prefix or None for sights)
+    DAY_SLOTS = [
+        ("09:30", 120, None),
+        ("12:30", 60, "Обід"),
+        ("14:00", 120, None),
+        ("16:30", 90, None),
+        ("19:00", 90, "Вечеря"),
+    ]
+    OUTDOOR_CATEGORIES = {"nature"}
+    RAINY_CONDITIONS = {"rain", "snow", "storm", "thunderstorm", "showers"}
+    RAIN_PROBABILITY = 60
+    DEFAULT_RATING = 4.0
+    INTEREST_BONUS = 1.0
+    RAIN_PENALTY = 1.5
+
+    DESCRIPTIONS = {
+        "food": "Час для смачної перерви: {name} пропонує місцеву кухню у місті {city}.",
+        "culture": "Культурна програма у {name}: виставки, вистави та атмосфера міста {city}.",
+        "nature": "Прогулянка та відпочинок на свіжому повітрі: {name}, {city}.",
+        "history": "Знайомство з історією міста {city}: {name}.",
+        "shopping": "Покупки та сувеніри на згадку: {name}, {city}.",
+        "nightlife": "Вечірній відпочинок у {name}, {city}.",
+    }
+    DEFAULT_DESCRIPTION = "Відвідування місця {name} у місті {city}."
+
+    @classmethod
+    def plan(
+        cls,
+        request: RecommendationRequest,
+        weather: Optional[Dict[str, Any]],
+        pois: List[Dict[str, Any]],
+        currency: str = "UAH",
+    ) -> TripPlan:
+        """Schema-valid plan from the request context; ValueError if there are no usable POIs."""
+        candidates = [poi for poi in pois if len(str(poi.get("name") or "").strip()) >= 2]
+        if not candidates:
+            raise ValueError("No points of interest to build a fallback plan from")
+
+        constraints = request.constraints
+        city = (constraints.destination_city or constraints.origin_city).strip()
+        interests = set(request.user_profile.interests)
+        forecast = (weather or {}).get("forecast") or []
+        rainy_days = [
+            day_index for day_index in range(1, constraints.duration_days + 1)
+            if cls._rainy(forecast[day_index - 1] if day_index <= len(forecast) else None)
+        ]
+
+        used: Set[int] = set()
+        items: List[ItineraryItem] = []
+        for day_index in range(1, constraints.duration_days + 1):
+            rainy = day_index in rainy_days
+            used_today: Set[int] = set()
+            for start_time, duration, meal in cls.DAY_SLOTS:
+                position = cls._pick(candidates, used, used_today, interests, rainy, meal is not None)
+                if position is None:
+                    continue
+                used_today.add(position)
+                used.add(position)
+                if len(used) == len(candidates):
+                    used.clear()
+                items.append(cls._item(
+                    candidates[position], city, interests, rainy, day_index, len(used_today), start_time, duration, meal
+                ))
+
+        days = constraints.duration_days
+        trip_plan = TripPlan(
+            title=f"{city}: маршрут на {days} дн."[:200],
+            summary=(
+                f"Маршрут містом {city} на {days} дн., складений з найкраще оцінених місць "
+                f"за вашими інтересами ({', '.join(sorted(interests))})."
+            )[:1000],
+            destination=city,
+            total_budget_estimate=sum(item.estimated_cost or 0 for item in items),
+            currency=currency,
+            duration_days=days,
+            itinerary=items,
+            tags=sorted(interests)[:5],
+            tips=[f"На день {day} прогнозують опади: більшість місць цього дня у приміщенні." for day in rainy_days]
+            or None,
+            is_fallback=True,
+        )
+
+        target_total = constraints.total_budget
+        if target_total is None and request.user_profile.avg_daily_budget is not None:
+            target_total = request.user_profile.avg_daily_budget * days * constraints.travel_party_size
+        trip_plan = RouteOptimizer.optimize(trip_plan, request.user_profile.transport_modes)
+        return RouteOptimizer.scale_budget(trip_plan, party_size=constraints.travel_party_size, target_total=target_total)
+
+    @classmethod
+    def _pick(
+        cls,
+        candidates: List[Dict[str, Any]],
+        used: Set[int],
+        used_today: Set[int],
+        interests: Set[str],
+        rainy: bool,
+        is_meal: bool,
+    ) -> Optional[int]:
+        """
+        Index of the best candidate for a slot, preferring ones not used yet.
+        Meals take food places only and sights anything else; None if no such
+        place is left for the day.
+        """
+        def score(position: int) -> float:
+            poi = candidates[position]
+            category = poi.get("category")
+            value = cls._rating(poi)
+            if category in interests:
+                value += cls.INTEREST_BONUS
+            if rainy and category in cls.OUTDOOR_CATEGORIES:
+                value -= cls.RAIN_PENALTY
+            # Keep the Integration Service's order as the tie-breaker
+            return value - position * 1e-6
+
+        def matching(positions: List[int]) -> List[int]:
+            return [
+                position for position in positions
+                if (candidates[position].get("category") == "food") == is_meal
+            ]
+
+        free = [position for position in range(len(candidates)) if position not in used_today]
+        fresh = [position for position in free if position not in used] or free
+        pool = matching(fresh) or matching(free)
+        return max(pool, key=score) if pool else None
+
+    @classmethod
+    def _item(
+        cls,
+        poi: Dict[str, Any],
+        city: str,
+        interests: Set[str],
+        rainy: bool,
+        day_index: int,
+        order_index: int,
+        start_time: str,
+        duration: int,
+        meal: Optional[str],
+    ) -> ItineraryItem:
+        name = str(poi["name"]).strip()[:200]
+        category = poi.get("category") or None
+        description = str(poi.get("description") or "").strip()
+        if len(description) < 10:
+            description = cls.DESCRIPTIONS.get(category, cls.DEFAULT_DESCRIPTION).format(name=name, city=city)
+
+        reasons = [f"рейтинг {cls._rating(poi):.1f}"]
+        if category in interests:
+            reasons.append(f"відповідає вашому інтересу «{category}»")
+        if rainy and category not in cls.OUTDOOR_CATEGORIES:
+            reasons.append("у приміщенні на випадок дощу")
+
+        return ItineraryItem(
+            day_index=day_index,
+            order_index=order_index,
+            title=(f"{meal}: {name}" if meal else name)[:200],
+            description=description[:1000],
+            place_name=name,
+            coordinates=cls._coordinates(poi),
+            estimated_cost=cls._price(poi),
+            duration_minutes=duration,
+            start_time=start_time,
+            category=category,
+            rationale=f"Обрано автоматично: {', '.join(reasons)}."[:500],
+        )
+
+    @classmethod
+    def _rainy(cls, day: Optional[Dict[str, Any]]) -> bool:
+        if not day:
+            return False
+        return (
+            str(day.get("condition", "")).lower() in cls.RAINY_CONDITIONS
+            or (day.get("precipitation_probability") or 0) >= cls.RAIN_PROBABILITY
+        )
+
+    @classmethod
+    def _rating(cls, poi: Dict[str, Any]) -> float:
+        try:
+            return float(poi.get("rating") or cls.DEFAULT_RATING)
+        except (TypeError, ValueError):
+            return cls.DEFAULT_RATING
+
+    @staticmethod
+    def _price(poi: Dict[str, Any]) -> Optional[float]:
+        for key in ("price_uah", "price", "estimated_cost"):
+            value = poi.get(key)
+            if isinstance(value, (int, float)) and value >= 0:
+                return float(value)
+        return None
+
+    @staticmethod
+    def _coordinates(poi: Dict[str, Any]) -> Optional[GeoCoordinates]:
+        location = poi.get("coordinates") or poi
+        lat, lng = location.get("lat"), location.get("lng")
+        if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+            return None
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return None
+        return GeoCoordinates(lat=lat, lng=lng)
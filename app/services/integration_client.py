@@ -3,17 +3,27 @@ from typing import List, Optional
 import httpx
 
 from app.core.config import settings
+from app.core.tracing import tracer, inject_headers
+from app.services.shared_cache import TieredCache
 
 
 class IntegrationClient:
     """
     HTTP client for Integration Service.
-    Replaces MockIntegrationClient with real API calls.
+    Replaces MockIntegrationClient with real API calls. With a cache,
+    weather, POI and city lookups are shared across requests and workers.
     """
     
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[TieredCache] = None,
+    ):
         self.base_url = base_url or settings.INTEGRATION_SERVICE_URL
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=30.0)
+        self.cache = cache
     
     async def get_weather(
         self, 
@@ -28,12 +38,10 @@ class IntegrationClient:
         if end_date:
             params["end_date"] = str(end_date)
         
-        response = await self.client.get(
-            f"{self.base_url}/weather/city",
-            params=params,
+        return await self._cached(
+            f"weather:{city.strip().lower()}:{start_date}:{end_date}",
+            "GET", "/weather/city", params=params,
         )
-        response.raise_for_status()
-        return response.json()["data"]
     
     async def search_pois(
         self, 
@@ -41,22 +49,53 @@ class IntegrationClient:
         interests: List[str]
     ) -> List[dict]:
         """Search POIs by city and interests."""
-        response = await self.client.post(
-            f"{self.base_url}/maps/pois",
-            json={"city": city, "interests": interests}
+        # Interest order and repeats do not change the result, so one entry serves them all;
+        # the Integration Service still gets the interests as the caller gave them
+        return await self._cached(
+            f"pois:{city.strip().lower()}:{','.join(sorted(set(interests)))}",
+            "POST", "/maps/pois", json={"city": city, "interests": interests},
         )
-        response.raise_for_status()
-        return response.json()["data"]
     
     async def get_city_info(self, city: str) -> dict:
         """Get city information."""
-        response = await self.client.get(
-            f"{self.base_url}/maps/city",
-            params={"city": city}
-        )
-        response.raise_for_status()
-        return response.json()["data"]
+        return await self._cached(f"city:{city.strip().lower()}", "GET", "/maps/city", params={"city": city})
+
+    async def _cached(self, key: str, method: str, path: str, **kwargs):
+        if self.cache is None:
+            return await self._request(method, path, **kwargs)
+        return await self.cache.get_or_set(key, lambda: self._request(method, path, **kwargs))
     
+    async def _request(self, method: str, path: str, **kwargs):
+        """Call the Integration Service in a client span, propagating the trace context."""
+        with tracer.span(f"integration {method} {path}", kind="client", **{"http.method": method, "http.target": path}) as span:
+            response = await self.client.request(
+                method,
+                f"{self.base_url}{path}",
+                headers=inject_headers(),
+                **kwargs,
+            )
+            span.set_attribute("http.status_code", response.status_code)
+            response.raise_for_status()
+            return response.json()["data"]
+
+    async def ping(self) -> int:
+        """Reach the Integration Service (any non-5xx answer); opens a pooled connection."""
+        response = await self.client.get(self.base_url, headers=inject_headers())
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response.status_code
+
+    def open(self) -> None:
+        """Start a new HTTP client if close() was called, e.g. by an earlier application lifespan."""
+        if self._owns_client and self.client.is_closed:
+            self.client = httpx.AsyncClient(timeout=30.0)
+
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
+
+
+# Shared so requests reuse pooled (already resolved and TLS-established) connections
+integration_client = IntegrationClient(cache=TieredCache(
+    "integration", settings.CACHE_INTEGRATION_TTL_SECONDS,
+) if settings.CACHE_ENABLED else None)
@@ -1,16 +1,89 @@
+import json
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
 from typing import Tuple, Optional, Dict, Any
 
+
+@dataclass
+class LLMUsage:
+    """Token usage and latency of an LLM generation."""
+
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: int = 0
+    ttft_ms: Optional[int] = None
+    finish_reason: Optional[str] = None
+    retry_count: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def merge(self, other: "LLMUsage") -> "LLMUsage":
+        """
+        Combine usage of a retried call with a previous attempt.
+        Tokens and wall time add up; TTFT is kept from the first attempt.
+        """
+        return LLMUsage(
+            model=other.model,
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            cached_tokens=self.cached_tokens + other.cached_tokens,
+            latency_ms=self.latency_ms + other.latency_ms,
+            ttft_ms=self.ttft_ms if self.ttft_ms is not None else other.ttft_ms,
+            finish_reason=other.finish_reason,
+            retry_count=self.retry_count + 1,
+        )
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Column values for integration.ai_runs."""
+        columns = asdict(self)
+        columns["tokens_used"] = self.total_tokens
+        return columns
+
+
+class _Stopwatch:
+    """Measures wall time and time to first token of a streamed call."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+
+    def mark_token(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    @property
+    def latency_ms(self) -> int:
+        return int((time.perf_counter() - self.started) * 1000)
+
+    @property
+    def ttft_ms(self) -> Optional[int]:
+        if self.first_token is None:
+            return None
+        return int((self.first_token - self.started) * 1000)
+
+
 class BaseLLMClient(ABC):
     """Abstract base class for LLM clients."""
 
+    model_name: str
+
     @abstractmethod
-    async def generate(self, system_prompt: str, user_prompt: str) -> Tuple[str, int]:
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, LLMUsage]:
         """
         Generate response from LLM.
 
         Returns:
-            Tuple of (response_text, tokens_used)
+            Tuple of (response_text, usage)
         """
         pass
 
@@ -22,17 +95,22 @@ class OpenAIClient(BaseLLMClient):
         import openai
         self.client = openai.AsyncOpenAI(api_key=api_key)
         self.model = model
+        self.model_name = model
 
-    async def generate(self, system_prompt: str, user_prompt: str, json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, int]:
-        response_format = {
+    async def generate(self, system_prompt: str, user_prompt: str, json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, LLMUsage]:
+        if json_schema:
+            response_format = {
                 "type": "json_schema",
                 "json_schema": {
                     "name": "response",
                     "schema": json_schema
                 }
             }
+        else:
+            response_format = {"type": "json_object"}
 
-        response = await self.client.chat.completions.create(
+        timer = _Stopwatch()
+        stream = await self.client.chat.completions.create(
             model=self.model,
             messages=[  # type: ignore[list-item]
                 {"role": "system", "content": system_prompt},
@@ -40,10 +118,31 @@ class OpenAIClient(BaseLLMClient):
             ],
             response_format=response_format, # type: ignore
             temperature=0.7,
+            stream=True,
+            stream_options={"include_usage": True},
         )
-        content = response.choices[0].message.content
-        tokens = response.usage.total_tokens if response.usage else 0
-        return content, tokens
+
+        parts = []
+        usage = LLMUsage(model=self.model)
+        async for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    timer.mark_token()
+                    parts.append(choice.delta.content)
+                if choice.finish_reason:
+                    usage.finish_reason = choice.finish_reason
+            if chunk.usage:
+                usage.prompt_tokens = chunk.usage.prompt_tokens
+                usage.completion_tokens = chunk.usage.completion_tokens
+                details = getattr(chunk.usage, "prompt_tokens_details", None)
+                usage.cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+            if getattr(chunk, "model", None):
+                usage.model = chunk.model
+
+        usage.latency_ms = timer.latency_ms
+        usage.ttft_ms = timer.ttft_ms
+        return "".join(parts), usage
 
 
 class GeminiClient(BaseLLMClient):
@@ -56,12 +155,38 @@ class GeminiClient(BaseLLMClient):
             model,
             generation_config={"response_mime_type": "application/json"} # type: ignore
         )
+        self.model_name = model
 
-    async def generate(self, system_prompt: str, user_prompt: str, json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, int]:
-        import json
+    async def generate(self, system_prompt: str, user_prompt: str, json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, LLMUsage]:
         full_prompt = f"{system_prompt}\n\n{user_prompt},\n\nJSON SCHEMA: {json.dumps(json_schema, ensure_ascii=False, indent=2)}"
-        response = await self.model.generate_content_async(full_prompt)
-        return response.text, 0
+
+        timer = _Stopwatch()
+        response = await self.model.generate_content_async(full_prompt, stream=True)
+        parts = []
+        async for chunk in response:
+            # chunk.text raises on chunks without parts (safety blocks, finish-only chunks)
+            text = "".join(
+                getattr(part, "text", "") or ""
+                for candidate in (chunk.candidates or [])[:1]
+                for part in (candidate.content.parts if candidate.content else [])
+            )
+            if text:
+                timer.mark_token()
+                parts.append(text)
+
+        usage = LLMUsage(model=self.model_name)
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata:
+            usage.prompt_tokens = metadata.prompt_token_count or 0
+            usage.completion_tokens = metadata.candidates_token_count or 0
+            usage.cached_tokens = getattr(metadata, "cached_content_token_count", 0) or 0
+        if response.candidates:
+            finish_reason = response.candidates[0].finish_reason
+            usage.finish_reason = getattr(finish_reason, "name", None) or str(finish_reason)
+
+        usage.latency_ms = timer.latency_ms
+        usage.ttft_ms = timer.ttft_ms
+        return "".join(parts), usage
 
 
 class AnthropicClient(BaseLLMClient):
@@ -71,19 +196,33 @@ class AnthropicClient(BaseLLMClient):
         import anthropic
         self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
+        self.model_name = model
 
-    async def generate(self, system_prompt: str, user_prompt: str, json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, int]:
-        import json
+    async def generate(self, system_prompt: str, user_prompt: str, json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, LLMUsage]:
         full_system_prompt = system_prompt
         if json_schema:
             full_system_prompt += f"\n\nYou MUST respond with valid JSON matching this schema:\n{json.dumps(json_schema, ensure_ascii=False, indent=2)}"
 
-        response = await self.client.messages.create(
+        timer = _Stopwatch()
+        async with self.client.messages.stream(
             model=self.model,
             max_tokens=4096,
             system=full_system_prompt,
             messages=[{"role": "user", "content": user_prompt}],  # type: ignore[list-item]
+        ) as stream:
+            parts = []
+            async for text in stream.text_stream:
+                timer.mark_token()
+                parts.append(text)
+            message = await stream.get_final_message()
+
+        usage = LLMUsage(
+            model=message.model,
+            prompt_tokens=message.usage.input_tokens,
+            completion_tokens=message.usage.output_tokens,
+            cached_tokens=getattr(message.usage, "cache_read_input_tokens", None) or 0,
+            latency_ms=timer.latency_ms,
+            ttft_ms=timer.ttft_ms,
+            finish_reason=message.stop_reason,
         )
-        content = response.content[0].text
-        tokens = response.usage.input_tokens + response.usage.output_tokens
-        return content, tokens
+        return "".join(parts), usage
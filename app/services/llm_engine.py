@@ -1,18 +1,35 @@
-from typing import Optional, Tuple
+from typing import Optional, Dict, Tuple, Type, TypeVar
 import json
 
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
-from app.schemas.response import TripPlan, ExplainResponse, ImproveResponse
+from app.schemas.response import TripPlan, ExplainResponse, ExplainAnswers, ImproveResponse
 from app.core.config import settings
-from app.core.constants import LLMProvider
+from app.core.constants import LLMProvider, AIEndpoint
+from app.core.metrics import stage_duration, llm_attempts, llm_tokens
+from app.core.tracing import tracer
 from app.services.llm_clients import (
     BaseLLMClient,
+    LLMUsage,
     OpenAIClient,
     GeminiClient,
     AnthropicClient,
 )
 from app.services.prompt_templates import ERROR_SYSTEM_PROMPT
+from app.services.quotas import quota_tracker
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+# Provider SDK clients hold connection pools, so one per provider is shared by all engines
+_clients: Dict[LLMProvider, BaseLLMClient] = {}
+
+
+class LLMGenerationError(ValueError):
+    """Raised when the LLM fails to produce a valid response; carries usage so far."""
+
+    def __init__(self, message: str, usage: Optional[LLMUsage] = None):
+        super().__init__(message)
+        self.usage = usage
 
 
 class LLMEngine:
@@ -24,11 +41,11 @@ class LLMEngine:
 
     def __init__(self, provider: Optional[LLMProvider] = None):
         self.provider = provider or LLMProvider(settings.DEFAULT_LLM_PROVIDER)
-        self.client = self._create_client()
+        self.client = _clients.get(self.provider) or _clients.setdefault(self.provider, self._create_client())
         self.max_retries = 2
 
     def _create_client(self) -> BaseLLMClient:
-        """Create LLM client based on provider."""
+        """Create LLM client based on provider (imports its SDK on first use)."""
         if self.provider == LLMProvider.OPENAI:
             if not settings.OPENAI_API_KEY:
                 raise ValueError("OPENAI_API_KEY not configured")
@@ -44,29 +61,36 @@ class LLMEngine:
                 raise ValueError("ANTHROPIC_API_KEY not configured")
             return AnthropicClient(settings.ANTHROPIC_API_KEY)
 
+        elif self.provider == LLMProvider.FAKE:
+            from app.fakes.llm_client import FakeLLMClient
+            return FakeLLMClient()
+
         raise ValueError(f"Unsupported provider: {self.provider}")
 
     async def generate_itinerary(
         self,
         system_prompt: str,
         user_prompt: str,
-    ) -> Tuple[TripPlan, int]:
+        endpoint: AIEndpoint = AIEndpoint.RECOMMEND,
+    ) -> Tuple[TripPlan, LLMUsage]:
         """
         Generate travel itinerary with validation and retry.
 
         Returns:
-            Tuple of (TripPlan, tokens_used)
+            Tuple of (TripPlan, usage accumulated over all attempts)
         """
         last_error = None
+        usage: Optional[LLMUsage] = None
 
         for attempt in range(self.max_retries + 1):
             content = None
             try:
-                content, tokens = await self.client.generate(system_prompt, user_prompt)
+                content, attempt_usage = await self._complete(endpoint, system_prompt, user_prompt, attempt)
+                usage = attempt_usage if usage is None else usage.merge(attempt_usage)
 
                 # Parse and validate response
-                trip_plan = TripPlan.model_validate_json(content)
-                return trip_plan, tokens
+                trip_plan = self._parse(endpoint, TripPlan, content)
+                return trip_plan, usage
 
             except ValidationError as e:
                 last_error = e
@@ -81,27 +105,87 @@ class LLMEngine:
                     user_prompt = f"Your previous response was not valid JSON. Please return valid JSON only.\n\nOriginal request:\n{user_prompt}"
                     continue
 
-        raise ValueError(f"Failed to generate valid itinerary after {self.max_retries + 1} attempts: {last_error}")
+        raise LLMGenerationError(
+            f"Failed to generate valid itinerary after {self.max_retries + 1} attempts: {last_error}",
+            usage=usage,
+        )
 
     async def generate_explanation(
         self,
         system_prompt: str,
         user_prompt: str,
-    ) -> Tuple[ExplainResponse, int]:
+    ) -> Tuple[ExplainResponse, LLMUsage]:
         """Generate explanation for a trip plan."""
-        content, tokens = await self.client.generate(system_prompt, user_prompt)
-        response = ExplainResponse.model_validate_json(content)
-        return response, tokens
+        content, usage = await self._complete(AIEndpoint.EXPLAIN, system_prompt, user_prompt)
+        try:
+            response = self._parse(AIEndpoint.EXPLAIN, ExplainResponse, content)
+        except ValidationError as e:
+            raise LLMGenerationError(f"Invalid explanation response: {e}", usage=usage) from e
+        return response, usage
+
+    async def generate_explanation_answers(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> Tuple[ExplainAnswers, LLMUsage]:
+        """Generate answers to follow-up questions about an explained plan."""
+        content, usage = await self._complete(AIEndpoint.EXPLAIN, system_prompt, user_prompt)
+        try:
+            response = self._parse(AIEndpoint.EXPLAIN, ExplainAnswers, content)
+        except ValidationError as e:
+            raise LLMGenerationError(f"Invalid explanation answers: {e}", usage=usage) from e
+        return response, usage
 
     async def generate_improvement(
         self,
         system_prompt: str,
         user_prompt: str,
-    ) -> Tuple[ImproveResponse, int]:
+    ) -> Tuple[ImproveResponse, LLMUsage]:
         """Generate improved trip plan."""
-        content, tokens = await self.client.generate(system_prompt, user_prompt)
-        response = ImproveResponse.model_validate_json(content)
-        return response, tokens
+        content, usage = await self._complete(AIEndpoint.IMPROVE, system_prompt, user_prompt)
+        try:
+            response = self._parse(AIEndpoint.IMPROVE, ImproveResponse, content)
+        except ValidationError as e:
+            raise LLMGenerationError(f"Invalid improvement response: {e}", usage=usage) from e
+        return response, usage
+
+    async def _complete(
+        self,
+        endpoint: AIEndpoint,
+        system_prompt: str,
+        user_prompt: str,
+        attempt: int = 0,
+    ) -> Tuple[str, LLMUsage]:
+        """One provider call, timed, counted and traced (stage "llm_call")."""
+        labels = {"endpoint": endpoint.value, "provider": self.provider.value}
+        try:
+            with stage_duration.time(stage="llm_call", **labels), tracer.span(
+                "llm.generate", kind="client", attempt=attempt, **{f"llm.{key}": value for key, value in labels.items()}
+            ) as span:
+                content, usage = await self.client.generate(system_prompt, user_prompt)
+                span.set_attribute("llm.prompt_tokens", usage.prompt_tokens)
+                span.set_attribute("llm.completion_tokens", usage.completion_tokens)
+        except Exception:
+            llm_attempts.inc(outcome="error", **labels)
+            raise
+        llm_tokens.inc(usage.prompt_tokens, kind="prompt", **labels)
+        llm_tokens.inc(usage.completion_tokens, kind="completion", **labels)
+        llm_tokens.inc(usage.cached_tokens, kind="cached", **labels)
+        quota_tracker.charge_tokens(usage.total_tokens)
+        return content, usage
+
+    def _parse(self, endpoint: AIEndpoint, schema: Type[ResponseModel], content: str) -> ResponseModel:
+        """Validate a completion against the response schema (stage "validation")."""
+        labels = {"endpoint": endpoint.value, "provider": self.provider.value}
+        try:
+            with stage_duration.time(stage="validation", **labels), tracer.span("llm.validate", schema=schema.__name__):
+                response = schema.model_validate_json(content)
+        except ValidationError as e:
+            invalid_json = any(error["type"] == "json_invalid" for error in e.errors())
+            llm_attempts.inc(outcome="invalid_json" if invalid_json else "invalid_schema", **labels)
+            raise
+        llm_attempts.inc(outcome="ok", **labels)
+        return response
 
     @staticmethod
     def _build_correction_prompt(invalid_response: str, error: str) -> str:
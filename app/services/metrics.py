@@ -0,0 +1,78 @@
+from typing import List
+
+from app.core.metrics import Sample
+from app.services.auth import token_verifier
+from app.services.cache import LRUCache
+from app.services.explain_context import explain_context_cache, shared_explanations
+from app.services.explain_router import question_router
+from app.services.integration_client import integration_client
+from app.services.plan_editor import plan_editor
+from app.services.telemetry_writer import telemetry_writer
+from app.services.trip_plans import trip_plan_cache
+
+# telemetry_writer.stats() key -> (metric name, type, help)
+TELEMETRY_METRICS = {
+    "queue_depth": ("ai_telemetry_queue_depth", "gauge", "Telemetry events waiting to be written"),
+    "flushed_rows": ("ai_telemetry_flushed_rows_total", "counter", "Telemetry rows written to Postgres"),
+    "dropped_events": ("ai_telemetry_dropped_events_total", "counter", "Telemetry events dropped"),
+    "failed_batches": ("ai_telemetry_failed_batches_total", "counter", "Telemetry batches that failed to write"),
+    "replayed_events": ("ai_telemetry_replayed_events_total", "counter", "Spooled telemetry events replayed"),
+    "spool_segments": ("ai_telemetry_spool_segments", "gauge", "Telemetry spool segments waiting for replay"),
+    "spool_bytes": ("ai_telemetry_spool_bytes", "gauge", "Size of the telemetry spool"),
+    "spool_replay_lag_seconds": ("ai_telemetry_spool_replay_lag_seconds", "gauge", "Age of the oldest spooled event"),
+    "spooled_events": ("ai_telemetry_spooled_events_total", "counter", "Telemetry events written to the spool"),
+}
+
+CACHES = {
+    "trip_plans": trip_plan_cache,
+    "explain_context": explain_context_cache,
+    "verified_tokens": token_verifier.cache,
+}
+
+# Two-tier caches: L1 is reported with CACHES, L2 lookups separately
+TIERED_CACHES = {
+    name: cache
+    for name, cache in {"integration": integration_client.cache, "explanations": shared_explanations}.items()
+    if cache is not None
+}
+
+
+def _cache_samples(name: str, cache: LRUCache) -> List[Sample]:
+    stats = cache.stats()
+    labels = {"cache": name}
+    return [
+        ("ai_cache_entries", "gauge", "Entries in in-process caches", labels, stats["size"]),
+        ("ai_cache_hits_total", "counter", "In-process cache hits", labels, stats["hits"]),
+        ("ai_cache_misses_total", "counter", "In-process cache misses", labels, stats["misses"]),
+        ("ai_cache_evictions_total", "counter", "In-process cache evictions", labels, stats["evictions"]),
+    ]
+
+
+def service_samples() -> List[Sample]:
+    """Telemetry writer/spool, cache and local fast-path counters of this process."""
+    samples: List[Sample] = []
+    for key, value in telemetry_writer.stats().items():
+        if key in TELEMETRY_METRICS:
+            name, kind, documentation = TELEMETRY_METRICS[key]
+            samples.append((name, kind, documentation, {}, value))
+
+    for name, cache in CACHES.items():
+        samples.extend(_cache_samples(name, cache))
+    for name, cache in TIERED_CACHES.items():
+        samples.extend(_cache_samples(name, cache.l1))
+        stats = cache.stats()
+        for result in ("hits", "misses", "errors"):
+            samples.append(("ai_shared_cache_lookups_total", "counter", "Shared (L2) cache lookups by result",
+                            {"cache": name, "result": result}, stats[f"l2_{result}"]))
+
+    router = question_router.stats()
+    samples.append(("ai_explain_questions_total", "counter", "/explain questions by where they were answered",
+                    {"route": "local"}, router["local_answers"]))
+    samples.append(("ai_explain_questions_total", "counter", "/explain questions by where they were answered",
+                    {"route": "llm"}, router["questions"] - router["local_answers"]))
+    editor = plan_editor.stats()
+    samples.append(("ai_improve_requests_total", "counter", "/improve requests by where they were applied",
+                    {"route": "local"}, editor["local_edits"]))
+    samples.append(("ai_improve_requests_total", "counter", "/improve requests by where they were applied",
+                    {"route": "llm"}, editor["requests"] - editor["local_edits"]))
+    return samples
@@ -0,0 +1,158 @@
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = "integration"
+# Tables range-partitioned by month on created_at
+PARTITIONED_TABLES = ("ai_runs", "ai_run_payloads")
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """First day of the month `months` away from value's month."""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[datetime]:
+    """Month covered by a partition created by this module (None for others, e.g. the default partition)."""
+    if not name.startswith(f"{table}_"):
+        return None
+    try:
+        return datetime.strptime(name[len(table) + 1:], "%Y_%m")
+    except ValueError:
+        return None
+
+
+class PartitionManager:
+    """
+    Monthly partition maintenance for telemetry tables.
+
+    Creates partitions ahead of time so inserts never land in the default
+    partition, and drops whole partitions past the retention window instead
+    of deleting rows.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def partitions(self, table: str) -> List[str]:
+        """Names of the existing partitions of a table."""
+        result = await self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "JOIN pg_namespace ns ON ns.oid = parent.relnamespace "
+                "WHERE ns.nspname = :schema AND parent.relname = :table "
+                "ORDER BY child.relname"
+            ),
+            {"schema": SCHEMA, "table": table},
+        )
+        return list(result.scalars().all())
+
+    async def ensure_partitions(self, months_ahead: int, now: Optional[datetime] = None) -> List[str]:
+        """Create partitions from the current month through `months_ahead` months ahead."""
+        current = month_start(now or datetime.utcnow())
+        created = []
+        for table in PARTITIONED_TABLES:
+            existing = set(await self.partitions(table))
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                name = partition_name(table, month)
+                if name in existing:
+                    continue
+                bounds = f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+                default = await self.default_partition(table)
+                if default is not None and await self._has_rows(default, month):
+                    await self._split_from_default(table, default, name, month, bounds)
+                else:
+                    await self.db.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {SCHEMA}.{name} PARTITION OF {SCHEMA}.{table} {bounds}"
+                    ))
+                created.append(name)
+        await self.db.commit()
+        return created
+
+    async def default_partition(self, table: str) -> Optional[str]:
+        """Name of the table's DEFAULT partition, if it has one."""
+        result = await self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_partitioned_table part "
+                "JOIN pg_class parent ON parent.oid = part.partrelid "
+                "JOIN pg_class child ON child.oid = part.partdefid "
+                "JOIN pg_namespace ns ON ns.oid = parent.relnamespace "
+                "WHERE ns.nspname = :schema AND parent.relname = :table"
+            ),
+            {"schema": SCHEMA, "table": table},
+        )
+        return result.scalar_one_or_none()
+
+    async def _has_rows(self, partition: str, month: datetime) -> bool:
+        result = await self.db.execute(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {SCHEMA}.{partition} "
+                f"WHERE created_at >= :start AND created_at < :end)"
+            ),
+            {"start": month, "end": add_months(month, 1)},
+        )
+        return bool(result.scalar())
+
+    async def _split_from_default(self, table: str, default: str, name: str, month: datetime, bounds: str) -> None:
+        """
+        Create a month's partition when the DEFAULT partition already holds rows
+        of that month (CREATE ... PARTITION OF would fail): build it as a plain
+        table, move the rows over and attach it, all in the current transaction.
+        """
+        rows = {"start": month, "end": add_months(month, 1)}
+        await self.db.execute(text(
+            f"CREATE TABLE {SCHEMA}.{name} (LIKE {SCHEMA}.{table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        moved = await self.db.execute(text(
+            f"WITH moved AS (DELETE FROM {SCHEMA}.{default} "
+            f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {SCHEMA}.{name} SELECT * FROM moved"
+        ), rows)
+        await self.db.execute(text(f"ALTER TABLE {SCHEMA}.{table} ATTACH PARTITION {SCHEMA}.{name} {bounds}"))
+        logger.warning("Moved %d rows of %s from %s into the new partition", moved.rowcount, name, default)
+
+    async def drop_expired(self, retention_months: int, now: Optional[datetime] = None) -> List[str]:
+        """Drop partitions whose whole month is older than the retention window."""
+        cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+        dropped = []
+        for table in PARTITIONED_TABLES:
+            for name in await self.partitions(table):
+                month = partition_month(table, name)
+                if month is not None and add_months(month, 1) <= cutoff:
+                    await self.db.execute(text(f"DROP TABLE IF EXISTS {SCHEMA}.{name}"))
+                    dropped.append(name)
+        await self.db.commit()
+        return dropped
+
+    async def maintain(
+        self,
+        months_ahead: Optional[int] = None,
+        retention_months: Optional[int] = None,
+    ) -> Dict[str, List[str]]:
+        """Create upcoming partitions and apply retention. Returns created and dropped partitions."""
+        created = await self.ensure_partitions(
+            settings.AI_RUNS_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+        )
+        dropped = await self.drop_expired(
+            settings.AI_RUNS_RETENTION_MONTHS if retention_months is None else retention_months
+        )
+        return {"created": created, "dropped": dropped}
@@ -0,0 +1,325 @@
+import re
+from collections import Counter
+from typing import Optional, List, Dict, Any, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas.response import TripPlan, ImproveResponse
+from app.services.plan_lookup import DAY_NUMBER, DAY_ORDINAL, find_day, day_items, match_items, names_kind
+
+# Verbs of each operation; a verb no operation consumed means the request was not understood
+OPERATION_VERBS = {
+    "remove_day": re.compile(
+        r"\b(?:remove|delete|drop|skip|cancel|прибер\w*|прибрат\w*|видал\w*|скасу\w*)\b"
+    ),
+    "shift_day": re.compile(
+        r"\b(?:later|earlier|move|shift|push|delay|postpone|start|begin|пізніше|раніше|перенес\w*|зсун\w*"
+        r"|почина\w*|почати|початок)\b"
+    ),
+    "scale_budget": re.compile(
+        r"\b(?:lower|reduce|cut|decrease|drop|raise|increase|зменш\w*|знизи\w*|знизь\w*|скорот\w*|урі\w*"
+        r"|збільш\w*|підвищ\w*|підніми\w*)\b"
+    ),
+    "swap": re.compile(r"\b(?:swap|switch|exchange|поміня\w*|переставт\w*|зміни\w* місцями)\b"),
+}
+EDIT_VERB = "|".join(f"(?:{pattern.pattern})" for pattern in OPERATION_VERBS.values())
+# Independent edits in one request: "remove day 3; lower the budget by 20%", "remove day 3 and make day 2 later"
+CLAUSE_SPLIT = re.compile(
+    r"[;\n]|\.(?=\s|$)|\b(?:then|also|потім|також)\b"
+    r"|\s(?:and|і|й|та),?\s+(?=(?:\w+\s+)?(?:" + EDIT_VERB + r"))"
+)
+# Anything asking for new content needs the LLM
+CREATIVE = re.compile(
+    r"\b(add|more|less|replace|instead|suggest|find|new|another|different|"
+    r"дода\w*|більше|менше|замін\w*|замість|нов\w*|інш\w*|запропону\w*|знайд\w*)\b"
+)
+
+REMOVE_DAY = re.compile(
+    r"^\W*(?:please\s+|будь ласка,?\s+)?(?:remove|delete|drop|skip|cancel|прибер\w*|прибрат\w*|видал\w*|скасу\w*)"
+    r"\s+(?:the\s+)?(?:whole\s+|entire\s+|весь\s+|цілий\s+)?(.+?)\W*$"
+)
+SHIFT = re.compile(r"\b(later|earlier|пізніше|раніше)\b")
+START_AT = re.compile(r"(?:start|begin|почина\w*|почати|початок).*?\b(\d{1,2})[:.](\d{2})")
+EVERY_DAY = re.compile(r"every day|each day|all days|щодня|кожн\w* д\w+|всі дні|усі дні")
+SHIFT_MINUTES = re.compile(r"(\d+)\s*(?:min|minutes|хв\w*)")
+SHIFT_HOURS = re.compile(r"(\d+)\s*(?:hours?|h\b|год\w*)")
+HALF_HOUR = re.compile(r"half an hour|півгодини|пів години")
+
+BUDGET = re.compile(r"budget|cost|price|spend|бюджет|вартість|витрат\w*|ціну|ціни")
+BUDGET_DOWN = re.compile(r"\b(lower|reduce|cut|decrease|drop|зменш\w*|знизи\w*|знизь\w*|скорот\w*|урі\w*)\b")
+BUDGET_UP = re.compile(r"\b(raise|increase|збільш\w*|підвищ\w*|підніми\w*)\b")
+PERCENT = re.compile(r"(\d{1,2}(?:[.,]\d+)?)\s*(?:%|percent|відсот\w*)")
+
+SWAP = re.compile(r"\b(?:swap|switch|exchange|поміня\w*|поміняй\w*|переставт\w*|зміни\w* місцями)\b(.*)$")
+SWAP_FILLER = re.compile(r"\b(?:the order of|the order|order of|порядок|місцями)\b")
+SWAP_SPLIT = re.compile(r"\s(?:and|with|і|й|та|з|із)\s")
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _format_money(value: float, currency: str) -> str:
+    return f"{value:,.0f}".replace(",", " ") + f" {currency}"
+
+
+def _reflow(items: List[Dict[str, Any]], slots: List[Optional[int]]) -> bool:
+    """
+    Renumber a day's items in their new order and move start times so the
+    day keeps its original slots without overlaps. False if a time runs
+    past midnight.
+    """
+    previous_end = None
+    for order_index, (item, slot) in enumerate(zip(items, slots), start=1):
+        item["order_index"] = order_index
+        if slot is None:
+            previous_end = None
+            continue
+        start = slot if previous_end is None else max(slot, previous_end)
+        end = start + (item.get("duration_minutes") or 0)
+        if end > 24 * 60 or start >= 24 * 60:
+            return False
+        item["start_time"] = _clock(start)
+        previous_end = end
+    return True
+
+
+class PlanEditor:
+    """
+    Applies mechanical /improve requests to a TripPlan without the LLM.
+
+    Recognises removing a day, shifting a day's start, scaling the budget by
+    a percentage and swapping two activities of a day (English or
+    Ukrainian). Times, costs and order_index are recomputed and the result
+    is validated against TripPlan; anything unrecognised, creative or
+    invalid returns None so the caller falls back to the LLM.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.local_edits = 0
+        self.operations: Counter = Counter()
+
+    def apply(self, plan: TripPlan, improvement_request: str) -> Optional[ImproveResponse]:
+        """Edited plan with the changes made, or None to ask the LLM."""
+        self.requests += 1
+        text = improvement_request.lower()
+        if CREATIVE.search(text):
+            return None
+        clauses = [clause.strip() for clause in CLAUSE_SPLIT.split(text) if clause and clause.strip()]
+        if not clauses:
+            return None
+
+        changes = []
+        operations = []
+        for clause in clauses:
+            for operation in ("remove_day", "shift_day", "scale_budget", "swap"):
+                result = getattr(self, f"_{operation}")(plan, clause)
+                if result is not None:
+                    break
+            else:
+                return None
+            if self._unconsumed_verbs(clause, operation):
+                return None
+            data, change = result
+            try:
+                plan = TripPlan.model_validate(data)
+            except ValidationError:
+                return None
+            changes.append(change)
+            operations.append(operation)
+
+        self.local_edits += 1
+        self.operations.update(operations)
+        return ImproveResponse(
+            improved_plan=plan,
+            changes_made=changes,
+            improvement_summary="Маршрут змінено без перегенерації: " + "; ".join(changes),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Handled request counts and local hit ratio."""
+        return {
+            "requests": self.requests,
+            "local_edits": self.local_edits,
+            "hit_ratio": self.local_edits / self.requests if self.requests else 0.0,
+            "operations": dict(self.operations),
+        }
+
+    @staticmethod
+    def _unconsumed_verbs(clause: str, operation: str) -> set:
+        """Edit verbs in the clause that belong to other operations than the one applied."""
+        own = {match.group() for match in OPERATION_VERBS[operation].finditer(clause)}
+        return {
+            match.group()
+            for other, pattern in OPERATION_VERBS.items() if other != operation
+            for match in pattern.finditer(clause)
+        } - own
+
+    @staticmethod
+    def _names_items(plan: TripPlan, text: str) -> bool:
+        """Whether the text names activities (a meal, a kind of place, a place), not just days."""
+        return names_kind(text) or bool(match_items(plan, text, list(plan.itinerary)))
+
+    @staticmethod
+    def _remove_day(plan: TripPlan, text: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        match = REMOVE_DAY.match(text)
+        if match is None:
+            return None
+        target = match.group(1)
+        if not (DAY_NUMBER.fullmatch(target) or DAY_ORDINAL.fullmatch(target)):
+            return None
+        day = find_day(target)
+        if day is None or day > plan.duration_days or plan.duration_days == 1:
+            return None
+
+        data = plan.model_dump()
+        removed = [item for item in data["itinerary"] if item["day_index"] == day]
+        data["itinerary"] = [item for item in data["itinerary"] if item["day_index"] != day]
+        for item in data["itinerary"]:
+            if item["day_index"] > day:
+                item["day_index"] -= 1
+        data["duration_days"] -= 1
+        removed_cost = sum(item["estimated_cost"] or 0 for item in removed)
+        data["total_budget_estimate"] = max(0.0, data["total_budget_estimate"] - removed_cost)
+        return data, (
+            f"Видалено день {day} ({len(removed)} активн.), наступні дні зсунуто; "
+            f"бюджет зменшено на {_format_money(removed_cost, plan.currency)}"
+        )
+
+    @staticmethod
+    def _shift_day(plan: TripPlan, text: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        start_at = START_AT.search(text)
+        direction = SHIFT.search(text)
+        if start_at is None and direction is None:
+            return None
+        # Only whole days are shifted; moving single activities needs the LLM
+        if PlanEditor._names_items(plan, text):
+            return None
+        day = find_day(text)
+        if day is not None:
+            days = [day]
+        elif EVERY_DAY.search(text):
+            days = list(range(1, plan.duration_days + 1))
+        else:
+            return None
+
+        data = plan.model_dump()
+        descriptions = []
+        for day_index in days:
+            items = [item for item in data["itinerary"] if item["day_index"] == day_index and item["start_time"]]
+            if not items:
+                return None
+            first = min(_minutes(item["start_time"]) for item in items)
+            if start_at is not None:
+                offset = int(start_at.group(1)) * 60 + int(start_at.group(2)) - first
+            else:
+                minutes = SHIFT_MINUTES.search(text)
+                hours = SHIFT_HOURS.search(text)
+                if minutes:
+                    offset = int(minutes.group(1))
+                elif hours:
+                    offset = int(hours.group(1)) * 60
+                else:
+                    offset = 30 if HALF_HOUR.search(text) else 60
+                if direction.group(1) in ("earlier", "раніше"):
+                    offset = -offset
+            for item in items:
+                start = _minutes(item["start_time"]) + offset
+                if start < 0 or start + (item["duration_minutes"] or 0) > 24 * 60:
+                    return None
+                item["start_time"] = _clock(start)
+            descriptions.append(f"день {day_index} тепер починається о {_clock(first + offset)}")
+        if not offset:
+            return None
+        return data, "Зсунуто розклад: " + ", ".join(descriptions)
+
+    @staticmethod
+    def _scale_budget(plan: TripPlan, text: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        percent = PERCENT.search(text)
+        if percent is None or not BUDGET.search(text):
+            return None
+        value = float(percent.group(1).replace(",", "."))
+        if BUDGET_DOWN.search(text):
+            factor = 1 - value / 100
+        elif BUDGET_UP.search(text):
+            factor = 1 + value / 100
+        else:
+            return None
+        if factor <= 0:
+            return None
+        # Whole trip or one day; costs of single activities need the LLM
+        if PlanEditor._names_items(plan, text):
+            return None
+        day = None if EVERY_DAY.search(text) else find_day(text)
+        if day is not None and day > plan.duration_days:
+            return None
+
+        data = plan.model_dump()
+        before = after = 0.0
+        for item in data["itinerary"]:
+            if item["estimated_cost"] is not None and day in (None, item["day_index"]):
+                before += item["estimated_cost"]
+                item["estimated_cost"] = round(item["estimated_cost"] * factor, 2)
+                after += item["estimated_cost"]
+        verb = "Зменшено" if factor < 1 else "Збільшено"
+        if day is None:
+            data["total_budget_estimate"] = round(plan.total_budget_estimate * factor, 2)
+            return data, (
+                f"{verb} бюджет на {value:g}%: {_format_money(plan.total_budget_estimate, plan.currency)} → "
+                f"{_format_money(data['total_budget_estimate'], plan.currency)}"
+            )
+        if not before:
+            return None
+        data["total_budget_estimate"] = round(max(0.0, plan.total_budget_estimate + after - before), 2)
+        return data, (
+            f"{verb} витрати дня {day} на {value:g}%: {_format_money(before, plan.currency)} → "
+            f"{_format_money(after, plan.currency)}"
+        )
+
+    @staticmethod
+    def _swap(plan: TripPlan, text: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        match = SWAP.search(text)
+        if match is None:
+            return None
+        parts = SWAP_SPLIT.split(SWAP_FILLER.sub(" ", match.group(1)), maxsplit=1)
+        if len(parts) != 2:
+            return None
+        day = find_day(text)
+        candidates = day_items(plan, day) if day is not None else list(plan.itinerary)
+        first_matches = match_items(plan, parts[0], candidates)
+        second_matches = match_items(plan, parts[1], candidates)
+        pairs = [
+            (first, second) for first in first_matches for second in second_matches
+            if first is not second and first.day_index == second.day_index
+        ]
+        if len(pairs) != 1:
+            return None
+        first, second = pairs[0]
+
+        data = plan.model_dump()
+        day_index = first.day_index
+        items = sorted(
+            (item for item in data["itinerary"] if item["day_index"] == day_index),
+            key=lambda item: item["order_index"],
+        )
+        slots = [_minutes(item["start_time"]) if item["start_time"] else None for item in items]
+        positions = {item["order_index"]: position for position, item in enumerate(items)}
+        a, b = positions[first.order_index], positions[second.order_index]
+        items[a], items[b] = items[b], items[a]
+        if not _reflow(items, slots):
+            return None
+        data["itinerary"].sort(key=lambda item: (item["day_index"], item["order_index"]))
+        return data, (
+            f"Поміняно місцями «{first.title}» та «{second.title}» (день {day_index}); "
+            f"час і порядок активностей оновлено"
+        )
+
+
+# Shared by all requests of a worker so its counters cover the whole process.
+plan_editor = PlanEditor()
@@ -0,0 +1,142 @@
+import re
+from typing import Optional, List, Tuple
+
+from app.schemas.response import TripPlan, ItineraryItem
+
+DAY_NUMBER = re.compile(
+    r"(?:day|день|дня|дні)\s*(?:№|#|number\s*)?(\d{1,2})\b"
+    r"|\b(\d{1,2})\s*(?:-?(?:й|го|ий|ого|st|nd|rd|th))?\s*(?:day|день|дня|дні)\b"
+)
+DAY_ORDINALS = [
+    (r"first|перш", 1), (r"second|друг", 2), (r"third|трет", 3), (r"fourth|четверт", 4),
+    (r"fifth|п['ʼ’]?ят", 5), (r"sixth|шост", 6), (r"seventh|сьом", 7), (r"eighth|восьм", 8),
+    (r"ninth|дев['ʼ’]?ят", 9), (r"tenth|десят", 10),
+]
+DAY_ORDINAL = re.compile(
+    r"\b(" + "|".join(pattern for pattern, _ in DAY_ORDINALS) + r")\w*\s+(?:day|день|дня|дні)\b"
+)
+
+# Terms ending in "*" match as word prefixes (Ukrainian inflection), others as whole words.
+# Meal words -> (start, end) window of start_time among food items
+MEALS = {
+    "breakfast": ("00:00", "11:00"), "снідан*": ("00:00", "11:00"),
+    "lunch": ("11:00", "16:00"), "обід*": ("11:00", "16:00"),
+    "dinner": ("16:00", "24:00"), "вечер*": ("16:00", "24:00"),
+}
+# Kinds of place matched against item names, so "museum" finds "Музей мистецтв" but not a theatre
+PLACE_KINDS = (
+    ("museum", "museums", "музе*"),
+    ("gallery", "galleries", "галере*"),
+    ("theatre", "theatres", "theater", "theaters", "театр*"),
+    ("park", "parks", "парк", "парку", "парки", "парків", "парком"),
+    ("garden", "gardens", "сад", "саду", "саді", "сади"),
+    ("restaurant", "restaurants", "ресторан*"),
+    ("cafe", "cafes", "coffee", "кафе", "кав'ярн*", "кавʼярн*", "кав’ярн*"),
+    ("market", "markets", "ринок", "ринк*"),
+    ("bar", "bars", "бар", "бару", "барі", "бари"),
+    ("club", "clubs", "клуб*"),
+)
+# Generic words naming a whole category
+CATEGORY_WORDS = {
+    "food": ("food", "eat", "eating", "meal", "meals", "їжа", "їжі", "їжу", "поїст*"),
+    "culture": ("culture", "cultural", "культур*"),
+    "nature": ("nature", "природ*"),
+    "shopping": ("shopping", "shop", "shops", "шопінг*", "магазин*", "покуп*"),
+    "nightlife": ("nightlife",),
+}
+WORD = re.compile(r"[\w'ʼ’]+")
+
+
+def has_term(words: List[str], term: str) -> bool:
+    """
+    Whether a word list contains a term: whole words, or word prefixes for
+    terms ending in "*", so "eat" does not match "theatre" and "park" does
+    not match "parking".
+    """
+    if term.endswith("*"):
+        return any(word.startswith(term[:-1]) for word in words)
+    return term in words
+
+
+def stem(word: str) -> str:
+    """Crude prefix stem that survives Ukrainian inflection (музей/музею/музеї)."""
+    return word[:5] if len(word) > 5 else word[:-1] if len(word) > 4 else word
+
+
+def find_day(text: str) -> Optional[int]:
+    """Day number referenced in lower-cased text ("day 2", "2-й день", "третього дня")."""
+    match = DAY_NUMBER.search(text)
+    if match:
+        return int(match.group(1) or match.group(2))
+    match = DAY_ORDINAL.search(text)
+    if match:
+        for pattern, number in DAY_ORDINALS:
+            if re.match(pattern, match.group(1)):
+                return number
+    return None
+
+
+def day_items(plan: TripPlan, day: int) -> List[ItineraryItem]:
+    """Items of a day in visiting order."""
+    return sorted(
+        (item for item in plan.itinerary if item.day_index == day),
+        key=lambda item: item.order_index,
+    )
+
+
+def match_items(plan: TripPlan, text: str, candidates: List[ItineraryItem]) -> List[ItineraryItem]:
+    """
+    Items the lower-cased text refers to: a meal, a kind of place, a category
+    or words of the place name. Empty if nothing matches, including when the
+    text names a meal or kind of place that is not among the candidates.
+    """
+    words = WORD.findall(text)
+    for word, (start, end) in MEALS.items():
+        if has_term(words, word):
+            return [
+                item for item in candidates
+                if (item.category or "").lower() == "food" and item.start_time
+                and start <= item.start_time.zfill(5) < end
+            ]
+
+    kinds = [terms for terms in PLACE_KINDS if any(has_term(words, term) for term in terms)]
+    if kinds:
+        return [
+            item for item in candidates
+            if any(
+                has_term(WORD.findall(f"{item.place_name} {item.title}".lower()), term)
+                for terms in kinds for term in terms
+            )
+        ]
+
+    for category, terms in CATEGORY_WORDS.items():
+        if any(has_term(words, term) for term in terms):
+            return [item for item in candidates if (item.category or "").lower() == category]
+
+    # Place names: words shared with the text, ignoring ones common to most items (e.g. the city)
+    stems = {stem(word) for word in words if len(word) >= 4}
+    stems.discard(stem(plan.destination.lower()))
+    matched = [
+        item for item in candidates
+        if stems & {stem(word) for word in WORD.findall(f"{item.place_name} {item.title}".lower())}
+    ]
+    if matched and len(matched) <= max(1, len(candidates) // 2):
+        return matched
+    return []
+
+
+def names_kind(text: str) -> bool:
+    """Whether the lower-cased text names a meal, a kind of place or a category."""
+    words = WORD.findall(text)
+    terms = [*MEALS, *(term for terms in PLACE_KINDS for term in terms)]
+    terms += [term for category_terms in CATEGORY_WORDS.values() for term in category_terms]
+    return any(has_term(words, term) for term in terms)
+
+
+def find_targets(plan: TripPlan, text: str) -> Tuple[Optional[int], List[ItineraryItem]]:
+    """Day mentioned in the text and the items it refers to within that day (or the whole plan)."""
+    day = find_day(text)
+    candidates = day_items(plan, day) if day is not None else sorted(
+        plan.itinerary, key=lambda item: (item.day_index, item.order_index)
+    )
+    return day, match_items(plan, text, candidates)
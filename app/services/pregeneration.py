@@ -0,0 +1,225 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Tuple, Callable
+
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.constants import BudgetBand, BUDGET_BAND_LIMITS, BUDGET_BAND_DAILY_BUDGET
+from app.core.database import AsyncSessionLocal
+from app.core.tracing import tracer
+from app.models.pregenerated_plans import PregeneratedPlan
+from app.schemas.request import RecommendationRequest
+from app.schemas.response import TripPlan
+from app.services.integration_client import IntegrationClient
+from app.services.llm_clients import LLMUsage
+from app.services.llm_engine import LLMEngine
+from app.services.prompts import PromptBuilder
+
+
+class CatalogueEntry(BaseModel):
+    """Single (city, duration, interests, budget band) combination to pre-generate."""
+
+    city: str = Field(..., min_length=2, max_length=100)
+    duration_days: int = Field(..., ge=1, le=15)
+    interests: List[str] = Field(..., min_length=1, max_length=10)
+    budget_band: BudgetBand = BudgetBand.MID
+    transport_modes: List[str] = Field(default=["walking", "public_transport"])
+
+    @field_validator("interests", "transport_modes", mode="before")
+    @classmethod
+    def lowercase_list(cls, v: List[str]) -> List[str]:
+        """Convert all items to lowercase."""
+        if isinstance(v, list):
+            return [item.lower().strip() for item in v]
+        return v
+
+    @property
+    def key(self) -> str:
+        return catalogue_key(self.city, self.duration_days, self.interests, self.budget_band)
+
+
+def catalogue_key(city: str, duration_days: int, interests: List[str], budget_band: BudgetBand) -> str:
+    """Canonical lookup key shared by the generator and the serving path."""
+    return "|".join([
+        city.strip().lower(),
+        str(duration_days),
+        ",".join(sorted(set(interests))),
+        budget_band.value,
+    ])
+
+
+def budget_band_for(request: RecommendationRequest) -> BudgetBand:
+    """Classify a request into a budget band by its daily per-person budget."""
+    constraints = request.constraints
+    daily_budget = request.user_profile.avg_daily_budget
+    if daily_budget is None and constraints.total_budget is not None:
+        daily_budget = constraints.total_budget / constraints.duration_days / constraints.travel_party_size
+    if daily_budget is None:
+        return BudgetBand.MID
+    for band in (BudgetBand.LOW, BudgetBand.MID):
+        if daily_budget < BUDGET_BAND_LIMITS[band]:
+            return band
+    return BudgetBand.HIGH
+
+
+def load_catalogue(path: Path) -> List[CatalogueEntry]:
+    """Load catalogue entries from a JSON file containing a list of objects."""
+    with open(path, encoding="utf-8") as f:
+        return [CatalogueEntry.model_validate(entry) for entry in json.load(f)]
+
+
+class PregeneratedPlanStore:
+    """
+    Repository for pre-generated plans in integration.pregenerated_plans.
+
+    Every call uses its own short-lived session, so a request that looks up
+    a plan does not keep a connection checked out while it waits on the LLM.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def find(self, request: RecommendationRequest) -> Optional[PregeneratedPlan]:
+        """Return a fresh stored plan matching the request, if any."""
+        constraints = request.constraints
+        key = catalogue_key(
+            constraints.destination_city or constraints.origin_city,
+            constraints.duration_days,
+            request.user_profile.interests,
+            budget_band_for(request),
+        )
+        with tracer.span("db.pregenerated.find"):
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(PregeneratedPlan).where(
+                        PregeneratedPlan.catalogue_key == key,
+                        PregeneratedPlan.expires_at > datetime.utcnow(),
+                    )
+                )
+                return result.scalar_one_or_none()
+
+    async def fresh_keys(self, keys: List[str]) -> set:
+        """Return which of the given keys already have a non-expired plan."""
+        if not keys:
+            return set()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(PregeneratedPlan.catalogue_key).where(
+                    PregeneratedPlan.catalogue_key.in_(keys),
+                    PregeneratedPlan.expires_at > datetime.utcnow(),
+                )
+            )
+            return set(result.scalars().all())
+
+    async def save(
+        self,
+        entry: CatalogueEntry,
+        plan: TripPlan,
+        provider: str,
+        usage: LLMUsage,
+    ) -> None:
+        """Insert or refresh the stored plan for a catalogue entry."""
+        now = datetime.utcnow()
+        values = {
+            "catalogue_key": entry.key,
+            "city": entry.city,
+            "duration_days": entry.duration_days,
+            "interests": sorted(set(entry.interests)),
+            "budget_band": entry.budget_band.value,
+            "plan": plan.model_dump(),
+            "provider": provider,
+            "tokens_used": usage.total_tokens,
+            "generated_at": now,
+            "expires_at": now + timedelta(hours=settings.PREGENERATED_PLAN_TTL_HOURS),
+        }
+        statement = insert(PregeneratedPlan).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[PregeneratedPlan.catalogue_key],
+            set_={k: statement.excluded[k] for k in values if k != "catalogue_key"},
+        )
+        async with self.session_factory() as db:
+            try:
+                await db.execute(statement)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+
+class PregenerationService:
+    """
+    Offline generation of popular itineraries.
+
+    Runs the catalogue through the regular LLMEngine path with low
+    concurrency and a pause between generations so it does not compete
+    with live traffic for provider quota.
+    """
+
+    def __init__(
+        self,
+        store: PregeneratedPlanStore,
+        integration: IntegrationClient,
+        llm: LLMEngine,
+    ):
+        self.store = store
+        self.integration = integration
+        self.llm = llm
+
+    async def run(self, entries: List[CatalogueEntry], force: bool = False) -> Dict[str, Any]:
+        """Generate every stale catalogue entry. Returns a summary."""
+        skipped = set() if force else await self.store.fresh_keys([entry.key for entry in entries])
+        pending = [entry for entry in entries if entry.key not in skipped]
+        semaphore = asyncio.Semaphore(settings.PREGENERATION_CONCURRENCY)
+        failures: Dict[str, str] = {}
+
+        async def process(entry: CatalogueEntry):
+            async with semaphore:
+                try:
+                    trip_plan, usage = await self.generate_entry(entry)
+                    await self.store.save(entry, trip_plan, self.llm.provider.value, usage)
+                except Exception as e:
+                    failures[entry.key] = str(e)
+                await asyncio.sleep(settings.PREGENERATION_DELAY_SECONDS)
+
+        await asyncio.gather(*(process(entry) for entry in pending))
+        return {
+            "total": len(entries),
+            "skipped_fresh": len(skipped),
+            "generated": len(pending) - len(failures),
+            "failed": failures,
+        }
+
+    async def generate_entry(self, entry: CatalogueEntry) -> Tuple[TripPlan, LLMUsage]:
+        """Generate a plan for a single catalogue entry."""
+        weather = await self.integration.get_weather(city=entry.city)
+        pois = await self.integration.search_pois(city=entry.city, interests=entry.interests)
+        daily_budget = BUDGET_BAND_DAILY_BUDGET[entry.budget_band]
+
+        prompts = PromptBuilder.build_recommendation_prompt(
+            preferences={
+                "interests": entry.interests,
+                "transport_modes": entry.transport_modes,
+                "avg_daily_budget": daily_budget,
+            },
+            constraints={
+                "origin_city": entry.city,
+                "destination_city": entry.city,
+                "duration_days": entry.duration_days,
+                "total_budget": daily_budget * entry.duration_days,
+                "travel_party_size": 1,
+            },
+            weather=weather,
+            pois=pois,
+            language="Ukrainian",
+            currency="UAH",
+        )
+        return await self.llm.generate_itinerary(
+            system_prompt=prompts["system"],
+            user_prompt=prompts["user"],
+        )
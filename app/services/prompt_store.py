@@ -0,0 +1,89 @@
+import hashlib
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ai_runs import AIRunPayload
+from app.models.prompt_blocks import PromptBlock
+
+COMPRESSION = "zlib"
+
+
+@dataclass(frozen=True)
+class PromptSegment:
+    """Piece of a prompt addressed by the SHA-256 of its text."""
+    hash: str
+    kind: str
+    text: str
+
+
+def segment(kind: str, text: str) -> PromptSegment:
+    return PromptSegment(hash=hashlib.sha256(text.encode()).hexdigest(), kind=kind, text=text)
+
+
+def split_prompt(prompts: Dict[str, Any]) -> List[PromptSegment]:
+    """
+    Split PromptBuilder output into content-addressed segments.
+
+    The first segment is the system prompt; the rest concatenate to the user
+    prompt, with each shared context block as a segment of its own so it
+    hashes identically across users.
+    """
+    segments = [segment("system", prompts["system"])]
+    user = prompts["user"]
+    position = 0
+    for context in prompts.get("context", []):
+        start = user.find(context, position) if context else -1
+        if start < 0:
+            continue
+        if start > position:
+            segments.append(segment("user", user[position:start]))
+        segments.append(segment("context", context))
+        position = start + len(context)
+    if position < len(user) or len(segments) == 1:
+        segments.append(segment("user", user[position:]))
+    return segments
+
+
+def compress_block(text: str, level: int = 6) -> bytes:
+    return zlib.compress(text.encode(), level)
+
+
+def decompress_block(content: bytes, compression: str) -> str:
+    if compression != COMPRESSION:
+        raise ValueError(f"Unsupported prompt block compression: {compression}")
+    return zlib.decompress(content).decode()
+
+
+class PromptBlockStore:
+    """Reads full prompts back from integration.prompt_blocks on demand."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_prompt(self, hashes: List[str]) -> Dict[str, str]:
+        """Reassemble system and user prompts from block hashes."""
+        result = await self.db.execute(select(PromptBlock).where(PromptBlock.hash.in_(set(hashes))))
+        blocks = {block.hash: block for block in result.scalars().all()}
+        missing = [value for value in hashes if value not in blocks]
+        if missing:
+            raise LookupError(f"Prompt blocks not found: {', '.join(missing)}")
+        texts = [decompress_block(blocks[value].content, blocks[value].compression) for value in hashes]
+        return {"system": texts[0], "user": "".join(texts[1:])}
+
+    async def run_prompt(self, run_id: Any, created_at: datetime) -> Optional[Dict[str, str]]:
+        """Full prompt logged for a run, or None if it was not recorded."""
+        result = await self.db.execute(
+            select(AIRunPayload.prompt_blocks).where(
+                AIRunPayload.run_id == run_id,
+                AIRunPayload.created_at == created_at,
+            )
+        )
+        hashes = result.scalar_one_or_none()
+        if not hashes:
+            return None
+        return await self.load_prompt(hashes)
@@ -28,7 +28,11 @@ RECOMMENDATION_SYSTEM_JSON_SCHEMA = """{{
 EXPLAIN_SYSTEM_PROMPT_JSON_SCHEMA = """{
   "explanation": "string - detailed text explanation of the itinerary (REQUIRED)",
   "highlights": ["string"] - list of 3-5 key highlights (REQUIRED),
-  "answered_question": "string or null - answer to specific question if provided"
+  "answers": [{"question": "string", "answer": "string"}] - one answer per user question, in order (empty if no questions)
+}"""
+
+EXPLAIN_FOLLOWUP_JSON_SCHEMA = """{
+  "answers": [{"question": "string", "answer": "string"}] - one answer per user question, in order (REQUIRED)
 }"""
 
 IMPROVE_SYSTEM_PROMPT_JSON_SCHEMA = """{{
@@ -128,7 +132,23 @@ EXPLAIN_USER_PROMPT = """Explain this travel itinerary:
 Respond with a JSON object containing:
 - "explanation": a detailed TEXT string explaining the itinerary
 - "highlights": array of 3-5 key highlights as strings
-- "answered_question": answer to the question if provided, or null
+- "answers": one {{"question", "answer"}} object per user question, in the same order
+
+Respond in {language} language."""
+
+# User prompt template for follow-up questions about an already explained itinerary.
+# Starts with the same plan block as EXPLAIN_USER_PROMPT so providers can reuse the cached prefix.
+EXPLAIN_FOLLOWUP_USER_PROMPT = """Explain this travel itinerary:
+
+{trip_plan}
+
+You have already explained this itinerary to the user:
+{previous_explanation}
+
+{question_context}
+
+Respond with a JSON object containing only:
+- "answers": one {{"question", "answer"}} object per user question, in the same order
 
 Respond in {language} language."""
 
@@ -1,6 +1,8 @@
-import json
+import hashlib
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 
+from app.core.serialization import dumps_block
 from app.services.prompt_templates import (
     RECOMMENDATION_SYSTEM_PROMPT,
     RECOMMENDATION_SYSTEM_JSON_SCHEMA,
@@ -8,14 +10,64 @@ from app.services.prompt_templates import (
     EXPLAIN_SYSTEM_PROMPT,
     EXPLAIN_SYSTEM_PROMPT_JSON_SCHEMA,
     EXPLAIN_USER_PROMPT,
+    EXPLAIN_FOLLOWUP_JSON_SCHEMA,
+    EXPLAIN_FOLLOWUP_USER_PROMPT,
     IMPROVE_SYSTEM_PROMPT,
     IMPROVE_SYSTEM_PROMPT_JSON_SCHEMA,
     IMPROVE_USER_PROMPT,
 )
 
+SYSTEM_PROMPT_KINDS = ("recommend", "explain", "explain_followup", "improve")
+
+
+@lru_cache(maxsize=256)
+def system_prompt(kind: str, language: str, currency: str) -> str:
+    """
+    Rendered system prompt; it only depends on language and currency, so
+    each combination is formatted once (and pre-rendered at startup).
+    """
+    if kind == "recommend":
+        return RECOMMENDATION_SYSTEM_PROMPT.format(
+            language=language,
+            currency=currency,
+            json_schema=RECOMMENDATION_SYSTEM_JSON_SCHEMA.format(currency=currency),
+        )
+    if kind == "explain":
+        return EXPLAIN_SYSTEM_PROMPT.format(language=language, json_schema=EXPLAIN_SYSTEM_PROMPT_JSON_SCHEMA)
+    if kind == "explain_followup":
+        return EXPLAIN_SYSTEM_PROMPT.format(language=language, json_schema=EXPLAIN_FOLLOWUP_JSON_SCHEMA)
+    if kind == "improve":
+        return IMPROVE_SYSTEM_PROMPT.format(
+            language=language,
+            currency=currency,
+            json_schema=IMPROVE_SYSTEM_PROMPT_JSON_SCHEMA.format(currency=currency),
+        )
+    raise ValueError(f"Unknown prompt kind: {kind}")
+
+
+def template_version(*templates: str) -> str:
+    """Short hash of prompt templates, for cache namespaces whose values depend on them."""
+    digest = hashlib.sha256()
+    for template in templates:
+        digest.update(template.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+# Explanations are generated from these; editing one invalidates cached explanations
+EXPLAIN_TEMPLATES_VERSION = template_version(
+    EXPLAIN_SYSTEM_PROMPT, EXPLAIN_SYSTEM_PROMPT_JSON_SCHEMA, EXPLAIN_USER_PROMPT,
+)
+
 
 class PromptBuilder:
-    """Builder for LLM prompts with language and currency support."""
+    """
+    Builder for LLM prompts with language and currency support.
+
+    Besides the system and user prompts, each result lists under "context"
+    the shared blocks embedded verbatim in the user prompt (weather, POIs,
+    plans), which prompt logging stores once by content hash.
+    """
     
     DEFAULT_LANGUAGE = "Ukrainian"
     DEFAULT_CURRENCY = "UAH"
@@ -28,25 +80,18 @@ class PromptBuilder:
         pois: List[Dict[str, Any]],
         language: str = DEFAULT_LANGUAGE,
         currency: str = DEFAULT_CURRENCY,
-    ) -> Dict[str, str]:
+    ) -> Dict[str, Any]:
         """Build system and user prompts for itinerary generation."""
         
         # Format weather context
         weather_context = ""
         if weather and weather.get("forecast"):
-            weather_context = f"\nWEATHER FORECAST for {weather.get('city', 'destination')}:\n{json.dumps(weather['forecast'], ensure_ascii=False, indent=2)}"
+            weather_context = f"\nWEATHER FORECAST for {weather.get('city', 'destination')}:\n{dumps_block(weather['forecast'])}"
         
         # Format POIs context
         pois_context = ""
         if pois:
-            pois_context = f"\nAVAILABLE PLACES (Points of Interest):\n{json.dumps(pois[:15], ensure_ascii=False, indent=2)}"
-        
-        json_schema = RECOMMENDATION_SYSTEM_JSON_SCHEMA.format(currency=currency)
-        system_prompt = RECOMMENDATION_SYSTEM_PROMPT.format(
-            language=language,
-            currency=currency,
-            json_schema=json_schema,
-        )
+            pois_context = f"\nAVAILABLE PLACES (Points of Interest):\n{dumps_block(pois[:15])}"
         
         user_prompt = RECOMMENDATION_USER_PROMPT.format(
             interests=", ".join(preferences.get("interests", [])),
@@ -63,30 +108,65 @@ class PromptBuilder:
             language=language,
         )
         
-        return {"system": system_prompt, "user": user_prompt}
+        return {
+            "system": system_prompt("recommend", language, currency),
+            "user": user_prompt,
+            "context": [weather_context, pois_context],
+        }
     
     @staticmethod
     def build_explain_prompt(
         trip_plan: Dict[str, Any],
-        question: Optional[str] = None,
+        questions: Optional[List[str]] = None,
         language: str = DEFAULT_LANGUAGE,
-    ) -> Dict[str, str]:
-        """Build prompts for explaining a trip plan."""
+        plan_context: Optional[str] = None,
+        previous_explanation: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build prompts for explaining a trip plan and answering questions.
+
+        All questions are numbered into one prompt. With previous_explanation
+        the follow-up template is used, which only asks for the answers.
+        plan_context may be passed pre-serialised to reuse it across calls.
+        """
         
-        question_context = f"USER QUESTION: {question}" if question else "Provide a general explanation of the itinerary."
+        if questions:
+            numbered = "\n".join(f"{index}. {question}" for index, question in enumerate(questions, start=1))
+            question_context = f"USER QUESTIONS:\n{numbered}"
+        else:
+            question_context = "Provide a general explanation of the itinerary."
+        if plan_context is None:
+            plan_context = PromptBuilder.serialize_plan(trip_plan)
         
-        system_prompt = EXPLAIN_SYSTEM_PROMPT.format(
-            language=language,
-            json_schema=EXPLAIN_SYSTEM_PROMPT_JSON_SCHEMA,
-        )
+        if previous_explanation is not None:
+            user_prompt = EXPLAIN_FOLLOWUP_USER_PROMPT.format(
+                trip_plan=plan_context,
+                previous_explanation=previous_explanation,
+                question_context=question_context,
+                language=language,
+            )
+            return {
+                "system": system_prompt("explain_followup", language, PromptBuilder.DEFAULT_CURRENCY),
+                "user": user_prompt,
+                "context": [plan_context],
+            }
         
         user_prompt = EXPLAIN_USER_PROMPT.format(
-            trip_plan=json.dumps(trip_plan, ensure_ascii=False, indent=2),
+            trip_plan=plan_context,
             question_context=question_context,
             language=language,
         )
         
-        return {"system": system_prompt, "user": user_prompt}
+        return {
+            "system": system_prompt("explain", language, PromptBuilder.DEFAULT_CURRENCY),
+            "user": user_prompt,
+            "context": [plan_context],
+        }
+    
+    @staticmethod
+    def serialize_plan(trip_plan: Dict[str, Any]) -> str:
+        """Plan block embedded in explain/improve prompts."""
+        return dumps_block(trip_plan)
     
     @staticmethod
     def build_improve_prompt(
@@ -95,26 +175,33 @@ class PromptBuilder:
         constraints: Optional[Dict[str, Any]] = None,
         language: str = DEFAULT_LANGUAGE,
         currency: str = DEFAULT_CURRENCY,
-    ) -> Dict[str, str]:
+    ) -> Dict[str, Any]:
         """Build prompts for improving a trip plan."""
         
         constraints_context = ""
         if constraints:
-            constraints_context = f"\nNEW CONSTRAINTS:\n{json.dumps(constraints, ensure_ascii=False, indent=2)}"
-        
-        json_schema = IMPROVE_SYSTEM_PROMPT_JSON_SCHEMA.format(currency=currency)
-        system_prompt = IMPROVE_SYSTEM_PROMPT.format(
-            language=language,
-            currency=currency,
-            json_schema=json_schema,
-        )
+            constraints_context = f"\nNEW CONSTRAINTS:\n{dumps_block(constraints)}"
         
+        plan_context = PromptBuilder.serialize_plan(current_plan)
         user_prompt = IMPROVE_USER_PROMPT.format(
-            current_plan=json.dumps(current_plan, ensure_ascii=False, indent=2),
+            current_plan=plan_context,
             improvement_request=improvement_request,
             constraints_context=constraints_context,
             language=language,
             currency=currency,
         )
         
-        return {"system": system_prompt, "user": user_prompt}
+        return {
+            "system": system_prompt("improve", language, currency),
+            "user": user_prompt,
+            "context": [plan_context],
+        }
+
+    @staticmethod
+    def prerender(languages: List[str], currencies: List[str]) -> int:
+        """Render the system prompts of the given languages/currencies ahead of the first request."""
+        for kind in SYSTEM_PROMPT_KINDS:
+            for language in languages:
+                for currency in currencies:
+                    system_prompt(kind, language, currency)
+        return system_prompt.cache_info().currsize
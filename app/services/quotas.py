@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple, Sequence, Callable
+
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.models.quotas import QuotaUsage
+
+logger = logging.getLogger(__name__)
+
+# Window length per metric in seconds
+WINDOWS: Dict[str, int] = {"requests": 60, "tokens": 86400}
+
+quota_rejections = metrics.counter(
+    "ai_quota_rejections_total", "Requests rejected with 429 because a quota was exhausted",
+    ("scope", "metric"),
+)
+
+# Subjects charged for the LLM tokens of the current request
+_token_subjects: ContextVar[Tuple[str, ...]] = ContextVar("quota_token_subjects", default=())
+
+
+class QuotaExceededError(Exception):
+    """A service or user has exhausted one of its quotas."""
+
+    def __init__(self, subject: str, metric: str, limit: int, retry_after: int):
+        super().__init__(f"Quota exceeded for {subject}: {limit} {metric} per {WINDOWS[metric]}s")
+        self.subject = subject
+        self.metric = metric
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Window:
+    """Usage of one fixed window: the total of all workers at the last sync plus local usage since."""
+    synced: int = 0
+    in_flight: int = 0
+    pending: int = 0
+
+    @property
+    def used(self) -> int:
+        return self.synced + self.in_flight + self.pending
+
+
+def _limits(scope: str) -> Dict[str, int]:
+    if scope == "service":
+        return {
+            "requests": settings.QUOTA_SERVICE_REQUESTS_PER_MINUTE,
+            "tokens": settings.QUOTA_SERVICE_TOKENS_PER_DAY,
+        }
+    return {
+        "requests": settings.QUOTA_USER_REQUESTS_PER_MINUTE,
+        "tokens": settings.QUOTA_USER_TOKENS_PER_DAY,
+    }
+
+
+class QuotaTracker:
+    """
+    Requests-per-minute and LLM-tokens-per-day quotas per calling service
+    (the token's sub) and per user.
+
+    Usage is counted in fixed windows and read as a sliding window: the
+    previous window is weighted by the part of it still inside the sliding
+    window. Counting is in memory; every QUOTA_SYNC_INTERVAL_SECONDS each
+    worker adds its local usage to integration.quota_usage and reads back
+    the totals of all workers, so workers share state without a database
+    round trip per request. Between syncs a worker sees the other workers'
+    usage as of the last sync. If Postgres is unavailable, quotas keep
+    being enforced per worker.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._windows: Dict[Tuple[str, str, int], _Window] = {}
+        self._lock = asyncio.Lock()
+        self.rejections = 0
+        self.syncs = 0
+        self.last_sync_error: Optional[str] = None
+
+    def check(self, service: str, user_ids: Sequence[str] = ()) -> None:
+        """
+        Count a request of the service for the given users (one per item,
+        repeated for batches) or raise QuotaExceededError without counting it.
+        Tokens of the request are charged to the service, and to the user
+        when the request is for a single user.
+        """
+        if not settings.QUOTA_ENABLED:
+            return
+        now = time.time()
+        users = Counter(user_ids)
+        charges = [("service", f"service:{service}", max(len(user_ids), 1))]
+        charges += [("user", f"user:{user_id}", count) for user_id, count in users.items()]
+
+        for scope, subject, requests in charges:
+            limits = _limits(scope)
+            if limits["requests"] and self.usage(subject, "requests", now) + requests > limits["requests"]:
+                self._reject(scope, subject, "requests", limits["requests"], requests, now)
+            if limits["tokens"] and self.usage(subject, "tokens", now) >= limits["tokens"]:
+                self._reject(scope, subject, "tokens", limits["tokens"], 1, now)
+        for _, subject, requests in charges:
+            self._window(subject, "requests", now).pending += requests
+
+        _token_subjects.set(tuple(subject for scope, subject, _ in charges if scope == "service" or len(users) == 1))
+
+    def charge_tokens(self, tokens: int) -> None:
+        """Charge LLM tokens to the subjects of the current request."""
+        if not tokens:
+            return
+        now = time.time()
+        for subject in _token_subjects.get():
+            self._window(subject, "tokens", now).pending += tokens
+
+    def usage(self, subject: str, metric: str, now: Optional[float] = None) -> float:
+        """Sliding-window usage estimate of a subject."""
+        now = time.time() if now is None else now
+        length = WINDOWS[metric]
+        start = int(now // length) * length
+        current = self._windows.get((subject, metric, start))
+        previous = self._windows.get((subject, metric, start - length))
+        overlap = 1 - (now - start) / length
+        return (current.used if current else 0) + (previous.used * overlap if previous else 0)
+
+    async def sync(self) -> int:
+        """Push local usage to Postgres and read back all workers' totals; returns the rows read."""
+        async with self._lock:
+            now = time.time()
+            self._prune(now)
+            pushed = {}
+            for key, window in self._windows.items():
+                if window.pending:
+                    window.in_flight, window.pending = window.pending, 0
+                    pushed[key] = window.in_flight
+            try:
+                rows = await self._exchange(pushed, now)
+            except Exception:
+                for key, amount in pushed.items():
+                    self._windows[key].in_flight = 0
+                    self._windows[key].pending += amount
+                raise
+            for key in pushed:
+                self._windows[key].in_flight = 0
+            for subject, metric, window_start, used in rows:
+                key = (subject, metric, int((window_start - datetime(1970, 1, 1)).total_seconds()))
+                if key in self._windows:
+                    self._windows[key].synced = used
+            self.syncs += 1
+            return len(rows)
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Sync usage forever (started from the application lifespan)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.sync()
+                self.last_sync_error = None
+            except Exception as e:
+                self.last_sync_error = f"{type(e).__name__}: {e}"
+                logger.warning("Quota sync failed; enforcing local usage only", exc_info=True)
+
+    async def close(self) -> None:
+        """Push the remaining local usage (on shutdown)."""
+        try:
+            await self.sync()
+        except Exception:
+            logger.warning("Final quota sync failed; local usage since the last sync is lost", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.QUOTA_ENABLED,
+            "windows": len(self._windows),
+            "rejections": self.rejections,
+            "syncs": self.syncs,
+            "last_sync_error": self.last_sync_error,
+        }
+
+    async def _exchange(self, pushed: Dict[Tuple[str, str, int], int], now: float):
+        keys = [
+            (subject, metric, datetime.utcfromtimestamp(start))
+            for subject, metric, start in self._windows
+        ]
+        async with self.session_factory() as db:
+            if pushed:
+                statement = insert(QuotaUsage).values([
+                    {
+                        "subject": subject,
+                        "metric": metric,
+                        "window_start": datetime.utcfromtimestamp(start),
+                        "used": amount,
+                        "updated_at": datetime.utcnow(),
+                    }
+                    for (subject, metric, start), amount in pushed.items()
+                ])
+                statement = statement.on_conflict_do_update(
+                    index_elements=[QuotaUsage.subject, QuotaUsage.metric, QuotaUsage.window_start],
+                    set_={
+                        "used": QuotaUsage.used + statement.excluded.used,
+                        "updated_at": statement.excluded.updated_at,
+                    },
+                )
+                await db.execute(statement)
+            rows = []
+            if keys:
+                rows = (await db.execute(
+                    select(QuotaUsage.subject, QuotaUsage.metric, QuotaUsage.window_start, QuotaUsage.used).where(
+                        tuple_(QuotaUsage.subject, QuotaUsage.metric, QuotaUsage.window_start).in_(keys)
+                    )
+                )).all()
+            # Windows stop counting once they are out of every sliding window
+            await db.execute(delete(QuotaUsage).where(
+                QuotaUsage.window_start < datetime.utcfromtimestamp(now - 2 * max(WINDOWS.values()))
+            ))
+            await db.commit()
+        return rows
+
+    def _window(self, subject: str, metric: str, now: float) -> _Window:
+        length = WINDOWS[metric]
+        key = (subject, metric, int(now // length) * length)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window()
+        return window
+
+    def _prune(self, now: float) -> None:
+        for key in list(self._windows):
+            _, metric, start = key
+            length = WINDOWS[metric]
+            # Keep the current and previous window, and anything still unsynced
+            if start < int(now // length) * length - length and not self._windows[key].pending:
+                del self._windows[key]
+
+    def _reject(self, scope: str, subject: str, metric: str, limit: int, cost: int, now: float) -> None:
+        self.rejections += 1
+        quota_rejections.inc(scope=scope, metric=metric)
+        raise QuotaExceededError(subject, metric, limit, self._retry_after(subject, metric, limit, cost, now))
+
+    def _retry_after(self, subject: str, metric: str, limit: int, cost: int, now: float) -> int:
+        """Seconds until the sliding window has room for the cost again (an upper bound)."""
+        length = WINDOWS[metric]
+        start = int(now // length) * length
+        current = self._windows.get((subject, metric, start))
+        previous = self._windows.get((subject, metric, start - length))
+        room = limit - cost - (current.used if current else 0)
+        if room >= 0 and previous and previous.used:
+            wait = (1 - room / previous.used) * length - (now - start)
+        else:
+            wait = start + length - now
+        return max(1, math.ceil(wait))
+
+
+# Shared by all requests of a worker
+quota_tracker = QuotaTracker()
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.database import engine, telemetry_engine
+from app.services.auth import token_verifier
+from app.services.integration_client import IntegrationClient, integration_client
+from app.services.llm_engine import LLMEngine
+from app.services.prompts import PromptBuilder
+
+logger = logging.getLogger(__name__)
+
+
+async def _open_connections(db_engine: AsyncEngine, count: int) -> int:
+    """Open pooled connections concurrently; they stay in the pool when released."""
+    async def connect():
+        async with db_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(connect() for _ in range(count)))
+    return count
+
+
+class Readiness:
+    """
+    Startup warm-up and the deep readiness probe.
+
+    warm_up() runs from the application lifespan before the first request:
+    it opens database connections in both pools, constructs the default LLM
+    provider client (importing its SDK), renders the system prompts, opens
+    a connection to the Integration Service and fetches the JWKS (if
+    configured). Failed steps are logged and reported but do not stop
+    startup. check() probes every dependency with its own timeout; the
+    service is ready once warm-up has finished and all checks pass.
+    """
+
+    def __init__(self, integration: IntegrationClient = integration_client):
+        self.integration = integration
+        self.import_seconds: Optional[float] = None
+        self.warmed_up = False
+        self.warmup: Dict[str, Dict[str, Any]] = {}
+
+    async def warm_up(self) -> Dict[str, Dict[str, Any]]:
+        steps: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "database": lambda: _open_connections(engine, settings.WARMUP_DB_CONNECTIONS),
+            "telemetry_database": lambda: _open_connections(telemetry_engine, settings.WARMUP_DB_CONNECTIONS),
+            "llm_client": self._construct_llm_client,
+            "prompts": self._prerender_prompts,
+            "integration": self.integration.ping,
+        }
+        if token_verifier.key_set is not None:
+            steps["jwks"] = token_verifier.key_set.refresh
+        results = await asyncio.gather(*(
+            self._timed(name, step, settings.WARMUP_TIMEOUT_SECONDS) for name, step in steps.items()
+        ))
+        self.warmup = dict(zip(steps, results))
+        self.warmed_up = True
+        for name, result in self.warmup.items():
+            if not result["ok"]:
+                logger.warning("Warm-up step %s failed: %s", name, result["error"])
+        return self.warmup
+
+    async def check(self) -> Dict[str, Any]:
+        """Per-dependency probe results; status is "ready" only if all pass."""
+        checks: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "database": lambda: _open_connections(engine, 1),
+            "telemetry_database": lambda: _open_connections(telemetry_engine, 1),
+            "integration": self.integration.ping,
+            "llm_client": self._construct_llm_client,
+        }
+        results = await asyncio.gather(*(
+            self._timed(name, check, settings.READINESS_CHECK_TIMEOUT_SECONDS) for name, check in checks.items()
+        ))
+        ready = self.warmed_up and all(result["ok"] for result in results)
+        return {
+            "status": "ready" if ready else "not_ready",
+            "checks": dict(zip(checks, results)),
+            "warmup": self.warmup,
+            "import_seconds": self.import_seconds,
+        }
+
+    @staticmethod
+    async def _timed(name: str, step: Callable[[], Awaitable[Any]], timeout: float) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(step(), timeout)
+            error = None
+        except asyncio.TimeoutError:
+            detail, error = None, f"timed out after {timeout:g}s"
+        except Exception as e:
+            detail, error = None, f"{type(e).__name__}: {e}"
+        result = {
+            "ok": error is None,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        if detail is not None:
+            result["detail"] = detail
+        if error is not None:
+            result["error"] = error
+        return result
+
+    @staticmethod
+    async def _construct_llm_client() -> str:
+        return LLMEngine().client.model_name
+
+    @staticmethod
+    async def _prerender_prompts() -> int:
+        return PromptBuilder.prerender([PromptBuilder.DEFAULT_LANGUAGE], [PromptBuilder.DEFAULT_CURRENCY])
+
+
+readiness = Readiness()
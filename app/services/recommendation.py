@@ -1,13 +1,43 @@
-from typing import Optional, Dict, Any, List
+import asyncio
+import functools
+import json
+import logging
+import time
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Awaitable, Callable
 
 from fastapi import BackgroundTasks
+from pydantic import ValidationError
 
+from app.core.config import settings
+from app.core.constants import PlanSource, AIEndpoint
+from app.core.metrics import Timer, request_duration, stage_duration, fallback_plans
 from app.schemas.request import RecommendationRequest, ExplainRequest, ImproveRequest
-from app.schemas.response import TripPlan, ExplainResponse, ImproveResponse
-from app.services.telemetry import TelemetryService
+from app.schemas.response import TripPlan, ExplainResponse, ImproveResponse, BatchRecommendationItem, QuestionAnswer
+from app.services.telemetry import TelemetryService, RunHandle
 from app.services.integration_client import IntegrationClient
-from app.services.llm_engine import LLMEngine
+from app.services.llm_clients import LLMUsage
+from app.services.llm_engine import LLMEngine, LLMGenerationError
 from app.services.prompts import PromptBuilder
+from app.services.pregeneration import PregeneratedPlanStore
+from app.services.route_optimizer import RouteOptimizer
+from app.services.explain_context import ExplainContext, explain_context, load_shared_explanation, share_explanation
+from app.services.explain_router import question_router
+from app.services.fallback_planner import FallbackPlanner
+from app.services.plan_editor import plan_editor
+from app.services.trip_plans import TripPlanStore, StoredTripPlan, TripPlanNotFoundError, plan_version
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(endpoint: AIEndpoint):
+    """Record calls of a service method in ai_request_duration_seconds."""
+    def decorate(method):
+        @functools.wraps(method)
+        async def wrapper(self: "RecommendationService", *args, **kwargs):
+            with request_duration.time(endpoint=endpoint.value, provider=self.llm.provider.value):
+                return await method(self, *args, **kwargs)
+        return wrapper
+    return decorate
 
 
 class RecommendationService:
@@ -18,41 +48,238 @@ class RecommendationService:
         telemetry: TelemetryService,
         integration: IntegrationClient,
         llm: LLMEngine,
+        pregenerated: Optional[PregeneratedPlanStore] = None,
+        trip_plans: Optional[TripPlanStore] = None,
     ):
         self.telemetry = telemetry
         self.integration = integration
         self.llm = llm
+        self.pregenerated = pregenerated
+        self.trip_plans = trip_plans
 
+    @_timed(AIEndpoint.RECOMMEND)
     async def generate_recommendation(
         self, 
         request: RecommendationRequest, 
         background_tasks: BackgroundTasks
     ) -> TripPlan:
         """Generate a personalized travel itinerary."""
+        deadline = time.monotonic() + settings.RECOMMEND_DEADLINE_SECONDS
         
         # 1. Create run record (PENDING)
-        initial_prompt_log = f"Generate itinerary for {request.constraints.destination_city or request.constraints.origin_city}"
-        
-        run = await self.telemetry.create_run(
-            user_id=request.user_id,
-            provider=self.llm.provider,
-            prompt=initial_prompt_log, 
-        )
+        with self._stage(AIEndpoint.RECOMMEND, "create_run"):
+            run = await self.telemetry.create_run(
+                user_id=request.user_id,
+                provider=self.llm.provider,
+                prompt=self._recommendation_prompt_log(request), 
+                trip_id=str(request.trip_id) if request.trip_id else None,
+                endpoint=AIEndpoint.RECOMMEND,
+            )
         
         try:
-            # 2. Fetch context data (Weather, POIs)
-            city = request.constraints.destination_city or request.constraints.origin_city
-            interests = request.user_profile.interests
+            # 2. Serve a matching pre-generated plan without calling the LLM
+            with self._stage(AIEndpoint.RECOMMEND, "pregenerated"):
+                trip_plan = await self._pregenerated_plan(request)
+            if trip_plan is not None:
+                self._store_plan(request.trip_id, request.user_id, trip_plan, AIEndpoint.RECOMMEND, background_tasks)
+                background_tasks.add_task(
+                    self.telemetry.complete_run,
+                    run=run,
+                    response=trip_plan.model_dump(),
+                    source=PlanSource.PREGENERATED,
+                )
+                return trip_plan
+
+            # 3. Fetch context data (Weather, POIs)
+            city = self._destination(request)
+            
+            with self._stage(AIEndpoint.RECOMMEND, "weather"):
+                weather = await self.integration.get_weather(
+                    city=city, 
+                    start_date=request.constraints.start_date,
+                    end_date=request.constraints.end_date
+                )
+            with self._stage(AIEndpoint.RECOMMEND, "pois"):
+                pois = await self.integration.search_pois(
+                    city=city, 
+                    interests=request.user_profile.interests
+                )
+            
+            # 4-5. Build prompts and generate with LLM (or plan locally if it cannot answer in time)
+            trip_plan, usage, source = await self._generate_or_fallback(request, weather, pois, [run], deadline)
+            self._store_plan(request.trip_id, request.user_id, trip_plan, AIEndpoint.RECOMMEND, background_tasks)
             
-            weather = await self.integration.get_weather(
-                city=city, 
-                start_date=request.constraints.start_date,
-                end_date=request.constraints.end_date
+            # 6. Log completion (Background)
+            background_tasks.add_task(
+                self.telemetry.complete_run,
+                run=run,
+                response=trip_plan.model_dump(),
+                usage=usage,
+                source=source,
             )
-            pois = await self.integration.search_pois(city=city, interests=interests)
             
+            return trip_plan
+
+        except Exception as e:
+            # 7. Log failure
+            await self.telemetry.fail_run(
+                run=run,
+                error_message=str(e),
+                usage=getattr(e, "usage", None),
+            )
+            raise e
+
+    async def generate_recommendations_batch(
+        self,
+        requests: List[RecommendationRequest],
+    ) -> AsyncIterator[BatchRecommendationItem]:
+        """
+        Generate itineraries for many requests, yielding results as they complete.
+
+        Weather and POIs are fetched once per distinct city context, requests
+        with identical canonical inputs share a single LLM generation, and the
+        number of concurrent generations is bounded by BATCH_MAX_CONCURRENCY.
+        Telemetry rows are created and finalised in bulk.
+        """
+        runs = await self.telemetry.create_runs([
+            {
+                "user_id": request.user_id,
+                "provider": self.llm.provider,
+                "prompt": self._recommendation_prompt_log(request),
+                "trip_id": str(request.trip_id) if request.trip_id else None,
+                "endpoint": AIEndpoint.RECOMMEND_BATCH,
+            }
+            for request in requests
+        ])
+
+        # Collapse requests with identical generation inputs
+        groups: Dict[str, List[int]] = {}
+        for index, request in enumerate(requests):
+            groups.setdefault(self._canonical_key(request), []).append(index)
+
+        semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+        context_tasks: Dict[Tuple, asyncio.Task] = {}
+
+        def fetch_once(key: Tuple, factory: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+            if key not in context_tasks:
+                context_tasks[key] = asyncio.create_task(factory())
+            return context_tasks[key]
+
+        async def run_group(indices: List[int]):
+            request = requests[indices[0]]
+            city = self._destination(request)
+            constraints = request.constraints
+            interests = sorted(set(request.user_profile.interests))
+            try:
+                async with semaphore:
+                    weather = await fetch_once(
+                        ("weather", self._city_key(city), constraints.start_date, constraints.end_date),
+                        lambda: self.integration.get_weather(
+                            city=city,
+                            start_date=constraints.start_date,
+                            end_date=constraints.end_date,
+                        ),
+                    )
+                    pois = await fetch_once(
+                        ("pois", self._city_key(city), tuple(interests)),
+                        lambda: self.integration.search_pois(city=city, interests=interests),
+                    )
+                    trip_plan, usage, source = await self._generate_or_fallback(
+                        request, weather, pois, [runs[index] for index in indices], endpoint=AIEndpoint.RECOMMEND_BATCH
+                    )
+                return indices, trip_plan, usage, source, None
+            except Exception as e:
+                return indices, None, None, None, str(e)
+
+        tasks = [asyncio.create_task(run_group(indices)) for indices in groups.values()]
+        completed: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
+        finished: set = set()
+        staged: List[StoredTripPlan] = []
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                indices, trip_plan, usage, source, error = await next_done
+                for position, index in enumerate(indices):
+                    finished.add(index)
+                    if error is None and requests[index].trip_id and self.trip_plans is not None:
+                        stored = self.trip_plans.stage(requests[index].trip_id, requests[index].user_id, trip_plan)
+                        if stored is not None:
+                            staged.append(stored)
+                    if error is None:
+                        # Usage is attributed to the item that triggered the generation
+                        completed.append({
+                            "run": runs[index],
+                            "response": trip_plan.model_dump(),
+                            "usage": usage if position == 0 else None,
+                            "source": source,
+                        })
+                    else:
+                        failed.append({"run": runs[index], "error_message": error})
+                    yield BatchRecommendationItem(
+                        index=index,
+                        user_id=requests[index].user_id,
+                        status="completed" if error is None else "failed",
+                        trip_plan=trip_plan,
+                        error=error,
+                    )
+        finally:
+            for task in list(tasks) + list(context_tasks.values()):
+                task.cancel()
+            failed.extend(
+                {"run": run, "error_message": "Batch cancelled before completion"}
+                for index, run in enumerate(runs)
+                if index not in finished
+            )
+            await self.telemetry.complete_runs(completed)
+            await self.telemetry.fail_runs(failed)
+            for stored in staged:
+                await self.trip_plans.save(stored, AIEndpoint.RECOMMEND_BATCH)
+
+    async def _pregenerated_plan(self, request: RecommendationRequest) -> Optional[TripPlan]:
+        """
+        Look up a stored plan for the request and personalise it locally.
+
+        Requests with explicit dates are always generated, because stored
+        plans were built without a date-specific weather forecast.
+        """
+        if not settings.PREGENERATED_PLANS_ENABLED or self.pregenerated is None:
+            return None
+        constraints = request.constraints
+        if constraints.start_date or constraints.end_date:
+            return None
+
+        stored = await self.pregenerated.find(request)
+        if stored is None:
+            return None
+
+        target_total = constraints.total_budget
+        if target_total is None and request.user_profile.avg_daily_budget is not None:
+            target_total = (
+                request.user_profile.avg_daily_budget
+                * constraints.duration_days
+                * constraints.travel_party_size
+            )
+
+        trip_plan = TripPlan.model_validate(stored.plan)
+        trip_plan = RouteOptimizer.optimize(trip_plan, request.user_profile.transport_modes)
+        return RouteOptimizer.scale_budget(
+            trip_plan,
+            party_size=constraints.travel_party_size,
+            target_total=target_total,
+        )
+
+    async def _generate_plan(
+        self,
+        request: RecommendationRequest,
+        weather: Dict[str, Any],
+        pois: List[Dict[str, Any]],
+        runs: List[RunHandle],
+        endpoint: AIEndpoint = AIEndpoint.RECOMMEND,
+    ) -> Tuple[TripPlan, LLMUsage]:
+        """Build prompts from request context, log them for the runs served and generate a validated plan."""
+        with self._stage(endpoint, "prompt"):
             # TODO Get language and currency from request/user_profile
-            # 3. Build Prompts
             prompts = PromptBuilder.build_recommendation_prompt(
                 preferences=request.user_profile.model_dump(),
                 constraints=request.constraints.model_dump(),
@@ -61,28 +288,186 @@ class RecommendationService:
                 language="Ukrainian",
                 currency="UAH"
             )
-            
-            # 4. Generate with LLM
-            trip_plan, tokens = await self.llm.generate_itinerary(
+            for run in runs:
+                await self.telemetry.record_prompt(run, prompts)
+        
+        with self._stage(endpoint, "llm"):
+            return await self.llm.generate_itinerary(
                 system_prompt=prompts["system"],
-                user_prompt=prompts["user"]
-            )
-            
-            # 5. Log completion (Background)
-            background_tasks.add_task(
-                self.telemetry.complete_run,
-                run_id=run.id,
-                response=trip_plan.model_dump(),
-                tokens_used=tokens
+                user_prompt=prompts["user"],
+                endpoint=endpoint,
             )
-            
-            return trip_plan
 
+    async def _generate_or_fallback(
+        self,
+        request: RecommendationRequest,
+        weather: Dict[str, Any],
+        pois: List[Dict[str, Any]],
+        runs: List[RunHandle],
+        deadline: Optional[float] = None,
+        endpoint: AIEndpoint = AIEndpoint.RECOMMEND,
+    ) -> Tuple[TripPlan, Optional[LLMUsage], PlanSource]:
+        """
+        Plan from the LLM, or from FallbackPlanner if the LLM fails or would
+        run past the deadline (time.monotonic(), less FALLBACK_MARGIN_SECONDS).
+        Without usable POIs the LLM error is raised as before.
+        """
+        if not settings.FALLBACK_PLANNER_ENABLED:
+            trip_plan, usage = await self._generate_plan(request, weather, pois, runs, endpoint)
+            return trip_plan, usage, PlanSource.LLM
+
+        generation = self._generate_plan(request, weather, pois, runs, endpoint)
+        try:
+            if deadline is None:
+                trip_plan, usage = await generation
+            else:
+                remaining = deadline - time.monotonic() - settings.FALLBACK_MARGIN_SECONDS
+                trip_plan, usage = await asyncio.wait_for(generation, max(remaining, 0))
+            return trip_plan, usage, PlanSource.LLM
+        except asyncio.TimeoutError as e:
+            reason, error, usage = "deadline", e, None
         except Exception as e:
-            # 6. Log failure
-            await self.telemetry.fail_run(run_id=run.id, error_message=str(e))
-            raise e
+            reason, error, usage = "llm_error", e, getattr(e, "usage", None)
+
+        try:
+            with self._stage(endpoint, "fallback"):
+                trip_plan = FallbackPlanner.plan(request, weather, pois)
+        except ValueError:
+            raise error from None
+        fallback_plans.inc(endpoint=endpoint.value, provider=self.llm.provider.value, reason=reason)
+        logger.warning("Serving a fallback plan (%s): %r", reason, error)
+        return trip_plan, usage, PlanSource.FALLBACK
+
+    def _stage(self, endpoint: AIEndpoint, stage: str) -> Timer:
+        """Timer of one pipeline stage in ai_stage_duration_seconds."""
+        return stage_duration.time(endpoint=endpoint.value, provider=self.llm.provider.value, stage=stage)
+
+    def _store_plan(
+        self,
+        trip_id: Optional[Any],
+        user_id: Any,
+        trip_plan: TripPlan,
+        source: AIEndpoint,
+        background_tasks: BackgroundTasks,
+    ) -> None:
+        """Make the plan the trip's current version after the response (unless it is another user's trip)."""
+        if trip_id is None or self.trip_plans is None:
+            return
+        stored = self.trip_plans.stage(trip_id, user_id, trip_plan)
+        if stored is not None:
+            background_tasks.add_task(self.trip_plans.save, stored, source)
+
+    async def _resolve_plan(self, trip_id: Any, user_id: Any, override: Optional[Dict[str, Any]]) -> StoredTripPlan:
+        """Inline plan if sent, otherwise the stored plan of the trip."""
+        if self.trip_plans is None:
+            if override is None:
+                raise TripPlanNotFoundError(f"No plan sent for trip {trip_id}")
+            return StoredTripPlan(trip_id=trip_id, user_id=user_id, version=plan_version(override), plan=override)
+        return await self.trip_plans.resolve(trip_id, user_id, override)
+
+    @staticmethod
+    def _explain_prompt_log(trip_id: Any, questions: List[str]) -> str:
+        """Short prompt summary stored in ai_runs for explanations."""
+        if not questions:
+            return f"Explain trip {trip_id}: General explanation"
+        return f"Explain trip {trip_id}: " + " | ".join(questions)
+
+    @staticmethod
+    def _local_answers(context: ExplainContext, questions: List[str]) -> Dict[str, str]:
+        """Answers to the questions that are plain lookups in the plan."""
+        if not settings.EXPLAIN_LOCAL_ANSWERS_ENABLED or context.trip_plan is None:
+            return {}
+        answers = {}
+        for question in questions:
+            answer = question_router.answer(context.trip_plan, question)
+            if answer is not None:
+                answers[question] = answer
+        return answers
+
+    @staticmethod
+    def _local_edit(request: ImproveRequest, current_plan: Dict[str, Any]) -> Optional[ImproveResponse]:
+        """Apply the request without the LLM if it is a mechanical edit of a valid plan."""
+        if not settings.IMPROVE_LOCAL_EDITS_ENABLED or request.constraints:
+            return None
+        try:
+            plan = TripPlan.model_validate(current_plan)
+        except ValidationError:
+            return None
+        return plan_editor.apply(plan, request.improvement_request)
+
+    @staticmethod
+    def _match_answers(
+        questions: List[str],
+        generated: List[QuestionAnswer],
+        usage: Optional[LLMUsage],
+    ) -> Dict[str, str]:
+        """
+        Pair the LLM's answers with the asked questions: by the question text
+        it echoes back, or by position if it rephrased them. A missing or
+        extra answer is a generation error rather than a silently shorter response.
+        """
+        if len(generated) != len(questions):
+            raise LLMGenerationError(
+                f"Expected {len(questions)} explanation answers, got {len(generated)}",
+                usage=usage,
+            )
+
+        def normalise(text: str) -> str:
+            return " ".join(text.split()).casefold()
+
+        by_question = {normalise(answer.question): answer.answer for answer in generated}
+        if len(by_question) == len(questions) and all(normalise(question) in by_question for question in questions):
+            return {question: by_question[normalise(question)] for question in questions}
+        return {question: answer.answer for question, answer in zip(questions, generated)}
+
+    @staticmethod
+    def _with_answers(response: ExplainResponse, questions: List[str], answers: Dict[str, str]) -> ExplainResponse:
+        """Attach the answers in the order the questions were asked."""
+        paired = [
+            QuestionAnswer(question=question, answer=answers[question])
+            for question in questions if question in answers
+        ]
+        return response.model_copy(update={
+            "answers": paired,
+            "answered_question": paired[0].answer if paired else response.answered_question,
+        })
+
+    @staticmethod
+    def _destination(request: RecommendationRequest) -> str:
+        """Resolve the city the itinerary is generated for."""
+        return request.constraints.destination_city or request.constraints.origin_city
 
+    @classmethod
+    def _recommendation_prompt_log(cls, request: RecommendationRequest) -> str:
+        """Short prompt summary stored in ai_runs for recommendations."""
+        return f"Generate itinerary for {cls._destination(request)}"
+
+    @staticmethod
+    def _city_key(city: str) -> str:
+        """City as it appears in dedup and context keys (case and surrounding whitespace ignored)."""
+        return city.strip().lower()
+
+    @staticmethod
+    def _canonical_key(request: RecommendationRequest) -> str:
+        """
+        Canonical form of the inputs that influence generation.
+
+        user_id and timezone do not reach the prompt, and interest or transport
+        ordering is irrelevant, so they are normalised away.
+        """
+        preferences = request.user_profile.model_dump()
+        preferences["interests"] = sorted(set(preferences["interests"]))
+        preferences["transport_modes"] = sorted(set(preferences["transport_modes"]))
+        constraints = request.constraints.model_dump(mode="json")
+        constraints["destination_city"] = RecommendationService._city_key(RecommendationService._destination(request))
+        constraints["origin_city"] = RecommendationService._city_key(constraints["origin_city"])
+        return json.dumps(
+            {"preferences": preferences, "constraints": constraints},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+
+    @_timed(AIEndpoint.EXPLAIN)
     async def explain_itinerary(
         self, 
         request: ExplainRequest, 
@@ -90,42 +475,96 @@ class RecommendationService:
     ) -> ExplainResponse:
         """Explain a specific trip plan."""
         
-        run = await self.telemetry.create_run(
-            user_id=str(request.user_id),
-            provider=self.llm.provider,
-            prompt=f"Explain trip {request.trip_id}: {request.question or 'General explanation'}",
-            trip_id=str(request.trip_id)
-        )
+        with self._stage(AIEndpoint.EXPLAIN, "resolve_plan"):
+            stored = await self._resolve_plan(request.trip_id, request.user_id, request.trip_plan)
+        questions = request.all_questions
+        # TODO Get language from request/user_profile
+        language = "Ukrainian"
+        with self._stage(AIEndpoint.EXPLAIN, "local"):
+            context = explain_context(stored, language)
+            await load_shared_explanation(stored, language, context)
+            answers = self._local_answers(context, questions)
+        pending = [question for question in questions if question not in answers]
         
-        try:
-            # TODO Get language from request/user_profile
-            # Build Prompts
-            prompts = PromptBuilder.build_explain_prompt(
-                trip_plan=request.trip_plan,
-                question=request.question,
-                language="Ukrainian"
-            )
-            
-            # Generate
-            explain_response, tokens = await self.llm.generate_explanation(
-                system_prompt=prompts["system"],
-                user_prompt=prompts["user"]
+        with self._stage(AIEndpoint.EXPLAIN, "create_run"):
+            run = await self.telemetry.create_run(
+                user_id=str(request.user_id),
+                provider=self.llm.provider,
+                prompt=self._explain_prompt_log(request.trip_id, questions),
+                trip_id=str(request.trip_id),
+                endpoint=AIEndpoint.EXPLAIN,
             )
+        
+        try:
+            usage = None
+            source = PlanSource.LLM
+            if questions and not pending:
+                # Every question was a lookup in the plan itself
+                source = PlanSource.LOCAL
+                explain_response = ExplainResponse(
+                    explanation=context.explanation or context.trip_plan.summary,
+                    highlights=context.highlights,
+                )
+            else:
+                # Questions about an already explained plan only ask for the answers
+                follow_up = bool(pending) and context.explanation is not None
+                
+                # Build Prompts
+                with self._stage(AIEndpoint.EXPLAIN, "prompt"):
+                    prompts = PromptBuilder.build_explain_prompt(
+                        trip_plan=stored.plan,
+                        questions=pending,
+                        language=language,
+                        plan_context=context.plan_block,
+                        previous_explanation=context.explanation if follow_up else None,
+                    )
+                    await self.telemetry.record_prompt(run, prompts)
+                
+                # Generate
+                if follow_up:
+                    with self._stage(AIEndpoint.EXPLAIN, "llm"):
+                        generated, usage = await self.llm.generate_explanation_answers(
+                            system_prompt=prompts["system"],
+                            user_prompt=prompts["user"]
+                        )
+                    explain_response = ExplainResponse(
+                        explanation=context.explanation,
+                        highlights=context.highlights,
+                    )
+                else:
+                    with self._stage(AIEndpoint.EXPLAIN, "llm"):
+                        explain_response, usage = await self.llm.generate_explanation(
+                            system_prompt=prompts["system"],
+                            user_prompt=prompts["user"]
+                        )
+                    generated = explain_response
+                answers.update(self._match_answers(pending, generated.answers, usage))
+                if not follow_up:
+                    context.explanation = explain_response.explanation
+                    context.highlights = list(explain_response.highlights)
+                    background_tasks.add_task(share_explanation, stored, language, context)
+            explain_response = self._with_answers(explain_response, questions, answers)
             
             # Log completion
             background_tasks.add_task(
                 self.telemetry.complete_run,
-                run_id=run.id,
+                run=run,
                 response=explain_response.model_dump(),
-                tokens_used=tokens
+                usage=usage,
+                source=source,
             )
             
             return explain_response
             
         except Exception as e:
-            await self.telemetry.fail_run(run_id=run.id, error_message=str(e))
+            await self.telemetry.fail_run(
+                run=run,
+                error_message=str(e),
+                usage=getattr(e, "usage", None),
+            )
             raise e
 
+    @_timed(AIEndpoint.IMPROVE)
     async def improve_itinerary(
         self, 
         request: ImproveRequest, 
@@ -133,40 +572,63 @@ class RecommendationService:
     ) -> ImproveResponse:
         """Improve an existing travel itinerary."""
         
-        run = await self.telemetry.create_run(
-            user_id=str(request.user_id),
-            provider=self.llm.provider,
-            prompt=f"Improve trip {request.trip_id}: {request.improvement_request}",
-            trip_id=str(request.trip_id)
-        )
+        with self._stage(AIEndpoint.IMPROVE, "resolve_plan"):
+            current_plan = (await self._resolve_plan(request.trip_id, request.user_id, request.current_plan)).plan
+        with self._stage(AIEndpoint.IMPROVE, "create_run"):
+            run = await self.telemetry.create_run(
+                user_id=str(request.user_id),
+                provider=self.llm.provider,
+                prompt=f"Improve trip {request.trip_id}: {request.improvement_request}",
+                trip_id=str(request.trip_id),
+                endpoint=AIEndpoint.IMPROVE,
+            )
         
         try:
-            # TODO Get language and currency from request/user_profile
-            # Build Prompts
-            prompts = PromptBuilder.build_improve_prompt(
-                current_plan=request.current_plan,
-                improvement_request=request.improvement_request,
-                constraints=request.constraints.model_dump() if request.constraints else None,
-                language="Ukrainian",
-                currency="UAH"
-            )
+            usage = None
+            source = PlanSource.LOCAL
+            # Mechanical edits (remove a day, shift times, scale the budget, swap activities)
+            with self._stage(AIEndpoint.IMPROVE, "local"):
+                improve_response = self._local_edit(request, current_plan)
+            if improve_response is None:
+                source = PlanSource.LLM
+                # TODO Get language and currency from request/user_profile
+                # Build Prompts
+                with self._stage(AIEndpoint.IMPROVE, "prompt"):
+                    prompts = PromptBuilder.build_improve_prompt(
+                        current_plan=current_plan,
+                        improvement_request=request.improvement_request,
+                        constraints=request.constraints.model_dump() if request.constraints else None,
+                        language="Ukrainian",
+                        currency="UAH"
+                    )
+                    await self.telemetry.record_prompt(run, prompts)
+                
+                # Generate
+                with self._stage(AIEndpoint.IMPROVE, "llm"):
+                    improve_response, usage = await self.llm.generate_improvement(
+                        system_prompt=prompts["system"],
+                        user_prompt=prompts["user"]
+                    )
             
-            # Generate
-            improve_response, tokens = await self.llm.generate_improvement(
-                system_prompt=prompts["system"],
-                user_prompt=prompts["user"]
+            self._store_plan(
+                request.trip_id, request.user_id, improve_response.improved_plan, AIEndpoint.IMPROVE, background_tasks
             )
             
             # Log completion
             background_tasks.add_task(
                 self.telemetry.complete_run,
-                run_id=run.id,
+                run=run,
                 response=improve_response.model_dump(),
-                tokens_used=tokens
+                usage=usage,
+                source=source,
             )
             
             return improve_response
             
         except Exception as e:
-            await self.telemetry.fail_run(run_id=run.id, error_message=str(e))
+            await self.telemetry.fail_run(
+                run=run,
+                error_message=str(e),
+                usage=getattr(e, "usage", None),
+            )
             raise e
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from sqlalchemy import select, text, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.rollups import AIRunRollup, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "ai_runs_hourly"
+# pg_advisory_xact_lock key held while a rollup window is aggregated
+ROLLUP_LOCK_KEY = 0x41495252
+
+# Lower bounds (ms) of the latency/TTFT histogram buckets. Stored histograms
+# are positional, so only ever append new bounds at the end.
+HISTOGRAM_BOUNDS_MS = [
+    0, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 4000, 5000,
+    7500, 10000, 15000, 20000, 30000, 45000, 60000, 90000, 120000,
+]
+
+COUNTER_COLUMNS = (
+    "run_count", "failed_count", "tokens_used", "prompt_tokens", "completion_tokens",
+    "cached_tokens", "latency_count", "latency_sum_ms",
+)
+
+AGGREGATE_SQL = text("""
+    SELECT date_trunc('hour', updated_at) AS bucket_start,
+           provider::text AS provider,
+           coalesce(endpoint, '') AS endpoint,
+           source,
+           count(*) AS run_count,
+           count(*) FILTER (WHERE status = 'failed') AS failed_count,
+           coalesce(sum(tokens_used), 0) AS tokens_used,
+           coalesce(sum(prompt_tokens), 0) AS prompt_tokens,
+           coalesce(sum(completion_tokens), 0) AS completion_tokens,
+           coalesce(sum(cached_tokens), 0) AS cached_tokens,
+           count(latency_ms) AS latency_count,
+           coalesce(sum(latency_ms), 0) AS latency_sum_ms
+    FROM integration.ai_runs
+    WHERE status <> 'pending'
+      AND updated_at > :start AND updated_at <= :end
+      AND created_at >= :created_after
+    GROUP BY 1, 2, 3, 4
+""")
+
+HISTOGRAM_SQL = text("""
+    SELECT date_trunc('hour', updated_at) AS bucket_start,
+           provider::text AS provider,
+           coalesce(endpoint, '') AS endpoint,
+           source,
+           'latency' AS metric,
+           width_bucket(latency_ms, CAST(:bounds AS integer[])) AS bucket,
+           count(*) AS count
+    FROM integration.ai_runs
+    WHERE status <> 'pending' AND latency_ms IS NOT NULL
+      AND updated_at > :start AND updated_at <= :end
+      AND created_at >= :created_after
+    GROUP BY 1, 2, 3, 4, 6
+    UNION ALL
+    SELECT date_trunc('hour', updated_at), provider::text, coalesce(endpoint, ''), source,
+           'ttft', width_bucket(ttft_ms, CAST(:bounds AS integer[])), count(*)
+    FROM integration.ai_runs
+    WHERE status <> 'pending' AND ttft_ms IS NOT NULL
+      AND updated_at > :start AND updated_at <= :end
+      AND created_at >= :created_after
+    GROUP BY 1, 2, 3, 4, 6
+""")
+
+
+def _add_arrays(column: str) -> Any:
+    """Element-wise sum of the stored and the incoming histogram in ON CONFLICT."""
+    return literal_column(
+        f"ARRAY(SELECT a + b FROM unnest(ai_run_rollups_hourly.{column}, excluded.{column}) AS u(a, b))"
+    )
+
+
+def histogram_percentile(histogram: List[int], quantile: float) -> Optional[float]:
+    """Estimate a percentile (ms) by linear interpolation inside the matching bucket."""
+    total = sum(histogram)
+    if not total:
+        return None
+    target = quantile * total
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        if count and cumulative + count >= target:
+            lower = HISTOGRAM_BOUNDS_MS[index]
+            if index + 1 >= len(HISTOGRAM_BOUNDS_MS):
+                return float(lower)
+            upper = HISTOGRAM_BOUNDS_MS[index + 1]
+            return lower + (upper - lower) * (target - cumulative) / count
+        cumulative += count
+    return float(HISTOGRAM_BOUNDS_MS[-1])
+
+
+class TelemetryRollupService:
+    """
+    Incremental hourly rollups of integration.ai_runs.
+
+    Each pass aggregates runs finalised (completed or failed) after the stored
+    watermark, up to ROLLUP_LAG_SECONDS ago so write-behind telemetry has
+    landed, and adds them to the hourly buckets in the same transaction that
+    advances the watermark. A transaction-scoped advisory lock lets every
+    worker run the job while only one aggregates at a time. Runs written
+    later than the lag (e.g. a long spool replay) are not counted.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Aggregate all pending windows. Returns a summary."""
+        end = (now or datetime.utcnow()) - timedelta(seconds=settings.ROLLUP_LAG_SECONDS)
+        windows = 0
+        runs = 0
+        while True:
+            result = await self._rollup_window(end)
+            if result is None:
+                return {"windows": windows, "runs": runs}
+            window_runs, watermark = result
+            windows += 1
+            runs += window_runs
+            if watermark >= end:
+                return {"windows": windows, "runs": runs, "watermark": watermark.isoformat()}
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Run the rollup job forever (started from the application lifespan)."""
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.warning("Telemetry rollup failed, retrying later", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+    async def stats(
+        self,
+        start_date: date,
+        end_date: date,
+        provider: Optional[str] = None,
+        endpoint: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Per day/provider/endpoint statistics read from the rollups only."""
+        query = select(AIRunRollup).where(
+            AIRunRollup.bucket_start >= datetime.combine(start_date, datetime.min.time()),
+            AIRunRollup.bucket_start < datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
+        )
+        if provider:
+            query = query.where(AIRunRollup.provider == provider)
+        if endpoint:
+            query = query.where(AIRunRollup.endpoint == endpoint)
+
+        async with self.session_factory() as db:
+            rows = (await db.execute(query)).scalars().all()
+            watermark = await db.scalar(
+                select(RollupWatermark.watermark).where(RollupWatermark.name == WATERMARK_NAME)
+            )
+
+        merged: Dict[Tuple[date, str, str], Dict[str, Any]] = {}
+        for row in rows:
+            key = (row.bucket_start.date(), row.provider, row.endpoint)
+            bucket = merged.get(key)
+            if bucket is None:
+                bucket = merged[key] = {
+                    **{column: 0 for column in COUNTER_COLUMNS},
+                    "latency_histogram": [0] * len(HISTOGRAM_BOUNDS_MS),
+                    "ttft_histogram": [0] * len(HISTOGRAM_BOUNDS_MS),
+                }
+            for column in COUNTER_COLUMNS:
+                bucket[column] += getattr(row, column)
+            for column in ("latency_histogram", "ttft_histogram"):
+                for index, count in enumerate(getattr(row, column)[:len(HISTOGRAM_BOUNDS_MS)]):
+                    bucket[column][index] += count
+
+        items = []
+        for (day, provider_name, endpoint_name), bucket in sorted(merged.items()):
+            items.append({
+                "day": day,
+                "provider": provider_name,
+                "endpoint": endpoint_name or None,
+                "run_count": bucket["run_count"],
+                "failed_count": bucket["failed_count"],
+                "failure_rate": bucket["failed_count"] / bucket["run_count"] if bucket["run_count"] else 0.0,
+                "tokens_used": bucket["tokens_used"],
+                "prompt_tokens": bucket["prompt_tokens"],
+                "completion_tokens": bucket["completion_tokens"],
+                "cached_tokens": bucket["cached_tokens"],
+                "latency_avg_ms": (
+                    bucket["latency_sum_ms"] / bucket["latency_count"] if bucket["latency_count"] else None
+                ),
+                "latency_p50_ms": histogram_percentile(bucket["latency_histogram"], 0.50),
+                "latency_p95_ms": histogram_percentile(bucket["latency_histogram"], 0.95),
+                "latency_p99_ms": histogram_percentile(bucket["latency_histogram"], 0.99),
+                "ttft_p50_ms": histogram_percentile(bucket["ttft_histogram"], 0.50),
+                "ttft_p95_ms": histogram_percentile(bucket["ttft_histogram"], 0.95),
+            })
+        return {"items": items, "up_to": watermark}
+
+    async def _rollup_window(self, end: datetime) -> Optional[Tuple[int, datetime]]:
+        """
+        Aggregate one window after the watermark in a single transaction.
+        Returns (runs aggregated, new watermark), or None if another worker
+        holds the lock or there is nothing to do.
+        """
+        async with self.session_factory() as db:
+            locked = await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY})
+            if not locked:
+                return None
+
+            start = await db.scalar(
+                select(RollupWatermark.watermark).where(RollupWatermark.name == WATERMARK_NAME)
+            )
+            if start is None:
+                oldest = await db.scalar(text(
+                    "SELECT min(updated_at) FROM integration.ai_runs WHERE status <> 'pending'"
+                ))
+                start = (oldest or end) - timedelta(microseconds=1)
+            if start >= end:
+                return None
+            window_end = min(end, start + timedelta(hours=settings.ROLLUP_MAX_WINDOW_HOURS))
+
+            params = {
+                "start": start,
+                "end": window_end,
+                # Lets Postgres prune ai_runs partitions; runs finish long before this
+                "created_after": start - timedelta(hours=settings.ROLLUP_MAX_RUN_AGE_HOURS),
+            }
+            aggregates = (await db.execute(AGGREGATE_SQL, params)).mappings().all()
+            rows: Dict[Tuple, Dict[str, Any]] = {}
+            for aggregate in aggregates:
+                key = (aggregate["bucket_start"], aggregate["provider"], aggregate["endpoint"], aggregate["source"])
+                rows[key] = {
+                    **aggregate,
+                    "latency_histogram": [0] * len(HISTOGRAM_BOUNDS_MS),
+                    "ttft_histogram": [0] * len(HISTOGRAM_BOUNDS_MS),
+                }
+
+            if rows:
+                histogram_params = {**params, "bounds": HISTOGRAM_BOUNDS_MS}
+                for entry in (await db.execute(HISTOGRAM_SQL, histogram_params)).mappings().all():
+                    key = (entry["bucket_start"], entry["provider"], entry["endpoint"], entry["source"])
+                    # width_bucket is 1-based over the lower bounds
+                    index = min(max(entry["bucket"], 1), len(HISTOGRAM_BOUNDS_MS)) - 1
+                    rows[key][f"{entry['metric']}_histogram"][index] += entry["count"]
+
+                statement = insert(AIRunRollup).values([
+                    {**row, "updated_at": datetime.utcnow()} for row in rows.values()
+                ])
+                statement = statement.on_conflict_do_update(
+                    index_elements=["bucket_start", "provider", "endpoint", "source"],
+                    set_={
+                        **{column: getattr(AIRunRollup, column) + statement.excluded[column] for column in COUNTER_COLUMNS},
+                        "latency_histogram": _add_arrays("latency_histogram"),
+                        "ttft_histogram": _add_arrays("ttft_histogram"),
+                        "updated_at": statement.excluded.updated_at,
+                    },
+                )
+                await db.execute(statement)
+
+            watermark = insert(RollupWatermark).values(
+                name=WATERMARK_NAME, watermark=window_end, updated_at=datetime.utcnow()
+            )
+            await db.execute(watermark.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"watermark": watermark.excluded.watermark, "updated_at": watermark.excluded.updated_at},
+            ))
+            await db.commit()
+            return sum(row["run_count"] for row in rows.values()), window_end
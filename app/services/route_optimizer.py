@@ -0,0 +1,174 @@
+import math
+import re
+from typing import List, Optional
+
+from app.schemas.response import TripPlan, ItineraryItem, GeoCoordinates
+
+# "9:00", "09.30", "18:00:00", "7:30 pm"
+TIME_PATTERN = re.compile(r"^\s*(\d{1,2})[:.](\d{2})(?::\d{2})?\s*([ap]\.?m\.?)?\s*$", re.IGNORECASE)
+
+
+class RouteOptimizer:
+    """
+    Cheap local adjustments of an existing trip plan.
+
+    Used to personalise stored plans without another LLM call: activities
+    inside a day are re-ordered by proximity, start times are recomputed
+    for the user's transport mode and costs are scaled to the budget.
+    """
+
+    # Average door-to-door speed in km/h per transport mode
+    TRANSPORT_SPEED_KMH = {
+        "walking": 4.5,
+        "bicycle": 12.0,
+        "public_transport": 15.0,
+        "car": 25.0,
+        "taxi": 25.0,
+    }
+    DEFAULT_SPEED_KMH = 4.5
+    # Fixed overhead added to every transfer (waiting, parking, etc.)
+    TRANSFER_OVERHEAD_MINUTES = 10
+    DEFAULT_DURATION_MINUTES = 90
+    # Categories whose slot in the day is kept (meals at meal times)
+    ANCHORED_CATEGORIES = {"food"}
+    # Bounds for budget scaling so plans stay realistic
+    MIN_BUDGET_SCALE = 0.5
+    MAX_BUDGET_SCALE = 2.0
+
+    @classmethod
+    def optimize(cls, plan: TripPlan, transport_modes: Optional[List[str]] = None) -> TripPlan:
+        """Re-order each day by proximity and recompute start times."""
+        speed = cls._speed_for(transport_modes or [])
+        items: List[ItineraryItem] = []
+
+        for day_index in sorted({item.day_index for item in plan.itinerary}):
+            day_items = sorted(
+                (item for item in plan.itinerary if item.day_index == day_index),
+                key=lambda item: item.order_index,
+            )
+            items.extend(cls._schedule_day(cls._reorder_day(day_items), speed))
+
+        return plan.model_copy(update={"itinerary": items})
+
+    @classmethod
+    def scale_budget(
+        cls,
+        plan: TripPlan,
+        party_size: int = 1,
+        target_total: Optional[float] = None,
+    ) -> TripPlan:
+        """
+        Scale item costs for the party size and, if given, towards a target total.
+        Costs in stored plans are per person.
+        """
+        base_total = sum(item.estimated_cost or 0 for item in plan.itinerary) or plan.total_budget_estimate
+        factor = float(party_size)
+        if target_total and base_total:
+            fit = target_total / (base_total * party_size)
+            factor *= min(max(fit, cls.MIN_BUDGET_SCALE), cls.MAX_BUDGET_SCALE)
+
+        items = [
+            item.model_copy(update={"estimated_cost": round(item.estimated_cost * factor)})
+            if item.estimated_cost is not None else item
+            for item in plan.itinerary
+        ]
+        return plan.model_copy(update={
+            "itinerary": items,
+            "total_budget_estimate": round(plan.total_budget_estimate * factor),
+        })
+
+    @classmethod
+    def _reorder_day(cls, items: List[ItineraryItem]) -> List[ItineraryItem]:
+        """Nearest-neighbour ordering of movable items, keeping anchored slots fixed."""
+        if len(items) < 3:
+            return items
+
+        movable = [
+            item for item in items[1:]
+            if item.category not in cls.ANCHORED_CATEGORIES and item.coordinates
+        ]
+        if len(movable) < 2:
+            return items
+
+        ordered: List[ItineraryItem] = []
+        current = items[0].coordinates
+        remaining = list(movable)
+        while remaining:
+            nearest = min(remaining, key=lambda item: cls._distance_km(current, item.coordinates))
+            ordered.append(nearest)
+            remaining.remove(nearest)
+            current = nearest.coordinates
+
+        movable_ids = {id(item) for item in movable}
+        replacements = iter(ordered)
+        return [next(replacements) if id(item) in movable_ids else item for item in items]
+
+    @classmethod
+    def _schedule_day(cls, items: List[ItineraryItem], speed_kmh: float) -> List[ItineraryItem]:
+        """Assign order_index and start times sequentially, including travel time."""
+        scheduled: List[ItineraryItem] = []
+        clock: Optional[int] = None
+        previous: Optional[ItineraryItem] = None
+
+        for order_index, item in enumerate(items, start=1):
+            original_start = cls._parse_time(item.start_time)
+            if clock is None:
+                clock = original_start
+            elif previous is not None:
+                clock += previous.duration_minutes or cls.DEFAULT_DURATION_MINUTES
+                clock += cls._travel_minutes(previous.coordinates, item.coordinates, speed_kmh)
+                # Meals do not move earlier than originally planned
+                if item.category in cls.ANCHORED_CATEGORIES and original_start is not None:
+                    clock = max(clock, original_start)
+
+            update = {"order_index": order_index}
+            if clock is not None and clock < 24 * 60:
+                update["start_time"] = f"{clock // 60:02d}:{clock % 60:02d}"
+            scheduled.append(item.model_copy(update=update))
+            previous = item
+
+        return scheduled
+
+    @classmethod
+    def _speed_for(cls, transport_modes: List[str]) -> float:
+        """Fastest speed among the user's preferred transport modes."""
+        speeds = [cls.TRANSPORT_SPEED_KMH[mode] for mode in transport_modes if mode in cls.TRANSPORT_SPEED_KMH]
+        return max(speeds) if speeds else cls.DEFAULT_SPEED_KMH
+
+    @classmethod
+    def _travel_minutes(
+        cls,
+        origin: Optional[GeoCoordinates],
+        destination: Optional[GeoCoordinates],
+        speed_kmh: float,
+    ) -> int:
+        """Estimated transfer time between two places, rounded up to 5 minutes."""
+        if not origin or not destination:
+            return cls.TRANSFER_OVERHEAD_MINUTES
+        minutes = cls._distance_km(origin, destination) / speed_kmh * 60 + cls.TRANSFER_OVERHEAD_MINUTES
+        return int(math.ceil(minutes / 5) * 5)
+
+    @staticmethod
+    def _distance_km(a: Optional[GeoCoordinates], b: Optional[GeoCoordinates]) -> float:
+        """Haversine distance in kilometres."""
+        if not a or not b:
+            return float("inf")
+        lat1, lng1, lat2, lng2 = map(math.radians, (a.lat, a.lng, b.lat, b.lng))
+        h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[int]:
+        """Convert a clock time to minutes since midnight; None if it cannot be parsed."""
+        match = TIME_PATTERN.match(value or "")
+        if match is None:
+            return None
+        hours, minutes = int(match.group(1)), int(match.group(2))
+        suffix = (match.group(3) or "").lower()
+        if suffix:
+            if not 1 <= hours <= 12:
+                return None
+            hours = hours % 12 + (12 if suffix.startswith("p") else 0)
+        if hours > 23 or minutes > 59:
+            return None
+        return hours * 60 + minutes
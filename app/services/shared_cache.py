@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import logging
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple, Set
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.serialization import dumps_value, loads_value
+from app.models.cache_entries import CacheEntry
+from app.services.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_NONE = "none"
+COMPRESSION_ZLIB = "zlib"
+# Longer keys are stored by their SHA-256 (cache_entries.key is String(512))
+MAX_KEY_LENGTH = 256
+
+
+def encode_value(value: Any, compress: bool) -> Tuple[bytes, str]:
+    """JSON bytes of a value, zlib-compressed if asked and at least CACHE_COMPRESS_MIN_BYTES long."""
+    data = dumps_value(value)
+    if compress and len(data) >= settings.CACHE_COMPRESS_MIN_BYTES:
+        return zlib.compress(data, settings.CACHE_COMPRESSION_LEVEL), COMPRESSION_ZLIB
+    return data, COMPRESSION_NONE
+
+
+def decode_value(data: bytes, compression: str) -> Any:
+    if compression == COMPRESSION_ZLIB:
+        data = zlib.decompress(data)
+    elif compression != COMPRESSION_NONE:
+        raise ValueError(f"Unsupported cache value compression: {compression}")
+    return loads_value(data)
+
+
+class CacheStore:
+    """
+    Shared (L2) cache tier in the UNLOGGED integration.cache_entries table,
+    visible to every worker and pod. Expired rows are ignored on read and
+    deleted by purge_expired().
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, str, datetime]]:
+        """(value, compression, expires_at) of a live entry."""
+        async with self.session_factory() as db:
+            row = (await db.execute(
+                select(CacheEntry.value, CacheEntry.compression, CacheEntry.expires_at).where(
+                    CacheEntry.key == key,
+                    CacheEntry.expires_at > datetime.utcnow(),
+                )
+            )).one_or_none()
+        return tuple(row) if row is not None else None
+
+    async def set(self, key: str, value: bytes, compression: str, expires_at: datetime) -> None:
+        statement = insert(CacheEntry).values(
+            key=key,
+            compression=compression,
+            value=value,
+            expires_at=expires_at,
+            created_at=datetime.utcnow(),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[CacheEntry.key],
+            set_={
+                "compression": statement.excluded.compression,
+                "value": statement.excluded.value,
+                "expires_at": statement.excluded.expires_at,
+                "created_at": statement.excluded.created_at,
+            },
+        )
+        async with self.session_factory() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    async def delete(self, key: str) -> None:
+        async with self.session_factory() as db:
+            await db.execute(delete(CacheEntry).where(CacheEntry.key == key))
+            await db.commit()
+
+    async def purge_expired(self) -> int:
+        """Delete expired entries; returns the number deleted."""
+        async with self.session_factory() as db:
+            result = await db.execute(delete(CacheEntry).where(CacheEntry.expires_at <= datetime.utcnow()))
+            await db.commit()
+        return result.rowcount
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Purge expired entries forever (started from the application lifespan)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.purge_expired()
+            except Exception:
+                logger.warning("Purging expired cache entries failed", exc_info=True)
+
+
+class TieredCache:
+    """
+    Two-tier cache of JSON-serialisable values for the services layer.
+
+    L1 is a bounded per-worker LRU; L2 is the shared CacheStore. Reads go
+    L1, then L2 (filling L1), and writes go to both. L1 entries live at
+    most CACHE_L1_MAX_TTL_SECONDS, so a delete() or overwrite in another
+    worker is seen after that time at the latest. Keys are prefixed with
+    the namespace, CACHE_VERSION and the namespace's own version (e.g. a
+    hash of the prompt templates its values depend on), so changing either
+    version invalidates every entry at once. L2 calls are bounded by
+    CACHE_L2_TIMEOUT_SECONDS; if Postgres is slow or down the cache keeps
+    working as L1 only.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        version: str = "1",
+        compress: bool = True,
+        l1_size: Optional[int] = None,
+        store: Optional[CacheStore] = None,
+    ):
+        self.namespace = namespace
+        self.prefix = f"{namespace}:{settings.CACHE_VERSION}.{version}:"
+        self.ttl_seconds = ttl_seconds
+        self.compress = compress
+        self.l1: LRUCache[Any] = LRUCache(l1_size or settings.CACHE_L1_SIZE)
+        self.store = store if store is not None else (cache_store if settings.CACHE_L2_ENABLED else None)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+        self._loading: Dict[str, asyncio.Future] = {}
+        # L2 writes of get_or_set(), kept referenced until they finish
+        self._writes: Set[asyncio.Task] = set()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None or self.store is None:
+            return value
+        entry = await self._l2(self.store.get(self._key(key)))
+        if entry is None:
+            self.l2_misses += 1
+            return None
+        data, compression, expires_at = entry
+        try:
+            value = decode_value(data, compression)
+        except (ValueError, zlib.error):
+            logger.warning("Undecodable %s cache entry %s", self.namespace, key, exc_info=True)
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        self._set_l1(key, value, (expires_at - datetime.utcnow()).total_seconds())
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Cache a value (None is not cached)."""
+        if value is None:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._set_l1(key, value, ttl)
+        if self.store is not None:
+            await self._set_l2(key, value, ttl)
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        """
+        Cached value, or the loader's result (then cached). Concurrent
+        misses for the same key in a worker share one loader call. The
+        result is returned as soon as it is in L1; the L2 write finishes in
+        the background.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        loading = self._loading.get(key)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+            ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            if value is not None:
+                self._set_l1(key, value, ttl)
+            future.set_result(value)
+            if value is not None and self.store is not None:
+                write = asyncio.create_task(self._set_l2(key, value, ttl))
+                self._writes.add(write)
+                write.add_done_callback(self._writes.discard)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved: only waiters, if any, need to see it
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+
+    async def delete(self, key: str) -> None:
+        self.l1.pop(key)
+        if self.store is not None:
+            await self._l2(self.store.delete(self._key(key)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1": self.l1.stats(),
+            "l2_enabled": self.store is not None,
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+            "l2_errors": self.l2_errors,
+        }
+
+    def _key(self, key: str) -> str:
+        if len(self.prefix) + len(key) > MAX_KEY_LENGTH:
+            key = hashlib.sha256(key.encode()).hexdigest()
+        return self.prefix + key
+
+    def _set_l1(self, key: str, value: Any, ttl_seconds: float) -> None:
+        ttl = min(ttl_seconds, settings.CACHE_L1_MAX_TTL_SECONDS)
+        if ttl > 0:
+            self.l1.set(key, value, ttl_seconds=ttl)
+
+    async def _set_l2(self, key: str, value: Any, ttl_seconds: float) -> None:
+        data, compression = encode_value(value, self.compress)
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        await self._l2(self.store.set(self._key(key), data, compression, expires_at))
+
+    async def _l2(self, call: Awaitable[Any]) -> Any:
+        try:
+            return await asyncio.wait_for(call, settings.CACHE_L2_TIMEOUT_SECONDS)
+        except Exception as e:
+            self.l2_errors += 1
+            logger.warning("Shared cache call for %s failed, using L1 only: %s", self.namespace, repr(e))
+            return None
+
+
+cache_store = CacheStore()
@@ -1,18 +1,47 @@
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Dict, Any
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.constants import LLMProvider, PlanSource, AIEndpoint
+from app.core.profiling import record_run
+from app.core.tracing import tracer, current_trace_id
+from app.services.llm_clients import LLMUsage
+from app.services.prompt_store import split_prompt
+from app.services.telemetry_writer import TelemetryWriter
 
-from app.models.ai_runs import AIRun
-from app.core.constants import LLMProvider
+USAGE_COLUMNS = (
+    "tokens_used", "model", "prompt_tokens", "completion_tokens", "cached_tokens",
+    "latency_ms", "ttft_ms", "finish_reason", "retry_count",
+)
+
+
+def usage_columns(usage: Optional[LLMUsage]) -> Dict[str, Any]:
+    """ai_runs usage column values; runs without an LLM call record zero tokens."""
+    if usage is None:
+        return {column: None for column in USAGE_COLUMNS} | {"tokens_used": 0}
+    columns = usage.to_columns()
+    return {column: columns[column] for column in USAGE_COLUMNS}
+
+
+@dataclass(frozen=True)
+class RunHandle:
+    """Reference to an AI run whose row may not be written yet."""
+    id: uuid.UUID
+    created_at: datetime
 
 
 class TelemetryService:
-    """Service for managing AI run telemetry/logging."""
+    """
+    Service for managing AI run telemetry/logging.
 
-    def __init__(self, db: AsyncSession):
-        self.db = db
+    Run IDs are generated client-side and every write goes through the
+    write-behind TelemetryWriter, so no request waits on the database.
+    """
+
+    def __init__(self, writer: TelemetryWriter):
+        self.writer = writer
 
     async def create_run(
         self,
@@ -20,50 +49,105 @@ class TelemetryService:
         provider: LLMProvider,
         prompt: str,
         trip_id: Optional[str] = None,
-    ) -> AIRun:
-        """Create a new AI run record with pending status."""
-        ai_run = AIRun(
-            id=uuid.uuid4(),
-            user_id=uuid.UUID(user_id),
-            trip_id=uuid.UUID(trip_id) if trip_id else None,
-            provider=provider.value,
-            prompt=prompt,
-            status='pending',
-            created_at=datetime.utcnow(),
-        )
-        self.db.add(ai_run)
-        await self.db.commit()
-        await self.db.refresh(ai_run)
-        return ai_run
+        endpoint: Optional[AIEndpoint] = None,
+    ) -> RunHandle:
+        """Queue a new AI run record with pending status."""
+        run = RunHandle(id=uuid.uuid4(), created_at=datetime.utcnow())
+        with tracer.span("telemetry.create_run", run_id=str(run.id)):
+            await self.writer.enqueue_insert(
+                self._run_row(run, user_id, provider, prompt, trip_id, endpoint)
+            )
+        record_run(run.id)
+        return run
+
+    async def record_prompt(self, run: RunHandle, prompts: Dict[str, Any]) -> None:
+        """Queue the full prompt of a run as content-addressed blocks referenced by hash."""
+        if not settings.PROMPT_LOGGING_ENABLED:
+            return
+        segments = split_prompt(prompts)
+        await self.writer.enqueue_blocks(segments)
+        await self.writer.enqueue_update(run.id, run.created_at, {
+            "prompt_blocks": [item.hash for item in segments],
+        })
 
     async def complete_run(
         self,
-        run_id: uuid.UUID,
+        run: RunHandle,
         response: dict,
-        tokens_used: int,
-    ) -> AIRun:
-        """Mark AI run as completed with response data."""
-        ai_run = await self.db.get(AIRun, run_id)
-        if ai_run:
-            ai_run.response = response
-            ai_run.tokens_used = tokens_used
-            ai_run.status = 'completed'  # Use string value for PostgreSQL ENUM
-            ai_run.updated_at = datetime.utcnow()
-            await self.db.commit()
-            await self.db.refresh(ai_run)
-        return ai_run
+        usage: Optional[LLMUsage] = None,
+        source: PlanSource = PlanSource.LLM,
+    ) -> None:
+        """Queue completion of an AI run with response data and LLM usage."""
+        await self.writer.enqueue_update(run.id, run.created_at, {
+            "response": response,
+            **usage_columns(usage),
+            "source": source.value,
+            "status": 'completed',  # Use string value for PostgreSQL ENUM
+            "updated_at": datetime.utcnow(),
+        })
 
     async def fail_run(
         self,
-        run_id: uuid.UUID,
+        run: RunHandle,
         error_message: str,
-    ) -> AIRun:
-        """Mark AI run as failed with error message."""
-        ai_run = await self.db.get(AIRun, run_id)
-        if ai_run:
-            ai_run.status = 'failed'  # Use string value for PostgreSQL ENUM
-            ai_run.error_message = error_message
-            ai_run.updated_at = datetime.utcnow()
-            await self.db.commit()
-            await self.db.refresh(ai_run)
-        return ai_run
+        usage: Optional[LLMUsage] = None,
+    ) -> None:
+        """Queue failure of an AI run with error message and usage spent so far."""
+        values = {
+            "status": 'failed',  # Use string value for PostgreSQL ENUM
+            "error_message": error_message,
+            "updated_at": datetime.utcnow(),
+        }
+        if usage is not None:
+            values.update(usage_columns(usage))
+        await self.writer.enqueue_update(run.id, run.created_at, values)
+
+    async def create_runs(self, runs: List[Dict[str, Any]]) -> List[RunHandle]:
+        """
+        Queue many AI run records with pending status.
+
+        Each item holds user_id, provider, prompt and optional trip_id/endpoint.
+        Returns run handles in the same order as the input.
+        """
+        handles = []
+        for item in runs:
+            run = await self.create_run(
+                user_id=item["user_id"],
+                provider=item["provider"],
+                prompt=item["prompt"],
+                trip_id=item.get("trip_id"),
+                endpoint=item.get("endpoint"),
+            )
+            handles.append(run)
+        return handles
+
+    async def complete_runs(self, results: List[Dict[str, Any]]) -> None:
+        """Queue completion of many AI runs."""
+        for result in results:
+            await self.complete_run(**result)
+
+    async def fail_runs(self, failures: List[Dict[str, Any]]) -> None:
+        """Queue failure of many AI runs."""
+        for failure in failures:
+            await self.fail_run(**failure)
+
+    @staticmethod
+    def _run_row(
+        run: RunHandle,
+        user_id: str,
+        provider: LLMProvider,
+        prompt: str,
+        trip_id: Optional[str],
+        endpoint: Optional[AIEndpoint],
+    ) -> Dict[str, Any]:
+        return {
+            "id": run.id,
+            "user_id": uuid.UUID(user_id),
+            "trip_id": uuid.UUID(trip_id) if trip_id else None,
+            "provider": provider.value,
+            "prompt": prompt,
+            "endpoint": endpoint.value if endpoint else None,
+            "status": 'pending',
+            "created_at": run.created_at,
+            "trace_id": current_trace_id(),
+        }
@@ -0,0 +1,244 @@
+import fcntl
+import json
+import logging
+import os
+import socket
+import struct
+import time
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# Record header: payload length, CRC32 of payload, enqueue timestamp (unix seconds)
+HEADER = struct.Struct(">IId")
+SEGMENT_SUFFIX = ".seg"
+LOCK_FILE = ".lock"
+
+UUID_COLUMNS = {"id", "user_id", "trip_id"}
+DATETIME_COLUMNS = {"created_at", "updated_at"}
+
+
+def encode_event(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Serialise a telemetry event (uuid and datetime values become strings)."""
+    def default(value: Any) -> Any:
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Unsupported telemetry value: {type(value).__name__}")
+
+    return json.dumps({"k": kind, "p": payload}, default=default, ensure_ascii=False).encode()
+
+
+def decode_event(data: bytes, enqueued_at: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Inverse of encode_event. Run inserts spooled before ai_runs was
+    partitioned carry no created_at; they get their enqueue time.
+    """
+    record = json.loads(data)
+    payload = record["p"]
+    if record["k"] == "insert" and "created_at" not in payload and enqueued_at is not None:
+        payload["created_at"] = datetime.utcfromtimestamp(enqueued_at).isoformat()
+    for column in UUID_COLUMNS & payload.keys():
+        if payload[column] is not None:
+            payload[column] = uuid.UUID(payload[column])
+    for column in DATETIME_COLUMNS & payload.keys():
+        if payload[column] is not None:
+            payload[column] = datetime.fromisoformat(payload[column])
+    return record["k"], payload
+
+
+class TelemetrySpool:
+    """
+    Append-only local spool for telemetry events that could not reach Postgres.
+
+    Each process writes length-prefixed, CRC-checked records into numbered
+    segment files under its own directory (guarded by an flock). Appends are
+    fsync'ed once per batch. Segments of processes that exited are adopted
+    by the first worker that takes their directory's lock; it keeps the lock
+    until it has replayed them, so no other worker replays them too.
+    """
+
+    def __init__(self, root: str, segment_max_bytes: int):
+        self.root = Path(root)
+        self.segment_max_bytes = segment_max_bytes
+        self.directory: Optional[Path] = None
+        self._lock_file: Optional[BinaryIO] = None
+        self._current: Optional[BinaryIO] = None
+        self._current_path: Optional[Path] = None
+        self._sequence = 0
+        self._oldest_timestamp: Optional[float] = None
+        # Closed segments of our own are waiting (kept in memory so has_backlog() does no I/O)
+        self._own_backlog = False
+        self._adopted: Dict[Path, BinaryIO] = {}
+        self.spooled_events = 0
+
+    def open(self) -> None:
+        """Claim this process's spool directory."""
+        if self.directory is not None:
+            return
+        self.directory = self.root / f"{socket.gethostname()}-{os.getpid()}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.directory / LOCK_FILE, "wb")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        existing = self._segments_in(self.directory)
+        self._sequence = int(existing[-1].stem) if existing else 0
+        self._own_backlog = bool(existing)
+        self._oldest_timestamp = self._first_timestamp()
+
+    def close(self) -> None:
+        """Close the current segment and release the directory lock."""
+        self.roll()
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        for lock_file in self._adopted.values():
+            lock_file.close()
+        self._adopted.clear()
+        self.directory = None
+
+    def append(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Append a batch of events with a single fsync (blocking, run in a thread)."""
+        self.open()
+        if self._current is None:
+            self._sequence += 1
+            self._current_path = self.directory / f"{self._sequence:020d}{SEGMENT_SUFFIX}"
+            self._current = open(self._current_path, "ab")
+
+        now = time.time()
+        chunks = []
+        for kind, payload in events:
+            data = encode_event(kind, payload)
+            chunks.append(HEADER.pack(len(data), zlib.crc32(data), now))
+            chunks.append(data)
+        self._current.write(b"".join(chunks))
+        self._current.flush()
+        os.fsync(self._current.fileno())
+
+        self.spooled_events += len(events)
+        self._own_backlog = True
+        if self._oldest_timestamp is None:
+            self._oldest_timestamp = now
+        if self._current.tell() >= self.segment_max_bytes:
+            self.roll()
+
+    def roll(self) -> None:
+        """Close the current segment so it becomes eligible for replay."""
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+            self._current_path = None
+
+    def has_backlog(self) -> bool:
+        """True while events of this process wait for replay (no disk access, safe on the event loop)."""
+        return self._current is not None or self._own_backlog
+
+    def segments(self) -> List[Path]:
+        """
+        Closed segments to replay: adopted orphan directories first, then our
+        own (scans the spool root, run in a thread).
+        """
+        if self.directory is None:
+            return []
+        orphans = []
+        if self.root.exists():
+            for directory in sorted(self.root.iterdir()):
+                if directory != self.directory and directory.is_dir() and self._adopt(directory):
+                    orphans.extend(self._segments_in(directory))
+        own = [path for path in self._segments_in(self.directory) if path != self._current_path]
+        return orphans + own
+
+    @staticmethod
+    def read_segment(path: Path) -> List[Tuple[str, Dict[str, Any]]]:
+        """Decode all intact records of a segment; a torn or corrupt tail is skipped."""
+        data = path.read_bytes()
+        events = []
+        offset = 0
+        while offset + HEADER.size <= len(data):
+            length, checksum, enqueued_at = HEADER.unpack_from(data, offset)
+            start = offset + HEADER.size
+            record = data[start:start + length]
+            if len(record) < length or zlib.crc32(record) != checksum:
+                logger.warning("Telemetry spool segment %s has a corrupt tail at byte %d", path, offset)
+                break
+            events.append(decode_event(record, enqueued_at))
+            offset = start + length
+        return events
+
+    def remove(self, path: Path) -> None:
+        """Delete a replayed segment (and its directory if it was adopted and is now empty)."""
+        path.unlink(missing_ok=True)
+        directory = path.parent
+        if directory == self.directory:
+            self._own_backlog = any(
+                segment != self._current_path for segment in self._segments_in(self.directory)
+            )
+        elif not self._segments_in(directory):
+            (directory / LOCK_FILE).unlink(missing_ok=True)
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+            lock_file = self._adopted.pop(directory, None)
+            if lock_file is not None:
+                lock_file.close()
+        self._oldest_timestamp = self._first_timestamp()
+
+    def stats(self) -> Dict[str, Any]:
+        """Spool depth and replay lag."""
+        segments = self.segments()
+        if self._current_path is not None:
+            segments.append(self._current_path)
+        size = sum(path.stat().st_size for path in segments if path.exists())
+        lag = time.time() - self._oldest_timestamp if self._oldest_timestamp and size else 0.0
+        return {
+            "spool_segments": len(segments),
+            "spool_bytes": size,
+            "spool_replay_lag_seconds": round(lag, 3),
+            "spooled_events": self.spooled_events,
+        }
+
+    def _first_timestamp(self) -> Optional[float]:
+        """Enqueue time of the oldest spooled record."""
+        segments = self.segments()
+        if self._current_path is not None:
+            segments.append(self._current_path)
+        for path in segments:
+            try:
+                with open(path, "rb") as f:
+                    header = f.read(HEADER.size)
+            except FileNotFoundError:
+                continue
+            if len(header) == HEADER.size:
+                return HEADER.unpack(header)[2]
+        return None
+
+    @staticmethod
+    def _segments_in(directory: Path) -> List[Path]:
+        return sorted(directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def _adopt(self, directory: Path) -> bool:
+        """
+        Take the lock of another process's spool directory if no live process
+        holds it. The lock is kept until the directory is replayed, so the
+        directory is ours alone; True if we hold it.
+        """
+        if directory in self._adopted:
+            return True
+        try:
+            lock_file = open(directory / LOCK_FILE, "ab")
+        except OSError:
+            # Removed by the worker that just finished replaying it
+            return False
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._adopted[directory] = lock_file
+        return True
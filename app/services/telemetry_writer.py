@@ -0,0 +1,392 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import TelemetrySessionLocal
+from app.core.tracing import tracer
+from app.models.ai_runs import AIRun, AIRunPayload
+from app.models.prompt_blocks import PromptBlock
+from app.services.prompt_store import PromptSegment, COMPRESSION, compress_block
+from app.services.telemetry_spool import TelemetrySpool
+
+logger = logging.getLogger(__name__)
+
+# Column values of a freshly inserted row that are not set by create_run
+INSERT_DEFAULTS: Dict[str, Any] = {
+    "trip_id": None,
+    "endpoint": None,
+    "error_message": None,
+    "source": "llm",
+    "updated_at": None,
+    "tokens_used": None,
+    "model": None,
+    "prompt_tokens": None,
+    "completion_tokens": None,
+    "cached_tokens": None,
+    "latency_ms": None,
+    "ttft_ms": None,
+    "finish_reason": None,
+    "retry_count": None,
+    "trace_id": None,
+}
+
+# Columns written to ai_run_payloads instead of ai_runs
+PAYLOAD_COLUMNS = ("prompt", "response", "prompt_blocks")
+
+INSERT = "insert"
+UPDATE = "update"
+BLOCK = "block"
+FLUSH = "flush"
+STOP = "stop"
+
+
+class TelemetryWriter:
+    """
+    Write-behind pipeline for integration.ai_runs.
+
+    Inserts and status transitions are queued in memory and written by a
+    background task in batches: one multi-row INSERT for new runs and one
+    executemany UPDATE per column set for transitions. A batch is flushed
+    when it reaches TELEMETRY_BATCH_SIZE or TELEMETRY_FLUSH_INTERVAL_MS has
+    passed since its first event. The queue is bounded; producers wait up to
+    TELEMETRY_ENQUEUE_TIMEOUT_SECONDS for space before the event is dropped.
+
+    When Postgres is unavailable or slower than TELEMETRY_DB_TIMEOUT_SECONDS,
+    batches go to the local TelemetrySpool instead. While the spool has a
+    backlog every new batch is spooled too, so events keep their order, and a
+    replay task feeds the spool back into ai_runs once the database recovers.
+    Writes are idempotent (INSERT ... ON CONFLICT DO NOTHING, UPDATE by key).
+
+    Prompt and response values are split off into ai_run_payloads. Both
+    tables are partitioned on created_at, so every event carries it and
+    updates address rows by (id, created_at) to touch a single partition.
+    Prompt blocks are content-addressed; hashes written recently are
+    remembered so shared blocks are not re-sent on every run.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = TelemetrySessionLocal,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        spool: Optional[TelemetrySpool] = None,
+    ):
+        self.session_factory = session_factory
+        self.spool = spool
+        self.batch_size = batch_size or settings.TELEMETRY_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.TELEMETRY_FLUSH_INTERVAL_MS) / 1000
+        self.max_queue_size = max_queue_size or settings.TELEMETRY_QUEUE_MAX_SIZE
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._spool_lock = asyncio.Lock()
+        self._known_blocks: "OrderedDict[str, None]" = OrderedDict()
+        self.flushed_rows = 0
+        self.replayed_events = 0
+        self.dropped_events = 0
+        self.failed_batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flush task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run(), name="telemetry-writer")
+        if self.spool is not None:
+            self.spool.open()
+            self._replay_task = asyncio.create_task(self._replay_loop(), name="telemetry-spool-replay")
+
+    async def stop(self) -> None:
+        """Flush everything queued so far and stop the background task."""
+        if not self.running:
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((STOP, done))
+        await done
+        await self._task
+        self._task = None
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            self._replay_task = None
+        if self.spool is not None:
+            self.spool.close()
+
+    async def flush(self) -> None:
+        """Wait until every event queued before this call is written."""
+        if not self.running:
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((FLUSH, done))
+        await done
+
+    async def enqueue_insert(self, row: Dict[str, Any]) -> None:
+        """Queue a new ai_runs row (must contain id)."""
+        await self._enqueue((INSERT, row))
+
+    async def enqueue_update(self, run_id: uuid.UUID, created_at: datetime, values: Dict[str, Any]) -> None:
+        """Queue column changes of an existing run."""
+        await self._enqueue((UPDATE, {"id": run_id, "created_at": created_at, **values}))
+
+    async def enqueue_blocks(self, segments: List[PromptSegment]) -> None:
+        """
+        Queue prompt blocks that were not written recently. A block counts as
+        known from the moment it is queued, so concurrent runs do not queue it
+        twice; it is forgotten again if it is dropped instead of written.
+        """
+        for item in segments:
+            if item.hash in self._known_blocks:
+                self._known_blocks.move_to_end(item.hash)
+                continue
+            self._known_blocks[item.hash] = None
+            if len(self._known_blocks) > settings.PROMPT_BLOCK_CACHE_SIZE:
+                self._known_blocks.popitem(last=False)
+            await self._enqueue((BLOCK, {"hash": item.hash, "kind": item.kind, "text": item.text}))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "flushed_rows": self.flushed_rows,
+            "dropped_events": self.dropped_events,
+            "failed_batches": self.failed_batches,
+            "replayed_events": self.replayed_events,
+        }
+        if self.spool is not None:
+            stats.update(self.spool.stats())
+        return stats
+
+    async def replay_spool(self) -> int:
+        """Replay spooled events into Postgres until the spool is empty. Returns events replayed."""
+        replayed = 0
+        while True:
+            async with self._spool_lock:
+                # New batches go to a fresh segment while closed ones are replayed
+                self.spool.roll()
+                segments = await asyncio.to_thread(self.spool.segments)
+                if not segments:
+                    return replayed
+            for segment in segments:
+                events = await asyncio.to_thread(self.spool.read_segment, segment)
+                for start in range(0, len(events), settings.TELEMETRY_SPOOL_REPLAY_BATCH_SIZE):
+                    chunk = events[start:start + settings.TELEMETRY_SPOOL_REPLAY_BATCH_SIZE]
+                    await asyncio.wait_for(self._write_to_db(chunk), settings.TELEMETRY_DB_TIMEOUT_SECONDS)
+                await asyncio.to_thread(self.spool.remove, segment)
+                self.replayed_events += len(events)
+                replayed += len(events)
+
+    async def _replay_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TELEMETRY_SPOOL_REPLAY_INTERVAL_SECONDS)
+            try:
+                # Our own backlog is tracked in memory; orphaned spools of exited workers need a scan
+                if not self.spool.has_backlog() and not await asyncio.to_thread(self.spool.segments):
+                    continue
+                await self.replay_spool()
+            except Exception:
+                logger.warning("Telemetry spool replay failed, retrying later", exc_info=True)
+
+    async def _enqueue(self, event: Tuple[str, Dict[str, Any]]) -> None:
+        if not self.running:
+            self.start()
+        try:
+            # Backpressure: wait for space, but never stall a request indefinitely
+            await asyncio.wait_for(self._queue.put(event), settings.TELEMETRY_ENQUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.dropped_events += 1
+            self._forget_blocks([event])
+            logger.warning("Telemetry queue full, dropped %s event", event[0])
+
+    def _forget_blocks(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Let dropped prompt blocks be queued again by the next run that uses them."""
+        for kind, payload in events:
+            if kind == BLOCK:
+                self._known_blocks.pop(payload["hash"], None)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            control = None
+
+            kind, payload = await self._queue.get()
+            if kind in (FLUSH, STOP):
+                control = (kind, payload)
+            else:
+                batch.append((kind, payload))
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        kind, payload = self._queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            kind, payload = await asyncio.wait_for(self._queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    if kind in (FLUSH, STOP):
+                        control = (kind, payload)
+                        break
+                    batch.append((kind, payload))
+
+            if batch:
+                await self._write(batch)
+
+            if control is not None:
+                kind, done = control
+                if kind == STOP:
+                    await self._drain()
+                    done.set_result(None)
+                    return
+                done.set_result(None)
+
+    async def _drain(self) -> None:
+        """Write whatever producers queued after the stop marker."""
+        batch = []
+        while not self._queue.empty():
+            kind, payload = self._queue.get_nowait()
+            if kind in (FLUSH, STOP):
+                payload.set_result(None)
+            else:
+                batch.append((kind, payload))
+        if batch:
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if self.spool is not None:
+            async with self._spool_lock:
+                if self.spool.has_backlog():
+                    await asyncio.to_thread(self.spool.append, batch)
+                    return
+        try:
+            await asyncio.wait_for(self._write_to_db(batch), settings.TELEMETRY_DB_TIMEOUT_SECONDS)
+            return
+        except Exception:
+            self.failed_batches += 1
+            if self.spool is None:
+                self.dropped_events += len(batch)
+                self._forget_blocks(batch)
+                logger.exception("Failed to write telemetry batch of %d events", len(batch))
+                return
+            logger.warning("Telemetry database unavailable, spooling %d events", len(batch), exc_info=True)
+
+        async with self._spool_lock:
+            await asyncio.to_thread(self.spool.append, batch)
+
+    async def _write_to_db(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        blocks = {payload["hash"]: payload for kind, payload in batch if kind == BLOCK}
+        inserts, updates = self._fold([event for event in batch if event[0] != BLOCK])
+        # Flushes run outside requests, so each batch is a trace of its own
+        with tracer.span("telemetry.flush", rows=len(blocks) + len(inserts) + len(updates)):
+            async with self.session_factory() as db:
+                updates = await self._with_created_at(db, updates)
+                inserts, payload_inserts = self._split_payloads(inserts)
+                updates, payload_updates = self._split_payloads(updates)
+                if blocks:
+                    await db.execute(
+                        insert(PromptBlock).on_conflict_do_nothing(index_elements=["hash"]),
+                        [self._block_row(block) for block in blocks.values()],
+                    )
+                if inserts:
+                    await db.execute(
+                        insert(AIRun).on_conflict_do_nothing(index_elements=["id", "created_at"]), inserts
+                    )
+                if payload_inserts:
+                    for row in payload_inserts:
+                        row.setdefault("response", None)
+                        row.setdefault("prompt_blocks", None)
+                    await db.execute(
+                        insert(AIRunPayload).on_conflict_do_nothing(index_elements=["run_id", "created_at"]),
+                        payload_inserts,
+                    )
+                for rows in self._group_by_columns(updates):
+                    await db.execute(update(AIRun), rows)
+                for rows in self._group_by_columns(payload_updates):
+                    await db.execute(update(AIRunPayload), rows)
+                await db.commit()
+        self.flushed_rows += len(blocks) + len(inserts) + len(updates)
+
+    @staticmethod
+    async def _with_created_at(db: AsyncSession, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fill in created_at of updates spooled before ai_runs was partitioned
+        (they addressed runs by id alone); updates of unknown runs are dropped.
+        """
+        legacy = [row for row in updates if row.get("created_at") is None]
+        if not legacy:
+            return updates
+        found = dict((await db.execute(
+            select(AIRun.id, AIRun.created_at).where(AIRun.id.in_([row["id"] for row in legacy]))
+        )).all())
+        for row in legacy:
+            row["created_at"] = found.get(row["id"])
+        return [row for row in updates if row["created_at"] is not None]
+
+    @staticmethod
+    def _fold(batch: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Merge updates into inserts of the same batch and combine repeated updates,
+        so each run is written at most once per flush.
+        """
+        inserts: Dict[uuid.UUID, Dict[str, Any]] = {}
+        updates: Dict[uuid.UUID, Dict[str, Any]] = {}
+        for kind, payload in batch:
+            run_id = payload["id"]
+            if kind == INSERT:
+                inserts[run_id] = {**INSERT_DEFAULTS, **payload}
+            elif run_id in inserts:
+                inserts[run_id].update(payload)
+            else:
+                updates.setdefault(run_id, {}).update(payload)
+        return list(inserts.values()), list(updates.values())
+
+    @staticmethod
+    def _block_row(block: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "hash": block["hash"],
+            "kind": block["kind"],
+            "compression": COMPRESSION,
+            "content": compress_block(block["text"], settings.PROMPT_BLOCK_COMPRESSION_LEVEL),
+            "size": len(block["text"].encode()),
+        }
+
+    @staticmethod
+    def _split_payloads(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Separate prompt/response values into ai_run_payloads rows keyed like the run."""
+        runs, payloads = [], []
+        for row in rows:
+            payload = {column: row[column] for column in PAYLOAD_COLUMNS if column in row}
+            run = {column: value for column, value in row.items() if column not in PAYLOAD_COLUMNS}
+            if payload:
+                payloads.append({"run_id": row["id"], "created_at": row["created_at"], **payload})
+            # An update that only carries payload columns leaves nothing but the key
+            if run.keys() - {"id", "created_at"}:
+                runs.append(run)
+        return runs, payloads
+
+    @staticmethod
+    def _group_by_columns(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """executemany needs the same parameter set for every row."""
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+        return list(groups.values())
+
+
+telemetry_writer = TelemetryWriter(
+    spool=TelemetrySpool(settings.TELEMETRY_SPOOL_DIR, settings.TELEMETRY_SPOOL_SEGMENT_BYTES)
+    if settings.TELEMETRY_SPOOL_ENABLED else None,
+)
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, Union
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.constants import AIEndpoint
+from app.core.database import AsyncSessionLocal
+from app.core.tracing import tracer
+from app.models.trip_plans import TripPlanRecord
+from app.schemas.response import TripPlan
+from app.services.cache import LRUCache
+
+
+class TripPlanNotFoundError(LookupError):
+    """No stored plan for the trip (or it belongs to another user) and none was sent inline."""
+
+
+@dataclass(frozen=True)
+class StoredTripPlan:
+    """Plan of a trip at a specific version."""
+    trip_id: uuid.UUID
+    user_id: uuid.UUID
+    version: str
+    plan: Dict[str, Any]
+
+
+def plan_version(plan: Dict[str, Any]) -> str:
+    """Content hash identifying a plan version."""
+    canonical = json.dumps(plan, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# Shared by all requests of a worker; entries expire so plans changed by
+# another worker are picked up from Postgres.
+trip_plan_cache: LRUCache[StoredTripPlan] = LRUCache(
+    settings.TRIP_PLAN_CACHE_SIZE,
+    ttl_seconds=settings.TRIP_PLAN_CACHE_TTL_SECONDS,
+)
+
+
+class TripPlanStore:
+    """
+    Latest plan per trip_id, kept in integration.trip_plans behind an
+    in-process LRU, so /explain and /improve can work from trip_id alone.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        cache: LRUCache[StoredTripPlan] = trip_plan_cache,
+    ):
+        self.session_factory = session_factory
+        self.cache = cache
+
+    async def get(self, trip_id: uuid.UUID, user_id: uuid.UUID) -> Optional[StoredTripPlan]:
+        """Stored plan of the user's trip, if any."""
+        stored = await self._current(trip_id)
+        return stored if stored is not None and stored.user_id == user_id else None
+
+    async def resolve(
+        self,
+        trip_id: uuid.UUID,
+        user_id: uuid.UUID,
+        override: Optional[Dict[str, Any]] = None,
+    ) -> StoredTripPlan:
+        """Plan to work on: the inline override if given, else the stored plan."""
+        if override is not None:
+            current = await self._current(trip_id)
+            if current is not None and current.user_id != user_id:
+                raise TripPlanNotFoundError(f"Trip {trip_id} belongs to another user")
+            return StoredTripPlan(trip_id=trip_id, user_id=user_id, version=plan_version(override), plan=override)
+        stored = await self.get(trip_id, user_id)
+        if stored is None:
+            raise TripPlanNotFoundError(f"No stored plan for trip {trip_id}; send the plan inline")
+        return stored
+
+    def stage(
+        self,
+        trip_id: Union[str, uuid.UUID],
+        user_id: Union[str, uuid.UUID],
+        plan: TripPlan,
+    ) -> Optional[StoredTripPlan]:
+        """
+        New plan version of the user's trip to persist with save(), or None if
+        this worker knows the trip belongs to another user.
+        """
+        data = plan.model_dump(mode="json")
+        stored = StoredTripPlan(
+            trip_id=uuid.UUID(str(trip_id)),
+            user_id=uuid.UUID(str(user_id)),
+            version=plan_version(data),
+            plan=data,
+        )
+        current = self.cache.get(stored.trip_id)
+        if current is not None and current.user_id != stored.user_id:
+            return None
+        return stored
+
+    async def save(self, stored: StoredTripPlan, source: AIEndpoint) -> bool:
+        """
+        Upsert a staged plan version and make it the version this worker serves.
+        False (nothing cached) if the trip belongs to another user.
+        """
+        if not await self._write(stored, source):
+            return False
+        self.cache.set(stored.trip_id, stored)
+        return True
+
+    async def _current(self, trip_id: uuid.UUID) -> Optional[StoredTripPlan]:
+        """Latest plan of the trip, whoever owns it."""
+        stored = self.cache.get(trip_id)
+        if stored is None:
+            stored = await self._load(trip_id)
+            if stored is not None:
+                self.cache.set(trip_id, stored)
+        return stored
+
+    async def _write(self, stored: StoredTripPlan, source: AIEndpoint) -> bool:
+        """Upsert unless the trip belongs to another user (no-op write if the version is unchanged)."""
+        now = datetime.utcnow()
+        statement = insert(TripPlanRecord).values(
+            trip_id=stored.trip_id,
+            user_id=stored.user_id,
+            version=stored.version,
+            plan=stored.plan,
+            source=source.value,
+            created_at=now,
+            updated_at=now,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[TripPlanRecord.trip_id],
+            set_={
+                "version": statement.excluded.version,
+                "plan": statement.excluded.plan,
+                "source": statement.excluded.source,
+                "updated_at": statement.excluded.updated_at,
+            },
+            # A trip never changes owner
+            where=(TripPlanRecord.version != statement.excluded.version)
+            & (TripPlanRecord.user_id == statement.excluded.user_id),
+        ).returning(TripPlanRecord.trip_id)
+        with tracer.span("db.trip_plans.save"):
+            async with self.session_factory() as db:
+                written = (await db.execute(statement)).first() is not None
+                if not written:
+                    # Nothing updated: either the same version of the user's plan or another user's trip
+                    owner = (await db.execute(
+                        select(TripPlanRecord.user_id).where(TripPlanRecord.trip_id == stored.trip_id)
+                    )).scalar_one_or_none()
+                    written = owner == stored.user_id
+                await db.commit()
+        return written
+
+    async def _load(self, trip_id: uuid.UUID) -> Optional[StoredTripPlan]:
+        with tracer.span("db.trip_plans.load"):
+            async with self.session_factory() as db:
+                record = (await db.execute(
+                    select(TripPlanRecord).where(TripPlanRecord.trip_id == trip_id)
+                )).scalar_one_or_none()
+        if record is None:
+            return None
+        return StoredTripPlan(
+            trip_id=record.trip_id,
+            user_id=record.user_id,
+            version=record.version,
+            plan=record.plan,
+        )
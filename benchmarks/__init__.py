@@ -0,0 +1 @@
+"""Micro and macro benchmarks for the recommender hot paths (run with `python -m benchmarks`)."""
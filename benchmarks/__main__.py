@@ -0,0 +1,118 @@
+"""
+Benchmark runner.
+
+Usage:
+    python -m benchmarks run [--suite micro|macro|all] [--with-db] [--output results.json]
+    python -m benchmarks compare base.json head.json [--threshold 0.10]
+
+Results are JSON files keyed by benchmark name; by default they are written
+to benchmarks/results/<git-sha>.json so runs can be compared across commits.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Metric per result type used for comparison and whether lower is better
+COMPARED_METRICS = {"mean_us": True, "p95_ms": True, "throughput_rps": False}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from benchmarks.micro import run_micro
+    from benchmarks.macro import run_macro
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "suite": args.suite,
+            "with_db": args.with_db,
+        },
+    }
+    if args.suite in ("micro", "all"):
+        results["micro"] = await run_micro(args.min_time, args.with_db)
+    if args.suite in ("macro", "all"):
+        results["macro"] = await run_macro(
+            args.requests,
+            args.concurrency,
+            args.with_db,
+            args.llm_ttft_ms,
+            args.llm_tokens_per_second,
+        )
+    return results
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> int:
+    """Print relative changes; return the number of regressions above threshold."""
+    regressions = 0
+    for suite in ("micro", "macro"):
+        for name, head_result in head.get(suite, {}).items():
+            base_result = base.get(suite, {}).get(name)
+            if not base_result:
+                continue
+            for metric, lower_is_better in COMPARED_METRICS.items():
+                if metric not in head_result or not base_result.get(metric):
+                    continue
+                change = (head_result[metric] - base_result[metric]) / base_result[metric]
+                regressed = change > threshold if lower_is_better else change < -threshold
+                regressions += regressed
+                marker = "REGRESSION" if regressed else ""
+                print(f"{suite:5} {name:45} {metric:14} {base_result[metric]:>12} -> {head_result[metric]:>12} {change:+7.1%} {marker}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write a results file")
+    run_parser.add_argument("--suite", choices=["micro", "macro", "all"], default="all")
+    run_parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per micro benchmark")
+    run_parser.add_argument("--requests", type=int, default=500, help="Requests per macro endpoint")
+    run_parser.add_argument("--concurrency", type=int, default=50)
+    run_parser.add_argument("--llm-ttft-ms", type=float, default=0.0, help="Fake LLM time to first token")
+    run_parser.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="Fake LLM token rate (0 = instant)")
+    run_parser.add_argument("--with-db", action="store_true", help="Use the configured Postgres for telemetry")
+    run_parser.add_argument("--output", type=Path, default=None)
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("head", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "compare":
+        base = json.loads(args.base.read_text())
+        head = json.loads(args.head.read_text())
+        return 1 if compare(base, head, args.threshold) else 0
+
+    results = asyncio.run(run(args))
+    output = args.output or RESULTS_DIR / f"{results['meta']['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
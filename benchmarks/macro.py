@@ -0,0 +1,173 @@
+"""Macro benchmarks: concurrent API calls against local stand-ins."""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List
+
+import httpx
+from jose import jwt
+
+from app.api import deps
+from app.core.config import settings
+from app.core.constants import LLMProvider
+from app.fakes.data import fake_pois
+from app.fakes.integration_service import app as fake_integration_app
+from app.fakes.llm_client import build_trip_plan
+from app.main import app
+from app.services.integration_client import IntegrationClient
+from app.services.llm_engine import LLMEngine
+from app.services.cache import LRUCache
+from app.services.telemetry import RunHandle
+from app.services.trip_plans import TripPlanStore
+from benchmarks.timing import percentile
+
+
+class InMemoryTelemetry:
+    """TelemetryService stand-in that keeps runs in memory instead of Postgres."""
+
+    def __init__(self):
+        self.runs: Dict[uuid.UUID, Dict[str, Any]] = {}
+
+    async def create_run(self, **kwargs):
+        run = RunHandle(id=uuid.uuid4(), created_at=datetime.utcnow())
+        self.runs[run.id] = {"status": "pending", **kwargs}
+        return run
+
+    async def complete_run(self, run, **kwargs):
+        self.runs[run.id].update(status="completed", **kwargs)
+
+    async def record_prompt(self, run, prompts):
+        self.runs[run.id]["prompts"] = prompts
+
+    async def fail_run(self, run, **kwargs):
+        self.runs[run.id].update(status="failed", **kwargs)
+
+    async def create_runs(self, runs):
+        return [await self.create_run(**run) for run in runs]
+
+    async def complete_runs(self, results):
+        for result in results:
+            await self.complete_run(**result)
+
+    async def fail_runs(self, failures):
+        for failure in failures:
+            await self.fail_run(**failure)
+
+
+class InMemoryTripPlanStore(TripPlanStore):
+    """TripPlanStore that keeps plans in its LRU only."""
+
+    def __init__(self):
+        super().__init__(session_factory=None, cache=LRUCache(100_000))
+
+    async def _write(self, stored, source):
+        return True
+
+    async def _load(self, trip_id):
+        return None
+
+
+def install_stand_ins(with_db: bool) -> None:
+    """Route the app's dependencies to the fake LLM and Integration Service."""
+    integration = IntegrationClient(
+        base_url="http://integration/integrations",
+        client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_integration_app)),
+    )
+    app.dependency_overrides[deps.get_integration_client] = lambda: integration
+    app.dependency_overrides[deps.get_llm_engine] = lambda: LLMEngine(LLMProvider.FAKE)
+    if not with_db:
+        telemetry = InMemoryTelemetry()
+        app.dependency_overrides[deps.get_telemetry_service] = lambda: telemetry
+        app.dependency_overrides[deps.get_pregenerated_plan_store] = lambda: None
+        trip_plans = InMemoryTripPlanStore()
+        app.dependency_overrides[deps.get_trip_plan_store] = lambda: trip_plans
+
+
+def _payloads() -> Dict[str, Dict[str, Any]]:
+    plan = build_trip_plan("Львів", 3, fake_pois("Львів")).model_dump()
+    return {
+        "/internal/v1/ai/recommend": {
+            "user_id": str(uuid.uuid4()),
+            "user_profile": {"interests": ["history", "food"], "transport_modes": ["walking"], "avg_daily_budget": 2000},
+            "constraints": {"origin_city": "Львів", "duration_days": 3, "start_date": "2026-11-01", "end_date": "2026-11-03"},
+        },
+        "/internal/v1/ai/explain": {
+            "user_id": str(uuid.uuid4()),
+            "trip_id": str(uuid.uuid4()),
+            "trip_plan": plan,
+            "question": "Чому обрано саме ці місця?",
+        },
+        "/internal/v1/ai/improve": {
+            "user_id": str(uuid.uuid4()),
+            "trip_id": str(uuid.uuid4()),
+            "current_plan": plan,
+            "improvement_request": "Додай більше музеїв",
+        },
+    }
+
+
+async def _load(
+    client: httpx.AsyncClient,
+    path: str,
+    payload: Dict[str, Any],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+    }
+
+
+async def run_macro(
+    requests: int,
+    concurrency: int,
+    with_db: bool,
+    llm_ttft_ms: float,
+    llm_tokens_per_second: float,
+) -> Dict[str, Any]:
+    settings.FAKE_LLM_LATENCY_DISTRIBUTION = "fixed"
+    settings.FAKE_LLM_TTFT_MS = llm_ttft_ms
+    settings.FAKE_LLM_TOKENS_PER_SECOND = llm_tokens_per_second
+    install_stand_ins(with_db)
+
+    token = jwt.encode({"sub": "benchmark-service"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    results = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://recommender",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=None,
+    ) as client:
+        for path, payload in _payloads().items():
+            # Warm-up outside of the measured window
+            await _load(client, path, payload, min(concurrency, requests), concurrency)
+            results[f"api{path.removeprefix('/internal/v1/ai')}"] = await _load(
+                client, path, payload, requests, concurrency
+            )
+    app.dependency_overrides.clear()
+    return results
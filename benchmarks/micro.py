@@ -0,0 +1,175 @@
+"""Micro benchmarks of CPU-bound hot paths."""
+import json
+import uuid
+from typing import Dict, Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from jose import jwt
+
+from app.api.deps import verify_token
+from app.core.config import settings
+from app.core.constants import LLMProvider
+from app.core.serialization import ModelResponse, dumps_block
+from app.fakes.data import fake_pois, fake_weather
+from app.fakes.llm_client import build_trip_plan
+from app.schemas.request import RecommendationRequest
+from app.schemas.response import TripPlan
+from app.services.fallback_planner import FallbackPlanner
+from app.services.prompts import PromptBuilder
+from benchmarks.timing import measure, measure_async
+
+POI_COUNTS = (15, 100, 1000)
+PLAN_DAYS = (1, 3, 7, 15)
+
+
+def _plan_dict(poi_count: int) -> Dict[str, Any]:
+    """Plan dict with one itinerary item per POI (unvalidated, as uploaded by callers)."""
+    pois = fake_pois("Львів", count=poi_count)
+    days = max(1, min(15, poi_count // 5))
+    plan = build_trip_plan("Львів", days, pois).model_dump()
+    item_template = plan["itinerary"][0]
+    plan["itinerary"] = [
+        {**item_template, "title": poi["name"], "place_name": poi["name"], "order_index": index + 1}
+        for index, poi in enumerate(pois)
+    ]
+    return plan
+
+
+def bench_prompts(min_time: float) -> Dict[str, Any]:
+    results = {}
+    weather = fake_weather("Львів")
+    preferences = {"interests": ["history", "food"], "transport_modes": ["walking"], "avg_daily_budget": 2000}
+    constraints = {"origin_city": "Львів", "duration_days": 3, "total_budget": 15000, "travel_party_size": 2}
+
+    for count in POI_COUNTS:
+        pois = fake_pois("Львів", count=count)
+        plan = _plan_dict(count)
+        results[f"prompt.recommendation.{count}_pois"] = measure(
+            lambda: PromptBuilder.build_recommendation_prompt(preferences, constraints, weather, pois),
+            min_time=min_time,
+        )
+        results[f"prompt.explain.{count}_pois"] = measure(
+            lambda: PromptBuilder.build_explain_prompt(plan, ["Чому обрано саме ці місця?"]),
+            min_time=min_time,
+        )
+        results[f"prompt.improve.{count}_pois"] = measure(
+            lambda: PromptBuilder.build_improve_prompt(plan, "Додай більше музеїв", {"total_budget": 10000}),
+            min_time=min_time,
+        )
+    return results
+
+
+def bench_validation(min_time: float) -> Dict[str, Any]:
+    results = {}
+    pois = fake_pois("Львів", count=100)
+    for days in PLAN_DAYS:
+        content = build_trip_plan("Львів", days, pois).model_dump_json()
+        results[f"validate.trip_plan.{days}_days"] = measure(
+            lambda: TripPlan.model_validate_json(content),
+            min_time=min_time,
+        )
+    return results
+
+
+def bench_prompt_blocks(min_time: float) -> Dict[str, Any]:
+    """Plan block of explain/improve prompts: stdlib encoder vs the fast path."""
+    results = {}
+    for count in POI_COUNTS:
+        plan = _plan_dict(count)
+        results[f"serialize.plan_block.stdlib.{count}_pois"] = measure(
+            lambda: json.dumps(plan, ensure_ascii=False, indent=2),
+            min_time=min_time,
+        )
+        results[f"serialize.plan_block.fast.{count}_pois"] = measure(
+            lambda: dumps_block(plan),
+            min_time=min_time,
+        )
+    return results
+
+
+def bench_fallback_planner(min_time: float) -> Dict[str, Any]:
+    """Local fallback itinerary (must stay well below the deadline margin)."""
+    results = {}
+    pois = fake_pois("Львів", ["history", "food"], count=100)
+    weather = fake_weather("Львів")
+    for days in PLAN_DAYS:
+        request = RecommendationRequest(
+            user_id=str(uuid.uuid4()),
+            user_profile={"interests": ["history", "food"], "avg_daily_budget": 2000},
+            constraints={"origin_city": "Львів", "duration_days": days, "travel_party_size": 2},
+        )
+        results[f"fallback_planner.{days}_days"] = measure(
+            lambda: FallbackPlanner.plan(request, weather, pois),
+            min_time=min_time,
+        )
+    return results
+
+
+async def bench_responses(min_time: float) -> Dict[str, Any]:
+    """TripPlan response body: FastAPI response_model handling vs ModelResponse."""
+    from app.api.routes import router
+
+    route = next(route for route in router.routes if route.path.endswith("/recommend"))
+    results = {}
+    pois = fake_pois("Львів", count=100)
+    for days in PLAN_DAYS:
+        plan = build_trip_plan("Львів", days, pois)
+
+        async def response_model_path():
+            content = await serialize_response(field=route.response_field, response_content=plan)
+            return JSONResponse(content)
+
+        results[f"serialize.response.response_model.{days}_days"] = await measure_async(
+            response_model_path,
+            min_time=min_time,
+        )
+        results[f"serialize.response.fast.{days}_days"] = measure(
+            lambda: ModelResponse(plan),
+            min_time=min_time,
+        )
+    return results
+
+
+async def bench_auth(min_time: float) -> Dict[str, Any]:
+    token = jwt.encode({"sub": "benchmark-service"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    header = f"Bearer {token}"
+    return {"auth.verify_token": await measure_async(lambda: verify_token(header), min_time=min_time)}
+
+
+async def bench_telemetry(min_time: float) -> Dict[str, Any]:
+    """Insert + completion round trip through the write-behind writer to the configured database."""
+    from app.services.telemetry import TelemetryService
+    from app.services.telemetry_writer import TelemetryWriter
+
+    plan = build_trip_plan("Львів", 3, fake_pois("Львів")).model_dump()
+    writer = TelemetryWriter(flush_interval_ms=1)
+    telemetry = TelemetryService(writer)
+
+    async def round_trip():
+        run = await telemetry.create_run(
+            user_id=str(uuid.uuid4()),
+            provider=LLMProvider.FAKE,
+            prompt="benchmark",
+        )
+        await telemetry.complete_run(run=run, response=plan)
+        await writer.flush()
+
+    writer.start()
+    try:
+        return {"telemetry.create_complete_round_trip": await measure_async(round_trip, min_time=min_time)}
+    finally:
+        await writer.stop()
+
+
+async def run_micro(min_time: float, with_db: bool) -> Dict[str, Any]:
+    results = {}
+    results.update(bench_prompts(min_time))
+    results.update(bench_validation(min_time))
+    results.update(bench_prompt_blocks(min_time))
+    results.update(bench_fallback_planner(min_time))
+    results.update(await bench_responses(min_time))
+    results.update(await bench_auth(min_time))
+    if with_db:
+        results.update(await bench_telemetry(min_time))
+    return results
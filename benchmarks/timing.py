@@ -0,0 +1,55 @@
+import time
+from typing import Callable, Awaitable, List, Dict, Any
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_ns(samples_ns: List[int]) -> Dict[str, Any]:
+    """Summary of per-operation durations measured in nanoseconds."""
+    ordered = sorted(samples_ns)
+    total = sum(ordered)
+    return {
+        "iterations": len(ordered),
+        "mean_us": round(total / len(ordered) / 1000, 3),
+        "p50_us": round(percentile(ordered, 0.50) / 1000, 3),
+        "p95_us": round(percentile(ordered, 0.95) / 1000, 3),
+        "p99_us": round(percentile(ordered, 0.99) / 1000, 3),
+        "ops_per_sec": round(len(ordered) / (total / 1e9), 1) if total else None,
+    }
+
+
+def measure(fn: Callable[[], Any], min_time: float = 0.5, min_iterations: int = 5, warmup: int = 3) -> Dict[str, Any]:
+    """Run fn repeatedly for at least min_time seconds and summarise."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_iterations or time.perf_counter() < deadline:
+        started = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - started)
+    return summarize_ns(samples)
+
+
+async def measure_async(
+    fn: Callable[[], Awaitable[Any]],
+    min_time: float = 0.5,
+    min_iterations: int = 5,
+    warmup: int = 1,
+) -> Dict[str, Any]:
+    """Async variant of measure()."""
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_iterations or time.perf_counter() < deadline:
+        started = time.perf_counter_ns()
+        await fn()
+        samples.append(time.perf_counter_ns() - started)
+    return summarize_ns(samples)
@@ -0,0 +1,12 @@
+import os
+
+# Settings are validated at import time; the unit tests need no real services
+for name, value in {
+    "DB_HOST": "localhost",
+    "POSTGRES_DB": "test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "JWT_SECRET_KEY": "test",
+    "INTEGRATION_SERVICE_URL": "http://localhost:3003/integrations",
+}.items():
+    os.environ.setdefault(name, value)
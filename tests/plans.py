@@ -0,0 +1,44 @@
+from app.schemas.response import TripPlan
+
+# (day, start, minutes, title, place, category, cost)
+ITEMS = [
+    (1, "09:00", 60, "Breakfast", "Cafe Central", "food", 200),
+    (1, "10:30", 120, "Evening show", "National Theatre", "culture", 500),
+    (1, "13:00", 60, "Lunch", "Bistro Lviv", "food", 300),
+    (1, "15:00", 120, "History tour", "History Museum", "culture", 250),
+    (1, "19:00", 90, "Dinner", "Kryivka", "food", 600),
+    (2, "09:30", 120, "Walk", "Stryiskyi Park", "nature", 0),
+    (2, "13:00", 60, "Lunch", "Puzata Hata", "food", 250),
+    (2, "19:30", 90, "Dinner", "Baczewski", "food", 900),
+    (3, "10:00", 90, "Market", "Rynok Market", "shopping", 400),
+    (3, "13:00", 60, "Lunch", "Kumpel", "food", 350),
+]
+
+
+def sample_plan() -> TripPlan:
+    """Three-day plan with meals, a theatre, a museum, a park and a market."""
+    itinerary = []
+    order = {}
+    for day, start, minutes, title, place, category, cost in ITEMS:
+        order[day] = order.get(day, 0) + 1
+        itinerary.append({
+            "day_index": day,
+            "order_index": order[day],
+            "title": title,
+            "description": f"{title} at {place}",
+            "place_name": place,
+            "estimated_cost": cost,
+            "duration_minutes": minutes,
+            "start_time": start,
+            "category": category,
+            "rationale": "Sample item",
+        })
+    return TripPlan(
+        title="Lviv weekend",
+        summary="Three days of food, culture and walks in Lviv",
+        destination="Lviv",
+        total_budget_estimate=sum(item[6] for item in ITEMS),
+        currency="UAH",
+        duration_days=3,
+        itinerary=itinerary,
+    )
@@ -0,0 +1,32 @@
+import pytest
+
+from app.services.explain_router import QuestionRouter
+from tests.plans import sample_plan
+
+
+@pytest.mark.parametrize("question", [
+    "How much is parking?",
+    "How much does the Louvre ticket cost?",
+    "Is the budget enough for the park?",
+    "What time is the zoo on day 2?",
+    "What time is the museum on day 2?",
+])
+def test_unresolved_or_judgement_questions_go_to_the_llm(question):
+    assert QuestionRouter().answer(sample_plan(), question) is None
+
+
+def test_time_of_a_named_place_does_not_match_meals():
+    assert QuestionRouter().answer(sample_plan(), "What time is the theatre?") == "День 1, 10:30 — Evening show."
+
+
+@pytest.mark.parametrize("question", [
+    "How much does the whole trip cost?",
+    "What is the budget?",
+    "Скільки коштує подорож?",
+])
+def test_trip_total_only_for_whole_trip_questions(question):
+    assert QuestionRouter().answer(sample_plan(), question) == "Орієнтовний бюджет усієї подорожі: 3 750 UAH."
+
+
+def test_day_cost():
+    assert QuestionRouter().answer(sample_plan(), "How much does day 2 cost?") == "Орієнтовна вартість дня 2: 1 150 UAH."
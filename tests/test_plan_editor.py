@@ -0,0 +1,64 @@
+import pytest
+
+from app.services.plan_editor import PlanEditor
+from tests.plans import sample_plan
+
+
+def titles(plan, day):
+    return [item.title for item in sorted(plan.itinerary, key=lambda item: item.order_index) if item.day_index == day]
+
+
+def test_swap_matches_keywords_on_word_boundaries():
+    # "eat" inside "theatre" must not select the food items
+    result = PlanEditor().apply(sample_plan(), "swap the theatre and lunch on day 1")
+
+    assert titles(result.improved_plan, 1) == ["Breakfast", "Lunch", "Evening show", "History tour", "Dinner"]
+
+
+def test_swap_kind_of_place_narrows_a_category():
+    result = PlanEditor().apply(sample_plan(), "swap the order of lunch and the museum")
+
+    assert titles(result.improved_plan, 1) == ["Breakfast", "Evening show", "History tour", "Lunch", "Dinner"]
+
+
+@pytest.mark.parametrize("request_text", [
+    "make lunch on day 1 later",
+    "move dinner on day 2 one hour earlier",
+])
+def test_shifting_a_single_activity_is_left_to_the_llm(request_text):
+    assert PlanEditor().apply(sample_plan(), request_text) is None
+
+
+def test_shift_moves_the_whole_day():
+    result = PlanEditor().apply(sample_plan(), "make day 2 later")
+
+    assert [item.start_time for item in result.improved_plan.itinerary if item.day_index == 2] == [
+        "10:30", "14:00", "20:30",
+    ]
+
+
+def test_budget_scaling_is_scoped_to_the_named_day():
+    plan = sample_plan()
+    result = PlanEditor().apply(plan, "reduce costs on day 2 by 20%")
+
+    costs = {item.place_name: item.estimated_cost for item in result.improved_plan.itinerary}
+    assert costs["Puzata Hata"] == 200
+    assert costs["Baczewski"] == 720
+    assert costs["Kryivka"] == 600
+    assert result.improved_plan.total_budget_estimate == plan.total_budget_estimate - 230
+
+
+def test_budget_scaling_of_named_activities_is_left_to_the_llm():
+    assert PlanEditor().apply(sample_plan(), "reduce the dinner costs by 20%") is None
+
+
+def test_edits_joined_with_and_are_all_applied():
+    result = PlanEditor().apply(sample_plan(), "remove day 3 and lower the budget by 10%")
+
+    assert result.improved_plan.duration_days == 2
+    assert len(result.changes_made) == 2
+    assert result.improved_plan.total_budget_estimate == 2700
+
+
+def test_unconsumed_edit_verb_falls_back_to_the_llm():
+    assert PlanEditor().apply(sample_plan(), "remove day 3 plus lower the budget by 10%") is None
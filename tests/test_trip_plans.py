@@ -0,0 +1,50 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.constants import AIEndpoint
+from app.services.cache import LRUCache
+from app.services.trip_plans import TripPlanStore, TripPlanNotFoundError
+from tests.plans import sample_plan
+
+
+class MemoryTripPlanStore(TripPlanStore):
+    """TripPlanStore over a dict with the same owner rule as the upsert."""
+
+    def __init__(self):
+        super().__init__(session_factory=None, cache=LRUCache(100))
+        self.rows = {}
+
+    async def _load(self, trip_id):
+        return self.rows.get(trip_id)
+
+    async def _write(self, stored, source):
+        current = self.rows.get(stored.trip_id)
+        if current is not None and current.user_id != stored.user_id:
+            return False
+        self.rows[stored.trip_id] = stored
+        return True
+
+
+def test_another_users_trip_id_does_not_replace_the_owners_plan():
+    async def scenario():
+        store = MemoryTripPlanStore()
+        trip_id, owner, intruder = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        assert await store.save(store.stage(trip_id, owner, sample_plan()), AIEndpoint.RECOMMEND)
+
+        # Known owner in this worker: nothing is staged
+        assert store.stage(trip_id, intruder, sample_plan()) is None
+        # Owner only in the database: the write is refused and nothing is cached
+        store.cache.clear()
+        staged = store.stage(trip_id, intruder, sample_plan())
+        assert not await store.save(staged, AIEndpoint.IMPROVE)
+        assert store.cache.get(trip_id) is None
+
+        assert (await store.resolve(trip_id, owner)).user_id == owner
+        with pytest.raises(TripPlanNotFoundError):
+            await store.resolve(trip_id, intruder)
+        with pytest.raises(TripPlanNotFoundError):
+            await store.resolve(trip_id, intruder, override=sample_plan().model_dump(mode="json"))
+
+    asyncio.run(scenario())